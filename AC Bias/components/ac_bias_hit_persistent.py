@@ -4,59 +4,52 @@ import os
 os.environ['SKA'] = '/proj/sot/ska3/flight'
 os.environ['ENG_ARCHIVE'] = '/proj/sot/ska3/flight/data/eng_archive'
 
-import urllib.request
-import json
+import sys
+import urllib.error
+from pathlib import Path
 import numpy as np
 from cxotime import CxoTime
 from datetime import timedelta
 from datetime import datetime
 from datetime import timezone
-from cheta import fetch_eng
 import plotly.io as pio
 import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import shutil
 import time
+import argparse
+from ac_bias_server import FigureServer
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch, latest, events, TelemetryError
 
 
 def MAUDERequestLast(MSID):
-    """ Requests the last value for a particular MSID for an interval"""
-    base_url = 'https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m='
-    url = base_url + MSID
-    response = urllib.request.urlopen(url)
-    html = response.read()
-    return json.loads(html)
+    """ Requests the last value for a particular MSID (Telemetry)"""
+    return latest(MSID)
 
 
 def MAUDERequest(ts,tp,MSID):
-    """ Requests a particular MSID for an interval"""
+    """ Requests a particular MSID for an interval (Telemetry)"""
     #sanitize timeformats
     ts.format = 'yday'
     tp.format = 'yday'
-    base_url = 'https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m='
-    url = base_url + MSID + '&ts=' +str(ts) + '&tp=' + str(tp)
-    response = urllib.request.urlopen(url)
-    html = response.read()
-    return json.loads(html)
+    return fetch(MSID, ts, tp, source='maude')
 
 
-def jsontime2cxo(time_in):
-    # sanitize input
-    time_str = str(time_in)
-    return CxoTime(time_str[0:4]+ ':' +time_str[4:7]+':' +time_str[7:9]+':' +time_str[9:11]+':' +time_str[11:13]+'.' +time_str[13:])
+def tlm_time(secs):
+    """ CxoTime in date format for a sample time (CXC seconds) """
+    time_out = CxoTime(secs)
+    time_out.format = 'date'
+    return time_out
 
 
 def getLastPBTime(m_ret):
     """ From m_ret MAUDERequest return value, extract the last playback time. Return None if no playbacks """
-    vals = m_ret['data-fmt-1']['values']
-    times = m_ret['data-fmt-1']['times']
-    if '0' in vals:
-        idx = ''.join(vals).rindex('0')
-        time_PB = jsontime2cxo(str(times[idx]))
-        #time_str = str(times[idx])
-        #time_str_dl = time_str[0:4]+ ':' +time_str[4:7]+':' +time_str[7:9]+':' +time_str[9:11]+':' +time_str[11:13]+'.' +time_str[13:]
-        return time_PB
+    zeros = np.flatnonzero(m_ret.vals == 0)
+    if len(zeros):
+        return tlm_time(m_ret.times[zeros[-1]])
     else:
         return None
 
@@ -94,13 +87,11 @@ def getLastPB(ts,tp):
 
 
 def getACISBiastimes(ts,tp):
-    """ returns lists of start and stop times for ACIS Bias packets """
-    #base_url = 'https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php?r=home&t=qserver&a=show&format=list&columns=tstart,tstop,properties&size=auto&e=BIAS.&tstart='
-    base_url = 'https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php?r=home&t=qserver&a=show&format=list&columns=tstart,tstop,properties,duration,type_desc&size=auto&e=OBS.MODE,BIAS.&tstart='
-    url  = base_url+str(ts)+'&tstop='+str(tp) +'&ul=6'    
-    response = urllib.request.urlopen(url)
-    html = response.read()
-    return html
+    """ returns the ACIS Bias packets (iFOT BIAS events) in the interval and the mode of the observation following each, 'UNK' if none """
+    bias = events('BIAS', ts, tp)
+    obs = events('OBS', ts, tp)
+    following = np.searchsorted(obs.tstart, bias.tstart)   # first observation starting at/after each packet
+    return bias, np.append(obs.mode, 'UNK')[following]
 
 
 def genRTheta(addr_start,addr_stop,addr_max,r,n):
@@ -168,77 +159,58 @@ def getACISBiasAddr(ts,tp,ssr):
     cur_time.format = 'yday'
     last_pb = getLastPB(ts,tp)
     #ACIS_raw = getACISBiastimes(last_pb[1],cur_time) # go from last playback to last playback + 18 hours
-    ACIS_raw = getACISBiastimes(last_pb[1],last_pb[1]+timedelta(seconds=60*60*24)) # go from last playback to last playback + 24 hours
-    df_list = pd.read_html(ACIS_raw) # grab table from returned iFOT data
-    df = df_list[-1]
+    bias, obs_modes = getACISBiastimes(last_pb[1],last_pb[1]+timedelta(seconds=60*60*24)) # go from last playback to last playback + 24 hours
     acis_bias_rng = []
-    #traverse array in reverse and populate obs type column of bias packets
-    ## populate rows with associated observation (if any)
-    cur_type = 'UNK'
-    for row in df.iloc[::-1].iterrows():
-        if row[1][3] == 'Observation':
-            cur_type = row[1][4]
-        else:
-            df.iloc[row[0],4] = cur_type
-    # Grab the rows that are just the bias packets and annotate them
-    bias_df = df[df[3]=='ACIS BIAS Packet'].copy(deep=True)   
-    #Initialize columns
-    bias_df[5] = '' * len(bias_df[0])
-    bias_df[6] = '' * len(bias_df[0])
-    for row in bias_df.iterrows():
-        row[1][0] = CxoTime(row[1][0])
-        row[1][1] = CxoTime(row[1][1])
-        tmp = list(map(float,row[1][2].split(':')))
-        dur_secs = tmp[0]*86400 + tmp[1]*3600 + tmp[2]*60 +tmp[3]
-        row[1][2] = timedelta(seconds=dur_secs)        
-        if row[1][4].startswith("TE"):
-            if row[1][2] > timedelta(seconds=24*60): # TE Long
-                row[1][5] = "TE_LONG"
+    # Annotate the bias packets with their observation type
+    time_thr = (last_pb[1]+timedelta(seconds=60*60*18)).secs
+    bias_rows = []
+    for bias_ts, bias_tp, obs_mode in zip(bias.tstart, bias.tstop, obs_modes):
+        if np.isnan(bias_tp) or bias_ts > time_thr:  # DROP INCOMPLETE ROWS AND ROWS WHO START > 18 HOURS PAST LAST PLAYBACK
+            continue
+        if obs_mode.startswith("TE"):
+            if bias_tp - bias_ts > 24*60: # TE Long
+                obs_type = "TE_LONG"
             else:
-                row[1][5] = "TE_SHORT"
-        elif row[1][4].startswith("CC"):
-            row[1][5] = "CC"
+                obs_type = "TE_SHORT"
+        elif obs_mode.startswith("CC"):
+            obs_type = "CC"
         else:
-            row[1][5] = "UNK"            
-    time_thr = last_pb[1]+timedelta(seconds=60*60*18)
-    for row in bias_df.iterrows():  # NOW DROP ROWS WHO START > 18 HOURS PAST LAST PLAYBACK
-        if row[1][0] > time_thr:
-            row[1][5] = None
-    bias_df.dropna(axis=0,how='any',subset=None,inplace=True)
+            obs_type = "UNK"
+        bias_rows.append((bias_ts, bias_tp, obs_mode, obs_type))
 
     #Get Reference Pointer, e.g. Record pointer val at last pb time
     rcpt = MAUDERequest(last_pb[1],last_pb[1] +timedelta(seconds=63),'COS'+ssr+'RCPT')
-    ref_rcpt_val = int(rcpt['data-fmt-1']['values'][0])
-    ref_rcpt_time = jsontime2cxo(str(rcpt['data-fmt-1']['times'][0]))    
+    ref_rcpt_val = int(rcpt.vals[0])
+    ref_rcpt_time = tlm_time(rcpt.times[0])    
     # Now for each time in each  ACIS Bias Range, convert to address values using the record pointer
-    for row in bias_df.iterrows():
+    for bias_ts, bias_tp, obs_mode, obs_type in bias_rows:
         # For each acis range, calculate the corresponding address pointers
         # and the corresponding record pointer.  
         # **NOTE** Doesn't handle rollovers during an acis packet     
         # output row is [ acis_ts,addr_ts,acis_tp,addr_tp,OBS_STR,OBS_TYPE, concern_addr_list, concern_time_list ]
-        acis_ts = CxoTime(row[1][0])
-        acis_tp = CxoTime(row[1][1])
+        acis_ts = tlm_time(bias_ts)
+        acis_tp = tlm_time(bias_tp)
         addr_ts =ptr2addr(acis_ts,(ref_rcpt_time,ref_rcpt_val))
         addr_tp =ptr2addr(acis_tp,(ref_rcpt_time,ref_rcpt_val))
         # now calculate concern times in address space....
         concern = []
         concern_time = []
-        if row[1][5] == 'TE_SHORT':
+        if obs_type == 'TE_SHORT':
             concern.append([ptr2addr(acis_ts + timedelta(seconds=60),[ref_rcpt_time,ref_rcpt_val]),ptr2addr(acis_ts + timedelta(seconds=120),[ref_rcpt_time,ref_rcpt_val])])  # concenrn period 1
             concern_time.append([acis_ts + timedelta(seconds=60),acis_ts + timedelta(seconds=120)])
             d_acis = acis_tp - acis_ts            
             concern.append([ptr2addr(acis_ts + d_acis/2,[ref_rcpt_time,ref_rcpt_val]),ptr2addr(acis_tp + timedelta(seconds=120),[ref_rcpt_time,ref_rcpt_val])])  # concenrn period 2
             concern_time.append([acis_ts + d_acis/2,acis_tp + timedelta(seconds=120)])
-        elif row[1][5] == 'TE_LONG':
+        elif obs_type == 'TE_LONG':
             concern.append([ptr2addr(acis_ts + timedelta(seconds=60),[ref_rcpt_time,ref_rcpt_val]),ptr2addr(acis_ts + timedelta(seconds=120),[ref_rcpt_time,ref_rcpt_val])])  # concenrn period 1
             concern_time.append([acis_ts + timedelta(seconds=60),acis_ts + timedelta(seconds=120)])
             concern.append([ptr2addr(acis_ts + timedelta(seconds=12*60),[ref_rcpt_time,ref_rcpt_val]),ptr2addr(acis_tp + timedelta(seconds=4*60),[ref_rcpt_time,ref_rcpt_val])])  # concenrn period 2
             concern_time.append([acis_ts + timedelta(seconds=12*60),acis_tp + timedelta(seconds=4*60)])
-        elif row[1][5] == 'CC':
+        elif obs_type == 'CC':
             concern.append([ptr2addr(acis_ts + timedelta(seconds=60),[ref_rcpt_time,ref_rcpt_val]),ptr2addr(acis_tp + timedelta(seconds=536),[ref_rcpt_time,ref_rcpt_val])])  # concenrn period 1
             concern_time.append([acis_ts + timedelta(seconds=60),acis_tp + timedelta(seconds=536)])
         # output row is [ acis_ts,addr_ts,acis_tp,addr_tp,OBS_STR,OBS_TYPE, concern_addr_list, concern_time_list ]
-        row_out = [ acis_ts,addr_ts,acis_tp,addr_tp,row[1][4],row[1][5],concern,concern_time  ]
+        row_out = [ acis_ts,addr_ts,acis_tp,addr_tp,obs_mode,obs_type,concern,concern_time  ]
         acis_bias_rng.append(row_out) # Grab the record pointers at begin 
     return acis_bias_rng
 
@@ -289,13 +261,13 @@ def CreateTable(ssr_sel,ac_bias):
     cur_ts = cur_time - timedelta(seconds=t_win)
     #ref_rcpt = MAUDERequest(cur_ts,cur_time,'COS'+ssr_sel+'RCPT')
     ref_rcpt = MAUDERequestLast('COS'+ssr_sel+'RCPT')
-    ref_rcpt_val = int(ref_rcpt['data-fmt-1']['values'][-1])
-    ref_rcpt_time = jsontime2cxo(ref_rcpt['data-fmt-1']['times'][-1])
+    ref_rcpt_val = int(ref_rcpt.vals[-1])
+    ref_rcpt_time = tlm_time(ref_rcpt.times[-1])
 
     #  determine what spacecraft time is currently being played back
     #pbpt = MAUDERequest(cur_ts,cur_time,'COSBPBPT')
     pbpt = MAUDERequestLast('COS'+ssr_sel+'PBPT')
-    pbpt_val = int(pbpt['data-fmt-1']['values'][-1])
+    pbpt_val = int(pbpt.vals[-1])
     pbpt_rec_time = ptr2time(pbpt_val,(ref_rcpt_time,ref_rcpt_val),-1)
 
     # add playback pointer row
@@ -345,13 +317,13 @@ def DrawBias(cur_time,ssr_sel,hrs_prev,pben_val,pb,pb_time,bcw_list,ac_bias,base
 
     #rcpt = MAUDERequest(cur_ts,cur_time,'COS'+ssr_sel+'RCPT')
     rcpt = MAUDERequestLast('COS'+ssr_sel+'RCPT')
-    rc = int(rcpt['data-fmt-1']['values'][-1])
-    rc_time = jsontime2cxo(rcpt['data-fmt-1']['times'][-1])
+    rc = int(rcpt.vals[-1])
+    rc_time = tlm_time(rcpt.times[-1])
 
     # playback time remaining... Need to get bit-rate CIUMBITR
     #br = MAUDERequest(cur_ts,cur_time,'CIUMBITR')
     br = MAUDERequestLast('CIUMBITR')
-    br_val = int(br['data-fmt-1']['values'][-1])
+    br_val = int(br.vals[-1])
     if br_val == 0:
         bit_rate = 2000 # bits/sec
     else:
@@ -550,26 +522,11 @@ def DrawBias(cur_time,ssr_sel,hrs_prev,pben_val,pb,pb_time,bcw_list,ac_bias,base
     )
     #fig.write_html('ACBIAS_example.html', auto_open=False)
     #fig.write_html('ACBIAS_example2.html', auto_open=False,include_plotlyjs='directory')
-    try:
-        fig.write_html(f"{base_dir}/ACBIAS_example.html",include_plotlyjs = "directory", auto_open = False)
-    except Exception  as error:
-        print(f"NETWORK WRITE ERROR ({error})")
     return ac_sort, fig
 
 
-def get_pid():
-    "get the PID id for this script when its ran, then save it to a txt file"
-    pid = os.getpid()
-    base_dir = "/share/FOT/engineering/ccdm/Tools/AC_BIAS/Output"
-
-    with open(f"{base_dir}/pid.txt", "w", encoding="utf-8") as file:
-        file.write(f"{pid}")
-        file.close()
-
-
-def main(cur_time, ts):
-    "Working on it"
-    get_pid()
+def main(cur_time, ts, server):
+    "Run the tracker loop, publishing each new figure to the local HTTP server"
     [selected_SSR, _] = getLastPB(ts,cur_time)
     base_dir = "/share/FOT/engineering/ccdm/Tools/AC_BIAS/Output"
     ssr_sel = selected_SSR
@@ -591,8 +548,8 @@ def main(cur_time, ts):
     print(cur_time)
     #pbpt = MAUDERequest(cur_ts,cur_time,'COS'+ssr_sel+'PBPT')
     pbpt = MAUDERequestLast('COS'+ssr_sel+'PBPT')
-    pb = int(pbpt['data-fmt-1']['values'][-1])
-    pb_time = jsontime2cxo(pbpt['data-fmt-1']['times'][-1])
+    pb = int(pbpt.vals[-1])
+    pb_time = tlm_time(pbpt.times[-1])
     pben_val = 0
     loop_cnt = 500
     # initialize ac-bias fetch
@@ -606,36 +563,37 @@ def main(cur_time, ts):
         # Get latest M1466, M1966 and PBEN
         #pbpt = MAUDERequest(cur_ts,cur_time,'COS'+ssr_sel+'PBPT')
         pbpt = MAUDERequestLast('COS'+ssr_sel+'PBPT')
-        pb = int(pbpt['data-fmt-1']['values'][-1])
-        pb_time = jsontime2cxo(pbpt['data-fmt-1']['times'][-1])
+        pb = int(pbpt.vals[-1])
+        pb_time = tlm_time(pbpt.times[-1])
         #pben = MAUDERequest(cur_time_old,cur_time,'COS'+ssr_sel+'PBEN')
         pben = MAUDERequestLast('COS'+ssr_sel+'PBEN')
-        if len(pben['data-fmt-1']['values']) >0 :
-            pben_val = int(pben['data-fmt-1']['values'][-1])
+        if len(pben) >0 :
+            pben_val = int(pben.vals[-1])
         else:
             pben_val = pben_val # TBD: remove.  This is old-school VHDL style assignment for comepleteness, 
         #M1466 = MAUDERequest(cur_time_old-timedelta(seconds=10),cur_time,'M1466') # do we have an increment? -- look for increment with a little buffer time
         M1466 = MAUDERequestLast('M1466') # do we have an increment? -- look for increment with a little buffer time
         # for now, just time stamp as current PB pointer (rough)
-        if len(M1466['data-fmt-1']['values']) > 0 :
-            M1466_val = int(M1466['data-fmt-1']['values'][-1])
+        if len(M1466) > 0 :
+            M1466_val = int(M1466.vals[-1])
             if  (M1466_val > M1466_old) & (pben_val==1):  # we have a hit, find the precise time of change
                 bcw_list.append([pb,pb_time])
-                #        vals = list(map(int,M1466['data-fmt-1']['values'])) # future exact time determination
+                #        vals = M1466.vals.astype(int) # future exact time determination
                 #        val_diff = np.diff(vals,prepend=M1466_old)
                 #        val_idx = np.where(val_diff>0)
         else:
             M1466_val = M1466_old # no data, just push forward
         #M1966 = MAUDERequest(cur_time_old,cur_time,'M1966')
         M1966 = MAUDERequestLast('M1966')
-        if len(M1966['data-fmt-1']['values']) >0 :
-            M1966_val = int(M1966['data-fmt-1']['values'][-1])
+        if len(M1966) >0 :
+            M1966_val = int(M1966.vals[-1])
             if M1966_val > M1966_old:  # we have a hit, find the precise time of change
                 bcw_list.append([pb,pb_time])
         else:
             M1966_val = M1966_old
         # Now Draw the chart
         ac_sort, ac_fig = DrawBias(cur_time,ssr_sel,hrs_prev,pben_val,pb,pb_time,bcw_list,ac_bias,base_dir)
+        server.publish(ac_fig)
         if (pben_val == 0) & (pben_old == 1): # playback ended reset, the bcw list (and eventually output)
             ac_fig.update_layout(autosize=False,width=2000,height=1000)
             try:
@@ -661,22 +619,39 @@ def main(cur_time, ts):
 
 pio.renderers.default = "notebook"
 
-fetch_eng.data_source.set('maude')
 def format_dates(cheta_dates):
     return np.array([datetime.strptime(d, '%Y:%j:%H:%M:%S.%f') for d in CxoTime(cheta_dates).date])
 addr_max  = 134217696 # calculated or from GRETA Script?
 
-t = datetime.now(timezone.utc)   # Get UTC Timezone value of current time
-cur_time  = CxoTime(t)
 
-hrs_prev = 48 # Window to look back over
-t_win_start = timedelta(seconds=hrs_prev*3600)
-t_win_stop = timedelta(seconds=2*3600)
-tp = cur_time - t_win_stop # ignore playbacks ended in the last 2 hours, since these may be replays due to bad codewords
-tp.format = 'yday'
-ts = cur_time - t_win_start
-ts.format = 'yday'
-print(str(ts))
-print(str(tp))
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AC Bias HIT Persistent Tracker (headless service)")
+    parser.add_argument("--host", default="0.0.0.0", help="Interface to serve the tracker page on")
+    parser.add_argument("--port", type=int, default=8050, help="Port to serve the tracker page on")
+    args = parser.parse_args()
 
-main(cur_time, ts)
+    server = FigureServer(args.host, args.port)
+    server.start()
+    try:
+        while True: # keep the service alive through MAUDE/iFOT outages
+            t = datetime.now(timezone.utc)   # Get UTC Timezone value of current time
+            cur_time  = CxoTime(t)
+
+            hrs_prev = 48 # Window to look back over
+            t_win_start = timedelta(seconds=hrs_prev*3600)
+            t_win_stop = timedelta(seconds=2*3600)
+            tp = cur_time - t_win_stop # ignore playbacks ended in the last 2 hours, since these may be replays due to bad codewords
+            tp.format = 'yday'
+            ts = cur_time - t_win_start
+            ts.format = 'yday'
+            print(str(ts))
+            print(str(tp))
+            try:
+                main(cur_time, ts, server)
+            except (urllib.error.URLError, TelemetryError) as error:
+                print(f"REQUEST ERROR ({error}), restarting tracker in 30 sec...")
+                time.sleep(30)
+    except KeyboardInterrupt:
+        print("Ending tool execution...")
+    finally:
+        server.stop()
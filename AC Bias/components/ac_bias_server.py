@@ -0,0 +1,137 @@
+"Local HTTP endpoint that serves the AC Bias tracker figure with push updates"
+
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from plotly.offline import get_plotlyjs
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>AC Bias HIT Persistent Tracker</title>
+<script src="/plotly.min.js"></script>
+<style>html, body, #plot { width: 100%; height: 100%; margin: 0; }</style>
+</head>
+<body>
+<div id="plot">Waiting for tracker data...</div>
+<script>
+const plot = document.getElementById("plot");
+const source = new EventSource("/events");
+source.onmessage = (event) => {
+    const fig = JSON.parse(event.data);
+    Plotly.react(plot, fig.data, fig.layout, {responsive: true});
+};
+source.onerror = () => { document.title = "AC Bias (reconnecting...)"; };
+source.onopen = () => { document.title = "AC Bias HIT Persistent Tracker"; };
+</script>
+</body>
+</html>
+"""
+
+
+class FigureServer:
+    """
+    Holds the latest tracker figure in memory and pushes it to every attached
+    browser over Server-Sent Events. Any number of clients may attach.
+    """
+    def __init__(self, host="0.0.0.0", port=8050, keepalive=15):
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.fig_json = None
+        self.version = 0
+        self.condition = threading.Condition()
+        self.plotlyjs = get_plotlyjs().encode("utf-8")
+        self.page = PAGE.encode("utf-8")
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        "Start serving in a background thread"
+        self.thread.start()
+        print(f"  - AC Bias tracker serving on http://{self.host}:{self.port}/")
+
+    def stop(self):
+        "Stop serving and release the port"
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def publish(self, fig):
+        "Replace the in-memory figure and wake every attached client"
+        fig_json = fig.to_json()
+        with self.condition:
+            if fig_json == self.fig_json:
+                return
+            self.fig_json = fig_json
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait_for_update(self, last_version):
+        "Block until a figure newer than last_version exists or keepalive expires"
+        with self.condition:
+            self.condition.wait_for(
+                lambda: self.version != last_version, timeout=self.keepalive)
+            return self.version, self.fig_json
+
+    def _handler(self):
+        "Build the request handler class bound to this server"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            "Routes: / (viewer page), /plotly.min.js, /figure (JSON), /events (SSE)"
+
+            def do_GET(self):
+                if self.path in ("/", "/index.html"):
+                    self._send(server.page, "text/html; charset=utf-8")
+                elif self.path == "/plotly.min.js":
+                    self._send(server.plotlyjs, "application/javascript",
+                               cache="max-age=86400")
+                elif self.path == "/figure":
+                    with server.condition:
+                        fig_json = server.fig_json
+                    if fig_json is None:
+                        self.send_error(503, "Tracker has not produced a figure yet")
+                    else:
+                        self._send(fig_json.encode("utf-8"), "application/json")
+                elif self.path == "/events":
+                    self._stream_events()
+                else:
+                    self.send_error(404)
+
+            def _send(self, body, content_type, cache="no-cache"):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", cache)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_events(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "keep-alive")
+                self.end_headers()
+                with server.condition:
+                    last_version, fig_json = server.version, server.fig_json
+                try:
+                    if fig_json is not None:
+                        self.wfile.write(f"data: {fig_json}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                    while True:
+                        version, fig_json = server.wait_for_update(last_version)
+                        if version == last_version:
+                            self.wfile.write(b": keepalive\n\n")
+                        else:
+                            last_version = version
+                            self.wfile.write(f"data: {fig_json}\n\n".encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # browser detached
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass # keep tracker console output readable
+
+        return Handler
@@ -1,88 +1,47 @@
-"Testing"
+"Open the AC Bias HIT Persistent Tracker served by the headless tracker service"
 
-import paramiko
-import time
 import os
 import sys
-from getpass import getpass, getuser
-from selenium import webdriver
+import json
+import webbrowser
+import urllib.request
+import urllib.error
 
 
-def ssh_session():
-    "Open an ssh session, then execute command to start script"
+SERVICE_HOST = "131.142.113.13"
+SERVICE_PORT = 8050
 
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy()) # this will automatically add the keys
-    attempt = 1
-
-    while True:
-
-        if attempt <= 3:
-            try:
-                username = getuser()
-                print(f"\nEntering SSH session on 131.142.113.13@{username}")
-                print(f"  - Username: {username}")
-                password = getpass("  - Password: ")
-                ssh.connect("131.142.113.13", username=username, password=password)
-                print("  - Connection successful!")
-                break
-            except paramiko.ssh_exception.AuthenticationException:
-                print(f"Bad password, please try again! Attempt ({attempt}/3)")
-                attempt += 1
-
-        else:
-            sys.exit("Too many failed attempts")
-
-    print("""  - Starting "AC_BIAS_HIT_PERSISTANT.py" Tool...""")
-    ssh.exec_command('/proj/sot/ska3/flight/bin/python /home/rhoover/python/Code/ccdm/'
-                     'AC\ Bias/components/"ac_bias_hit_persistent.py"')
-    pid = get_pid()
-    auto_open()
-    print(f"  - Killing PID: {pid} on ssh session.")
-    ssh.exec_command(f"kill {pid}")
-
-
-def auto_open():
-    "Auto Open the generated file and refresh every 5 sec"
-
-    url = "//noodle/FOT/engineering/ccdm/Tools/AC_BIAS/Output/ACBIAS_example.html"
-    driver = webdriver.Chrome()
-    driver.get(url)
 
+def check_service(url):
+    "Confirm the tracker service is up and has produced at least one figure"
     try:
-        while True:
-            time.sleep(5)
-            driver.refresh()
-            print("""Tool is running... (Enter "ctrl + c" to exit tool)""")
-    except KeyboardInterrupt:
-        print("Ending tool execution...")
-
-
-def get_pid():
-    "Get the PID of the script started on the ssh session"
-    base_dir = "//noodle/FOT/engineering/ccdm/Tools/AC_BIAS/Output"
-
-    while True:
-        try:
-            time.sleep(3) # Allow script startup time
-            with open(f"{base_dir}/pid.txt", "r", encoding = "utf-8") as file:
-                for line in file:
-                    pid = str(line)
-                break
-        except FileNotFoundError:
-            print("  - Error! PID not found yet, trying again in 1 sec...")
-            time.sleep(1)
-
-    os.remove(f"{base_dir}/pid.txt")
-    print(f"  - PID: {pid} started on ssh session.")
-    return pid
+        with urllib.request.urlopen(f"{url}figure", timeout=10) as response:
+            json.loads(response.read())
+        print("  - Tracker service is running.")
+        return True
+    except urllib.error.HTTPError as error:
+        if error.code == 503:
+            print("  - Tracker service is running, waiting on its first figure...")
+            return True
+        print(f"  - Error! Tracker service returned ({error}).")
+    except (urllib.error.URLError, OSError) as error:
+        print(f"  - Error! Tracker service not reachable ({error}).")
+    return False
 
 
 def main():
     "Main Execution"
     os.system("cls")
     print("---Welcome to the AC_BIAS_HIT_PERSISTENT Plotter Tool---")
-    ssh_session()
+    host = sys.argv[1] if len(sys.argv) > 1 else SERVICE_HOST
+    url = f"http://{host}:{SERVICE_PORT}/"
+
+    if not check_service(url):
+        sys.exit("Start the service on the host with: "
+                 "python ac_bias_hit_persistent.py --port 8050")
+
+    print(f"  - Opening {url} (page updates automatically, close the tab when done)")
+    webbrowser.open(url)
 
 
 main()
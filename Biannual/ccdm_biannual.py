@@ -1,6 +1,5 @@
 "Biannual data generate tool"
 
-import copy
 import time
 import os
 from os import system, path
@@ -9,7 +8,6 @@ import plotly.graph_objects as go
 import numpy as np
 import pandas as pd
 from Ska import tdb
-from Ska.engarchive import fetch_eng as fetch
 from Ska.engarchive.utils import logical_intervals
 from Ska.tdb import tables
 from plotly.subplots import make_subplots
@@ -23,6 +21,7 @@ from components.average_sbe_submod104_plot import build_sbe_mod104_avg_plot
 from components.sbe_vs_dbe_solar_per_date_plot import build_sbe_vs_dbe_solar_date_plot
 from components.dbe_seu_by_submod_plot import build_sbe_vs_dbe_submod_plot
 from components.query_data_file import build_query_data_file
+from components.data_requests import fetch, Telemetry
 
 
 class Data:
@@ -486,7 +485,7 @@ def TimeAdjust(msid,ts,tp):
     """
     Inputs:
         msid =  MSID for which to calculate the time adjustments statistics for.  
-                instance of  from ska.engarchive.fetch.MSID or Msid  Needs to have a .times field and a .msid field
+                Telemetry from ccdm_telemetry.fetch  Needs to have a .times field and a .msid field
         ts   =  string containing start time in a Chandra.time compatible format, e.g. "2020:100:12:12:12"
         tp   =  string containing stop time in a Chandra.time compatible format, e.g. "2020:100:12:12:12"        
     Notes/Improvements: 
@@ -507,7 +506,7 @@ def TimeAdjust(msid,ts,tp):
         off_phase = 0.25625 * start_minor_frame[str_num_2_idx[stream]]
         t_off[fmt] = off_phase
         t_samp[fmt] = (128 /  samp_rate[str_num_2_idx[stream]] ) * 0.25625
-    tmf = fetch.Msid("CCSDSTMF",ts,tp)
+    tmf = fetch("CCSDSTMF",ts,tp,source="cheta",data_source="cxc",filter_bad=True)
     # generate list of intervals for each format using logical intervals
     fmts = ("FMT1","FMT2","FMT3","FMT4","FMT5","FMT6")
     tmf_intervals = {}
@@ -521,11 +520,19 @@ def TimeAdjust(msid,ts,tp):
             times[(msid.times>=interval["tstart"]) & (msid.times < interval["tstop"])] += t_off[fmt]
             ts_labels[(msid.times>=interval["tstart"]) & (msid.times < interval["tstop"])] = t_samp[fmt]
     msid.times = times
-    ts_msid = copy.copy(msid)
-    ts_msid.vals = ts_labels # stuff it into MSID class so that we can later remove intervals...
+    ts_msid = Telemetry(msid.msid, msid.times, ts_labels) # so that we can later remove intervals...
     return msid,ts_msid
 
 
+def remove_intervals(data, intervals):
+    "Drop the samples of data within any [tstart, tstop) interval (as MSID.remove_intervals)"
+    keep = np.ones(len(data), dtype=bool)
+    for interval in intervals:
+        first, last = np.searchsorted(data.times, [interval["tstart"], interval["tstop"]])
+        keep[first:last] = False
+    return data.select(keep)
+
+
 def get_daily_stats(msid,sw_msid,bad_val,yyyy,ddd,filter_rng):
     """
     Inputs:
@@ -547,30 +554,26 @@ def get_daily_stats(msid,sw_msid,bad_val,yyyy,ddd,filter_rng):
     ts = DateTime(yyyy + ':' + ddd + ':00:00:00') # ensure > 1 MjF buffer before collection interval
     ts_buf = ts - 33/86400
     tp = ts + 1
-    data = fetch.Msid(msid,ts_buf.greta,tp.greta)
-    data,data_t_samp= TimeAdjust(data,ts_buf.greta,tp.greta)
+    data = fetch(msid,ts_buf,tp,source="cheta",data_source="cxc",filter_bad=True)
+    data,data_t_samp= TimeAdjust(data,ts_buf,tp)
     time_oor = (data.times >= tp.secs) | (data.times < ts.secs)
-    data.filter_bad(time_oor)
-    data_t_samp.filter_bad(time_oor)
+    data = data.select(~time_oor)
+    data_t_samp = data_t_samp.select(~time_oor)
     data_t0 = data.times[0] # store start of data time for greta
 
     if (sw_msid is not None) and (len(data)>1):
-        sw = fetch.MSID(sw_msid,ts_buf.greta,tp.greta)
-        sw,sw_t_samp= TimeAdjust(sw,ts_buf.greta,tp.greta)
+        sw = fetch(sw_msid,ts_buf,tp,source="cheta",data_source="cxc")
+        sw,sw_t_samp= TimeAdjust(sw,ts_buf,tp)
         bad_sw = sw.vals == bad_val
         bad_sw_2 = bad_sw
         bad_times = logical_intervals(sw.times,bad_sw_2,complete_intervals=False)        
-        sw.remove_intervals(bad_times)
-        sw_t_samp.remove_intervals(bad_times)
         time_oor = (data.times >= tp.secs) | (data.times<DateTime(data_t0).secs)
-        data.filter_bad(time_oor)
-        data_t_samp.filter_bad(time_oor)
-        data.remove_intervals(bad_times)
-        data_t_samp.remove_intervals(bad_times)
+        data = remove_intervals(data.select(~time_oor), bad_times)
+        data_t_samp = remove_intervals(data_t_samp.select(~time_oor), bad_times)
     if filter_rng is not None:
         data_out_of_range = (data.vals < filter_rng[0]) | (data.vals > filter_rng[1])
-        data.filter_bad(data_out_of_range)
-        data_t_samp.filter_bad(data_out_of_range)
+        data = data.select(~data_out_of_range)
+        data_t_samp = data_t_samp.select(~data_out_of_range)
     if len(data) > 0:
         ret_dict["min"] = np.min(data.vals)
         ret_dict["max"] = np.max(data.vals)
@@ -865,4 +868,6 @@ def main():
     build_sbe_vs_dbe_submod_plot(user_vars)
     build_query_data_file(user_vars)
 
-main()
+
+if __name__ == "__main__":
+    main()
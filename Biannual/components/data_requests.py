@@ -1,8 +1,10 @@
 "Data request methods for Biannual"
 
-import urllib.request
-import json
-from Ska.engarchive import fetch_eng as fetch
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch, Telemetry
 
 
 def ska_data_request(ts, tp, msid, high_rate = False):
@@ -10,10 +12,7 @@ def ska_data_request(ts, tp, msid, high_rate = False):
     print(f"""   - Requesting data for MSID "{msid}" ({ts} thru {tp})...""")
     ts.format = "yday"
     tp.format = "yday"
-    fetch.data_source.set("maude")
-    fetch.data_source.set(f"maude allow_subset={not high_rate}")
-    data = fetch.MSID(f"{msid}", ts, tp)
-    return data
+    return fetch(msid, ts, tp, source="cheta", allow_subset=not high_rate)
 
 
 def maude_data_request(ts,tp,msid):
@@ -21,8 +20,4 @@ def maude_data_request(ts,tp,msid):
     print(f"""   - Requesting MAUDE data for "{msid}" ({ts} thru {tp})...""")
     ts.format = "yday"
     tp.format = "yday"
-    base_url = "https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m="
-    url = base_url + msid + "&ts=" +str(ts) + "&tp=" + str(tp)
-    response = urllib.request.urlopen(url)
-    html = response.read()
-    return json.loads(html)
+    return fetch(msid, ts, tp, source="maude")
@@ -3,6 +3,8 @@
 import os
 import signal
 
+SHARE_ROOT = os.environ.get("FOT_SHARE_ROOT", "/share")
+
 
 def format_doy(doy_no_format):
     "Format the timetuple into a 3 digit string"
@@ -36,7 +38,7 @@ def format_doy(doy_no_format):
 
 def make_output_dir(user_vars, auto_gen = False):
     "Generates the output directory"
-    base_dir = "/share/FOT/engineering/ccdm/Tools/Daily Plots"
+    base_dir = f"{SHARE_ROOT}/FOT/engineering/ccdm/Tools/Daily Plots"
 
     if auto_gen:
         set_dir = f"{base_dir}/Output/Auto-Gen/"
@@ -2,30 +2,16 @@
 
 import plotly.graph_objects as go
 from datetime import datetime, timedelta, timezone
-from cxotime import CxoTime
 from components.tlm_request import data_request
 
 
-def format_times(raw_data,user_vars):
+def format_times(raw_data):
     """
-    Description: Formats times list into a readable format.
-    Input: Raw data dict
-    Output: Builds new list of formated time items.
+    Description: Formats sample times into a plottable format.
+    Input: Telemetry
+    Output: UTC datetime64 array
     """
-    formated_times = []
-
-    if user_vars.data_source in "MAUDE Web":
-        times_list = raw_data["data-fmt-1"]["times"]
-        time_format = "maude"
-    else:
-        times_list = raw_data.times
-        time_format = None
-
-    for time_item in times_list:
-        new_list_item = CxoTime(time_item,format=time_format)
-        formated_times.append(new_list_item.datetime)
-
-    return formated_times
+    return raw_data.datetime64
 
 
 def format_plot_axes(user_vars,figure,plot_title,yaxis_titles):
@@ -62,16 +48,9 @@ def format_plot_axes(user_vars,figure,plot_title,yaxis_titles):
 def add_plot_trace(user_vars,msid,figure,location,trace_title=False):
     "Add a plot trace per given MSID list and plot location"
     raw_data = data_request(user_vars.ts,user_vars.tp,user_vars.data_source,msid)
-    formatted_times = format_times(raw_data, user_vars)
-
-    if user_vars.data_source in "MAUDE Web":
-        y_values = [eval(i) for i in (raw_data["data-fmt-1"]["values"])]
-        title = raw_data["data-fmt-1"]["n"]
-    else:
-        y_values = raw_data.vals
-        title = f"{raw_data.msid} ({raw_data.unit})"
-    if trace_title:
-        title = trace_title
+    formatted_times = format_times(raw_data)
+    y_values = raw_data.vals
+    title = trace_title or raw_data.title
 
     figure.add_traces(
         go.Scatter(
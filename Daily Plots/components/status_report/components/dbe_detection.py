@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from cxotime import CxoTime
-from components.misc import format_doy
+from components.misc import format_doy, SHARE_ROOT
 from components.status_report.components.limit_detection import (
     get_limit_reports_data)
 
@@ -42,7 +42,7 @@ def get_beat_report_dirs(user_vars):
         f"{user_vars.year_start}:{user_vars.doy_start}:000000","%Y:%j:%H%M%S")
     end_date= datetime.strptime(
         f"{user_vars.year_end}:{user_vars.doy_end}:235959","%Y:%j:%H%M%S")
-    root_folder= ("/share/FOT/engineering/ccdm/Current_CCDM_Files/"
+    root_folder= (f"{SHARE_ROOT}/FOT/engineering/ccdm/Current_CCDM_Files/"
                   "Weekly_Reports/SSR_Short_Reports/")
 
     for year_diff in range((end_date.year-start_date.year) + 1):
@@ -1,11 +1,15 @@
 "Module to detect CCDM limits"
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
 from tqdm import tqdm
 from typing import Optional
-from components.misc import format_doy
+from components.misc import format_doy, SHARE_ROOT
+
+sys.path.append(str(Path(__file__).resolve().parents[4] / "Misc Tools" / "Limits Version Control Tool"))
+from limits_history import STORE_PATH, LimitsHistory, in_force_note
 
 @dataclass
 class LimitViolationData:
@@ -35,7 +39,7 @@ def get_limit_report_dirs(user_vars):
     end_date= datetime.strptime(
         f"{user_vars.year_end}:{user_vars.doy_end}:235959","%Y:%j:%H%M%S"
         )
-    root_folder= "/share/FOT/engineering/reports/dailies/"
+    root_folder= f"{SHARE_ROOT}/FOT/engineering/reports/dailies/"
     directory_list= []
     date_diff= timedelta(days=(end_date-start_date).days)
 
@@ -104,12 +108,15 @@ def get_limit_reports_data(user_vars):
 
 def write_limit_violations(limit_reports_data, file):
     """
-    Description: Write the limit violations from a formatted dict
+    Description: Write the limit violations from a formatted dict, noting each
+                 one's state under the limits in force at the time when the
+                 local limits history exists
     Input: Report data, and file object
     Output: None
     """
     # Init previous_date
     previous_date, has_written= None, False
+    history= LimitsHistory() if STORE_PATH.exists() else None
     filtered_msids= ["CTUDWLMD"]
 
     required_entries= (
@@ -133,8 +140,11 @@ def write_limit_violations(limit_reports_data, file):
         file.write(
             f'  - ({current_time} EST): MSID "{data_point.msid}", '
             f'Status: "{data_point.status}", Measured Value: "{data_point.measured_value}" '
-            f'{data_point.operator} Expected State: "{data_point.expected_value}".\n')
+            f'{data_point.operator} Expected State: "{data_point.expected_value}".'
+            f'{in_force_note(history, data_point.msid, data_point.date, data_point.measured_value)}\n')
 
+    if history:
+        history.close()
     if not has_written:
         file.write("\n\n  - No limit violations detected \U0001F63B.\n")
 
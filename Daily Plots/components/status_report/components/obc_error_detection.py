@@ -4,7 +4,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from dataclasses import dataclass
 from tqdm import tqdm
-from components.misc import format_doy
+from components.misc import format_doy, SHARE_ROOT
 
 
 @dataclass
@@ -23,7 +23,7 @@ def get_obc_report_dirs(user_vars):
                                   "000000","%Y:%j:%H%M%S")
     end_date=   datetime.strptime(f"{user_vars.year_end}:{user_vars.doy_end}:"
                                   "235959","%Y:%j:%H%M%S")
-    root_folder= ("/share/FOT/engineering/flight_software/OBC_Error_Log_Dumps")
+    root_folder= f"{SHARE_ROOT}/FOT/engineering/flight_software/OBC_Error_Log_Dumps"
 
     full_file_list, file_list= ([] for i in range(2))
     for year_diff in range((end_date.year - start_date.year) + 1):
@@ -1,31 +1,25 @@
 "Telemetry Request Methods for Daily Plots Tools"
 
-import json
-import urllib
-from Ska.engarchive import fetch_eng as fetch
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch
+
+# Daily Plots data source -> ccdm_telemetry backend options
+DATA_SOURCES = {
+    "SKA High Rate": {"source": "cheta", "allow_subset": False},
+    "SKA Abreviated": {"source": "cheta", "allow_subset": True},
+    "MAUDE Web": {"source": "maude"},
+}
 
 
 def data_request(ts,tp,data_source,msid):
     """
-    Description: Request ska_eng archive for telemetry
-    Input: User defined variables, MSID
-    Output: dict or JSON of data
+    Description: Request telemetry from the ska_eng archive or MAUDE
+    Input: Start/stop times, data source name, MSID
+    Output: Telemetry (.times in CXC seconds, .vals)
     """
-    data, html = None, None
     ts.format = "yday"
     tp.format = "yday"
-    base_url = "https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m="
-
-    if data_source in ("SKA High Rate", "SKA Abreviated"):
-        fetch.data_source.set("maude")
-        if data_source == "SKA High Rate":
-            fetch.data_source.set("maude allow_subset=False")
-        else:
-            fetch.data_source.set("maude allow_subset=True")
-        data = fetch.MSID(f"{msid}",ts,tp)
-    else:
-        url = base_url + msid + "&ts=" +str(ts.value) + "&tp=" + str(tp.value)
-        response = urllib.request.urlopen(url)
-        html = response.read()
-
-    return data if not data_source in ("MAUDE Web") else json.loads(html)
+    return fetch(msid, ts, tp, **DATA_SOURCES[data_source])
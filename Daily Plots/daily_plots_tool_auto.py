@@ -44,5 +44,6 @@ def main():
         print("Interrupted plot generation. Canceling auto-run for today....\n")
 
 
-main()
-cleanup()
+if __name__ == "__main__":
+    main()
+    cleanup()
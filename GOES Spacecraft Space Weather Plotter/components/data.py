@@ -1,27 +1,192 @@
 "Methods to query data for the Space Weather Plotter Tool"
 
-import urllib.request
+import os
 import json
+import random
+import sqlite3
+import time
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from components.formatting import format_times
 
 
-def data_query(user_vars, dataset):
+LATIS_URL = os.environ.get(
+    "LATIS_BASE_URL", "https://lasp.colorado.edu/space-weather-portal/latis/dap/")
+CACHE_PATH = Path(os.environ.get(
+    "GOES_LATIS_CACHE", Path.home() / ".cache" / "ccdm" / "goes_latis.sqlite"))
+MAX_WORKERS = 4         # concurrent dataset queries
+MAX_ATTEMPTS = 5        # per LaTiS request
+REQUEST_TIMEOUT = 60    # sec, per LaTiS request
+BACKOFF_BASE = 2        # sec, doubled each retry, full jitter
+SETTLE_TIME = timedelta(hours=2) # a day is only cached once it ended this long ago
+
+
+class LatisStore:
+    """
+    Local SQLite store of LaTiS samples keyed by dataset and sample time.
+    Days are only marked covered once they are complete, so partial days are
+    re-fetched on the next run while settled days never are.
+    """
+    def __init__(self, path=None):
+        path = path or CACHE_PATH
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS samples (
+                dataset TEXT, time TEXT, sample TEXT, PRIMARY KEY (dataset, time));
+            CREATE TABLE IF NOT EXISTS coverage (
+                dataset TEXT, day TEXT, PRIMARY KEY (dataset, day));
+            """
+        )
+
+    def missing_days(self, dataset, days):
+        "Return the days (date objects) not yet covered for dataset"
+        covered = {
+            row[0] for row in self.connection.execute(
+                "SELECT day FROM coverage WHERE dataset = ? AND day BETWEEN ? AND ?",
+                (dataset, days[0].isoformat(), days[-1].isoformat()))
+        }
+        return [day for day in days if day.isoformat() not in covered]
+
+    def insert(self, dataset, samples, complete_days):
+        "Upsert samples and mark complete_days as covered"
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO samples VALUES (?, ?, ?)",
+                ((dataset, sample["time"], json.dumps(sample)) for sample in samples))
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO coverage VALUES (?, ?)",
+                ((dataset, day.isoformat()) for day in complete_days))
+
+    def samples(self, dataset, start, end):
+        "Return samples with start <= time <= end, ordered by time"
+        rows = self.connection.execute(
+            "SELECT sample FROM samples WHERE dataset = ? AND time BETWEEN ? AND ? "
+            "ORDER BY time", (dataset, start, end))
+        return json.loads("[" + ",".join(row[0] for row in rows) + "]")
+
+    def close(self):
+        "Close the database connection"
+        self.connection.close()
+
+
+def latis_request(dataset, start_day, end_day):
     """
-    Description: Build query URL from user inputs, request data from "Space Weather Data Portal"
+    Description: Request [start_day, end_day) of dataset from LaTiS with a
+                 per-request timeout and jittered exponential backoff
     Output: JSON of data
     """
-    print(f"""   - Querying for "{dataset}" space weather data...""")
-    base_url = "https://lasp.colorado.edu/space-weather-portal/latis/dap/"
-    start_date = user_vars.start_date.strftime("%Y-%m-%d")
-    end_date = user_vars.end_date.strftime("%Y-%m-%d")
-    query_url = base_url + (
-        f"{dataset}.json?time%3E={start_date}"
-        f"&time%3C={end_date}&formatTime(yyyy-MM-dd%20HH:mm)"
+    query_url = LATIS_URL + (
+        f"{dataset}.json?time%3E={start_day.isoformat()}"
+        f"&time%3C{end_day.isoformat()}&formatTime(yyyy-MM-dd%20HH:mm)"
     )
-    while True:
+    for attempt in range(MAX_ATTEMPTS):
         try:
-            response = urllib.request.urlopen(query_url)
-            html = response.read()
-            break
-        except TimeoutError:
-            print("Query attempt failed, trying again...")
-    return json.loads(html)
+            with urllib.request.urlopen(query_url, timeout=REQUEST_TIMEOUT) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as error:
+            # 4xx means a bad dataset or query, which a retry won't fix
+            if isinstance(error, urllib.error.HTTPError) and error.code < 500:
+                raise
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            delay = random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+            print(f"     - Query attempt failed ({error}), trying again in {delay:.1f} sec...")
+            time.sleep(delay)
+
+
+def contiguous_runs(days):
+    "Group sorted days into (first_day, last_day) runs of consecutive days"
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def cached_query(dataset, start_date, end_date):
+    """
+    Description: Return dataset samples from start_date to end_date, only
+                 requesting the days not already held in the local store
+    Output: JSON of data
+    """
+    first_day = start_date.date()
+    days = [first_day + timedelta(days=i) for i in range((end_date.date() - first_day).days + 1)]
+    settled = datetime.now(timezone.utc).replace(tzinfo=None) - SETTLE_TIME
+    store = LatisStore()
+
+    try:
+        for gap_start, gap_end in contiguous_runs(store.missing_days(dataset, days)):
+            print(f"     - Fetching \"{dataset}\" {gap_start} to {gap_end}...")
+            gap_end = gap_end + timedelta(days=1)
+            payload = latis_request(dataset, gap_start, gap_end)
+            gap_days = [gap_start + timedelta(days=i) for i in range((gap_end - gap_start).days)]
+            complete_days = [
+                day for day in gap_days
+                if datetime.combine(day + timedelta(days=1), datetime.min.time()) <= settled
+            ]
+            store.insert(dataset, payload[dataset]["samples"], complete_days)
+
+        samples = store.samples(
+            dataset, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d 00:00"))
+    finally:
+        store.close()
+
+    return {dataset: {"samples": samples}}
+
+
+def fetch_datasets(user_vars, datasets):
+    """
+    Description: Query every dataset concurrently (bounded by MAX_WORKERS) and
+                 save the results to user_vars.latis_data for data_query
+    Output: None
+    """
+    print(f"""   - Querying for {len(datasets)} space weather datasets...""")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = pool.map(
+            lambda dataset: cached_query(dataset, user_vars.start_date, user_vars.end_date),
+            datasets)
+        user_vars.latis_data = dict(zip(datasets, results))
+
+
+def data_query(user_vars, dataset):
+    """
+    Description: Return a dataset for the user's date range, from the results
+                 of fetch_datasets if present, otherwise from the local store
+    Output: JSON of data
+    """
+    prefetched = getattr(user_vars, "latis_data", {})
+    if dataset in prefetched:
+        return prefetched[dataset]
+
+    print(f"""   - Querying for "{dataset}" space weather data...""")
+    return cached_query(dataset, user_vars.start_date, user_vars.end_date)
+
+
+def decode_samples(payload, dataset, fields):
+    """
+    Description: Columnar decode of a LaTiS response into a DataFrame with a
+                 datetime "time" column and one float column per field
+    Output: pandas DataFrame
+    """
+    frame = pd.DataFrame.from_records(
+        payload[dataset]["samples"], columns=["time", *fields])
+    frame["time"] = format_times(frame["time"])
+    frame[fields] = frame[fields].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    return frame
+
+
+def data_frame(user_vars, dataset, fields):
+    """
+    Description: Query a dataset and decode it into columns
+    Output: pandas DataFrame
+    """
+    return decode_samples(data_query(user_vars, dataset), dataset, fields)
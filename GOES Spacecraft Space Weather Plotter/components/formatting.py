@@ -1,18 +1,11 @@
 "Methods to format things for the Space Weather Plotter Tool"
 
-from datetime import datetime
+import pandas as pd
 
 
 def format_times(times_list):
-    "Formats a list of time into a plottable format."
-    input_format = "%Y-%m-%d %H:%M"
-    formatted_times = []
-
-    for time_item in times_list:
-        new_list_item = datetime.strptime(time_item, input_format)
-        formatted_times.append(new_list_item)
-
-    return formatted_times
+    "Formats a list of LaTiS time strings into a plottable format in one vectorized parse."
+    return pd.to_datetime(times_list, format="%Y-%m-%d %H:%M")
 
 
 def format_plot_axes(user_vars, figure, yaxis_titles):
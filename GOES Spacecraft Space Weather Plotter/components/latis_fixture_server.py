@@ -0,0 +1,221 @@
+"""
+Local LaTiS stand-in for running the Space Weather Plotter data path offline.
+
+Replays recorded LaTiS JSON responses (<dataset>.json in a fixture directory)
+or, when none is recorded, synthesizes deterministic samples at each
+dataset's real cadence. Only the time range filters the tool uses are honored.
+
+Usage (from the tool directory):
+    python -m components.latis_fixture_server --serve 8765 [--fixtures DIR]
+    python -m components.latis_fixture_server --benchmark [--days 30]
+    python -m components.latis_fixture_server --parse-benchmark [--samples 1000000]
+"""
+
+import argparse
+import json
+import math
+import tempfile
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+
+# dataset: (cadence in minutes, sample fields)
+FIXTURE_DATASETS = {
+    "goesp_part_flux_P5M": (5, ["P1", "P5", "P10", "P30", "P50", "P60", "P100", "P500",
+                                "E_8", "E2_0", "E4_0"]),
+    "goesp_xray_flux_P1M": (1, ["Short_Wave", "Long_Wave"]),
+    "goess_mag_p1m": (1, ["Hp", "He", "Hn"]),
+    "kp": (180, ["kp_value"]),
+}
+TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+
+def parse_time_filters(query):
+    "Return (start, end, end_inclusive) from a LaTiS query string"
+    start, end, inclusive = datetime(1998, 1, 1), datetime(2100, 1, 1), False
+    for term in query.split("&"):
+        term = urllib.parse.unquote(term)
+        for operator in (">=", "<=", ">", "<"):
+            if term.startswith(f"time{operator}"):
+                value = datetime.fromisoformat(term[len(operator) + 4:].replace(" ", "T"))
+                if operator.startswith(">"):
+                    start = value
+                else:
+                    end, inclusive = value, operator == "<="
+                break
+    return start, end, inclusive
+
+
+def synthesize_samples(dataset, start, end, inclusive):
+    "Deterministic samples for dataset over the requested range"
+    cadence, fields = FIXTURE_DATASETS[dataset]
+    step = timedelta(minutes=cadence)
+    sample_time = datetime.min + ((start - datetime.min) // step) * step
+    if sample_time < start:
+        sample_time += step
+    samples = []
+
+    while sample_time < end or (inclusive and sample_time == end):
+        minute = int(sample_time.timestamp() // 60)
+        sample = {"time": sample_time.strftime(TIME_FORMAT)}
+        for index, field in enumerate(fields):
+            sample[field] = abs(math.sin(minute / 720 + index)) * 10 ** (index % 4)
+        samples.append(sample)
+        sample_time += step
+    return samples
+
+
+class LatisFixtureServer:
+    "Threaded HTTP server that answers <dataset>.json LaTiS queries"
+
+    def __init__(self, port=0, fixture_dir=None, latency=0.0):
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self.latency = latency
+        self.request_count = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        "LaTiS base URL to point components.data at"
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def start(self):
+        "Start serving in a background thread"
+        self.thread.start()
+        return self
+
+    def stop(self):
+        "Stop serving and release the port"
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def samples(self, dataset, query):
+        "Recorded samples when a fixture exists, synthetic ones otherwise"
+        start, end, inclusive = parse_time_filters(query)
+        recorded = self.fixture_dir / f"{dataset}.json" if self.fixture_dir else None
+
+        if recorded is not None and recorded.exists():
+            with open(recorded, "r", encoding="utf-8") as file:
+                all_samples = json.load(file)[dataset]["samples"]
+            lower = start.strftime(TIME_FORMAT)
+            upper = end.strftime(TIME_FORMAT)
+            return [
+                sample for sample in all_samples
+                if lower <= sample["time"] and
+                (sample["time"] < upper or (inclusive and sample["time"] == upper))
+            ]
+        return synthesize_samples(dataset, start, end, inclusive)
+
+    def _handler(self):
+        "Build the request handler class bound to this server"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            "Serves /<dataset>.json?<LaTiS query>"
+
+            def do_GET(self):
+                path, _, query = self.path.lstrip("/").partition("?")
+                dataset = path[:-len(".json")] if path.endswith(".json") else None
+                if dataset not in FIXTURE_DATASETS:
+                    self.send_error(404, f"Unknown dataset {path}")
+                    return
+
+                with server.lock:
+                    server.request_count += 1
+                time.sleep(server.latency)
+                body = json.dumps(
+                    {dataset: {"samples": server.samples(dataset, query)}}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass
+
+        return Handler
+
+
+def benchmark(days=14, latency=0.2, fixture_dir=None):
+    "Time a cold and a warm fetch of every dataset against the fixture server"
+    from components import data # pylint: disable=import-outside-toplevel
+
+    class BenchmarkVars:
+        "Stand-in for the tool's UserVars"
+        end_date = datetime.now() - timedelta(days=2)
+        start_date = end_date - timedelta(days=days)
+
+    server = LatisFixtureServer(fixture_dir=fixture_dir, latency=latency).start()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        data.LATIS_URL = server.base_url
+        data.CACHE_PATH = Path(cache_dir) / "goes_latis.sqlite"
+        try:
+            for run in ("cold", "warm"):
+                count_before = server.request_count
+                user_vars = BenchmarkVars()
+                run_start = time.perf_counter()
+                data.fetch_datasets(user_vars, list(FIXTURE_DATASETS))
+                elapsed = time.perf_counter() - run_start
+                samples = sum(
+                    len(result[name]["samples"]) for name, result in user_vars.latis_data.items())
+                print(f" - {run}: {elapsed:.3f} sec, "
+                      f"{server.request_count - count_before} requests, {samples} samples")
+        finally:
+            server.stop()
+
+
+def parse_benchmark(sample_count=1_000_000):
+    "Report columnar decode time per million samples for every fixture dataset"
+    from components import data # pylint: disable=import-outside-toplevel
+
+    for dataset, (cadence, fields) in FIXTURE_DATASETS.items():
+        start = datetime(2000, 1, 1)
+        end = start + timedelta(minutes=cadence * sample_count)
+        payload = {dataset: {"samples": synthesize_samples(dataset, start, end, False)}}
+
+        run_start = time.perf_counter()
+        frame = data.decode_samples(payload, dataset, fields)
+        elapsed = time.perf_counter() - run_start
+        print(f" - {dataset}: {len(frame)} samples x {len(fields)} fields, "
+              f"{elapsed * 1e6 / len(frame):.3f} sec per million samples")
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="Offline LaTiS fixture server")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Serve fixtures on PORT")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark the data path")
+    parser.add_argument("--parse-benchmark", action="store_true",
+                        help="Benchmark the columnar LaTiS decoder")
+    parser.add_argument("--samples", type=int, default=1_000_000,
+                        help="Samples per dataset for --parse-benchmark")
+    parser.add_argument("--fixtures", help="Directory of recorded <dataset>.json responses")
+    parser.add_argument("--days", type=int, default=14, help="Benchmark lookback in days")
+    parser.add_argument("--latency", type=float, default=0.2, help="Added sec per request")
+    args = parser.parse_args()
+
+    if args.parse_benchmark:
+        parse_benchmark(args.samples)
+    elif args.benchmark:
+        benchmark(args.days, args.latency, args.fixtures)
+    elif args.serve is not None:
+        server = LatisFixtureServer(args.serve, args.fixtures, args.latency).start()
+        print(f"Serving LaTiS fixtures at {server.base_url} (set LATIS_BASE_URL to use it)")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -47,13 +47,3 @@ def write_html_file(user_vars, figure, auto = False):
     figure.write_html(f"{output_dir}/{figure_title}.html")
     print(f""" - Done! Data written to "{output_dir}{figure_title}.html" in output directory.""")
 
-
-def check_data_validity(data):
-    """
-    Description: Check that data is valid
-    Input: Data point
-    Output: Data point or zero if data not valid
-    """
-    if data >= 0:
-        return data
-    return 0
@@ -1,8 +1,6 @@
 "Methods to add the X-Ray Flux Data to plot"
 
-from components.data import data_query
-from components.formatting import format_times
-from components.misc import check_data_validity
+from components.data import data_frame
 from components.plotting import add_plot_trace
 
 
@@ -11,16 +9,10 @@ def add_xray_flux_data(user_vars, figure, row):
     Working On It
     """
     print(" - Adding X-Ray Flux Data...")
-    xray_short_wave, xray_long_wave, times = ([] for i in range(3))
-    goes_xray_data = data_query(user_vars, "goesp_xray_flux_P1M")
+    goes_xray_data = data_frame(user_vars, "goesp_xray_flux_P1M", ["Short_Wave", "Long_Wave"])
 
-    print("   - Formatting data...")
-    for list_item in goes_xray_data['goesp_xray_flux_P1M']['samples']:
-        times.append(list_item['time'])
-        xray_short_wave.append(float(list_item['Short_Wave']))
-        xray_long_wave.append(float(list_item['Long_Wave']))
-
-    formatted_times = format_times(times)
     print("   - Adding data to plot traces...")
-    add_plot_trace(figure, formatted_times, xray_short_wave, "X-Ray Flux (Short Wave)", row)
-    add_plot_trace(figure, formatted_times, xray_long_wave, "X-Ray Flux (Long Wave)", row)
+    add_plot_trace(
+        figure, goes_xray_data["time"], goes_xray_data["Short_Wave"], "X-Ray Flux (Short Wave)", row)
+    add_plot_trace(
+        figure, goes_xray_data["time"], goes_xray_data["Long_Wave"], "X-Ray Flux (Long Wave)", row)
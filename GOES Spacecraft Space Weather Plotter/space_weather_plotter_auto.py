@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from os import system
 from plotly import subplots
 from components.misc import write_html_file
+from components.data import fetch_datasets
 from components.formatting import format_plot_axes
 from components.particle_flux_data import add_particle_flux_data
 from components.xray_flux_data import add_xray_flux_data
@@ -48,6 +49,7 @@ def generate_plot(user_vars):
         specs = [[{"secondary_y": True}] for i in range(len(yaxis_titles.keys()))]
     )
 
+    fetch_datasets(user_vars, ["goesp_part_flux_P5M", "goesp_xray_flux_P1M", "goess_mag_p1m"])
     add_particle_flux_data(user_vars, figure, 1, 2)
     add_xray_flux_data(user_vars, figure, 3)
     add_magnetometer_data(user_vars, figure, 4)
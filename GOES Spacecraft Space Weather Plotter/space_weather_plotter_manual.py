@@ -5,6 +5,7 @@ from os import system
 from datetime import datetime
 from plotly import subplots
 from components.misc import write_html_file
+from components.data import fetch_datasets
 from components.formatting import format_plot_axes
 from components.particle_flux_data import add_particle_flux_data
 from components.xray_flux_data import add_xray_flux_data
@@ -112,6 +113,7 @@ def generate_plot(user_vars):
     )
     data = DataObject()
 
+    fetch_datasets(user_vars, ["goesp_part_flux_P5M", "goesp_xray_flux_P1M", "goess_mag_p1m", "kp"])
     add_particle_flux_data(user_vars, figure, 1, 2)
     add_xray_flux_data(user_vars, figure, 3)
     add_magnetometer_data(user_vars, figure, 4)
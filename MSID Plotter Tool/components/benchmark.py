@@ -0,0 +1,86 @@
+"""
+Offline benchmark for the MSID Plotter fetch/render pipeline.
+
+Runs the real fetch_stage/render_stage against synthetic MAUDE Web samples
+(with simulated request latency) and fails if the run exceeds its budget.
+
+Usage (from the tool directory):
+    python -m components.benchmark [--msids 30] [--days 30] [--budget 20]
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+from components.plot import fetch_stage, render_stage
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import Telemetry, maude_to_secs
+
+
+def synthetic_request(start, days, period, latency):
+    "Build a data_request stand-in decoding MAUDE Web shaped samples (integer times, text values)"
+    count = int(days * 86400 / period)
+    offsets = np.arange(count) * period
+
+    # Build integer MAUDE times (YYYYDDDHHMMSSmmm) without a per-sample strftime
+    day_index = offsets // 86400
+    seconds = offsets % 86400
+    years = np.full(count, start.year, dtype=np.int64)
+    doy = start.timetuple().tm_yday + day_index.astype(np.int64)
+    times = (
+        years * 10**12 + doy * 10**9 + (seconds // 3600).astype(np.int64) * 10**7
+        + ((seconds % 3600) // 60).astype(np.int64) * 10**5
+        + (seconds % 60).astype(np.int64) * 10**3
+    )
+
+    def request(user_vars, msid): # pylint: disable=unused-argument
+        time.sleep(latency)
+        values = np.sin(offsets / 5000 + hash(msid) % 7) * 100
+        return Telemetry(msid, maude_to_secs(times), values.astype(str), source="maude")
+
+    return request, count
+
+
+class BenchmarkVars:
+    "Stand-in for the tool's UserVariables"
+    data_source = "MAUDE Web"
+    plot_title = "MSID Plotter Benchmark"
+
+    def __init__(self, msid_count):
+        self.msids = [f"BENCH{index:03d}" for index in range(msid_count)]
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="MSID Plotter pipeline benchmark")
+    parser.add_argument("--msids", type=int, default=30, help="Number of MSIDs")
+    parser.add_argument("--days", type=float, default=30, help="Days per MSID (max 365)")
+    parser.add_argument("--period", type=float, default=32.8, help="Sample period (sec)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Simulated sec per request")
+    parser.add_argument("--budget", type=float, default=20, help="Allowed wall time (sec)")
+    args = parser.parse_args()
+
+    start = datetime(2024, 1, 1)
+    request, count = synthetic_request(start, args.days, args.period, args.latency)
+    user_vars = BenchmarkVars(args.msids)
+
+    run_start = time.perf_counter()
+    results = fetch_stage(user_vars, request)
+    fetched = time.perf_counter()
+    plot = render_stage(results, user_vars)
+    rendered = time.perf_counter()
+    points = sum(len(trace.x) for trace in plot.data)
+
+    print(f" - {args.msids} MSIDs x {count} samples: fetch+decode {fetched - run_start:.2f} sec, "
+          f"render {rendered - fetched:.2f} sec, {points} plotted points")
+    total = rendered - run_start
+    if total > args.budget:
+        sys.exit(f" - FAIL: {total:.2f} sec exceeds the {args.budget:.2f} sec budget")
+    print(f" - PASS: {total:.2f} sec within the {args.budget:.2f} sec budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,55 @@
 "Misc Data Methods for MSID Plotter Tool"
 
-import json
+import sys
 import urllib.request
-from Ska.engarchive import fetch_eng as fetch
+import urllib.error
+from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch
 
-def check_msid_validity(msid_input):
+# MSID Plotter data source -> ccdm_telemetry backend options
+DATA_SOURCES = {
+    "High Rate SKA": {"source": "cheta", "allow_subset": False},
+    "Abbreviated SKA": {"source": "cheta", "allow_subset": True},
+    "MAUDE Web": {"source": "maude"},
+}
+
+
+def probe_msids(msids):
     """
-    Description: Check if an MSID is valid. Do a mini MAUDE url request on MSID.
-    Input: MSID
-    Output: True/False
+    Description: Check unknown MSIDs against MAUDE with one batched request.
+                 If MAUDE rejects the batch, halve it to find the bad names.
+    Input: List of MSIDs
+    Output: Set of valid MSIDs, None if MAUDE could not be reached
     """
+    query = "&".join(f"m={msid}" for msid in msids)
     url = (
         f"https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/"
-        f"msid.json?m={msid_input}&ts=2024:001:00:00:00.000&tp=2024:001:00:00:05.000"
+        f"msids.json?{query}&ts=2024:001:00:00:00.000&tp=2024:001:00:00:05.000"
     )
     try:
-        urllib.request.urlopen(url)
-        return True
-    except BaseException:
-        return False
+        with urllib.request.urlopen(url):
+            return set(msids)
+    except urllib.error.HTTPError as error:
+        if error.code >= 500:
+            return None
+        if len(msids) == 1:
+            return set()
+        half = len(msids) // 2
+        first, second = probe_msids(msids[:half]), probe_msids(msids[half:])
+        if first is None or second is None:
+            return None
+        return first | second
+    except (urllib.error.URLError, OSError, ValueError):
+        return None
 
 
 def data_request(user_vars,msid):
     """
-    Description: Data request for a general timeframe and MSID, returns json or data dict
+    Description: Data request for a general timeframe and MSID
     Input: User Variables, MSID
-    Output: Data dict or JSON
+    Output: Telemetry (.times in CXC seconds, .vals)
     """
     print(f"  - Requesting {user_vars.data_source} data for {msid}...")
-    user_vars.ts.format = "yday"
-    user_vars.tp.format = "yday"
-    base_url = "https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m="
-
-    if user_vars.data_source in ("High Rate SKA","Abbreviated SKA"):
-        fetch.data_source.set("maude")
-        if user_vars.data_source in ("High Rate SKA"):
-            fetch.data_source.set("maude allow_subset=False")
-        else:
-            fetch.data_source.set("maude allow_subset=True")
-        data = fetch.MSID(f"{msid}",user_vars.ts,user_vars.tp)
-    else:
-        url = base_url + msid + "&ts=" +str(user_vars.ts.value) + "&tp=" + str(user_vars.tp.value)
-        response = urllib.request.urlopen(url)
-        html = response.read()
-
-    return data if not user_vars.data_source in ("MAUDE Web") else json.loads(html)
+    return fetch(msid, user_vars.ts, user_vars.tp, **DATA_SOURCES[user_vars.data_source])
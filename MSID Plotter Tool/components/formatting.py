@@ -1,27 +1,5 @@
 "Formatting Methods for MSID Plotter Tool"
 
-from tqdm import tqdm
-from cxotime import CxoTime
-
-
-def format_times(raw_data, user_vars):
-    "Formats a list of time into a plottable format."
-    print("  - Formatting Data...")
-    formated_times = []
-
-    if user_vars.data_source in "MAUDE Web":
-        times_list = raw_data["data-fmt-1"]["times"]
-        time_format = "maude"
-    else:
-        times_list = raw_data.times
-        time_format = None
-
-    for time_item in tqdm(times_list, bar_format = "{l_bar}{bar:20}{r_bar}{bar:-10b}"):
-        new_list_item = CxoTime(time_item, format=time_format)
-        formated_times.append(new_list_item.datetime)
-
-    return formated_times
-
 
 def format_plot_axes(plot, user_vars):
     """
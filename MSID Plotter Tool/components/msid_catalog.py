@@ -0,0 +1,137 @@
+"Local MSID Catalog Methods for MSID Plotter Tool"
+
+import difflib
+import os
+import sqlite3
+import time
+from pathlib import Path
+from components.data import probe_msids
+
+
+CATALOG_PATH = Path(os.environ.get(
+    "MSID_CATALOG", Path.home() / ".cache" / "ccdm" / "msid_catalog.sqlite"))
+CATALOG_TTL = 7 * 86400 # sec, rebuild the catalog when older than this
+CATALOG_RETRY = 3600    # sec, wait between rebuild attempts that found no metadata (offline)
+
+
+def build_catalog_rows():
+    """
+    Description: Build catalog rows from the TDB (names, units, descriptions,
+                 state codes) and the cheta archive content (availability)
+    Output: {msid: [units, description, state_codes, sources]}
+    """
+    rows = {}
+
+    try:
+        from Ska.tdb import tables # pylint: disable=import-outside-toplevel
+        for row in tables["tmsrment"].data:
+            rows[str(row["MSID"]).strip().upper()] = [
+                str(row["ENG_UNIT"]).strip(), str(row["TECHNICAL_NAME"]).strip(), "", "maude"]
+        state_codes = {}
+        for row in tables["tsc"].data:
+            state_codes.setdefault(str(row["MSID"]).strip().upper(), []).append(
+                str(row["STATE_CODE"]).strip())
+        for msid, codes in state_codes.items():
+            if msid in rows:
+                rows[msid][2] = ",".join(codes)
+    except (ImportError, KeyError) as error:
+        print(f" - Warning! TDB metadata unavailable ({error}).")
+
+    try:
+        from Ska.engarchive import fetch_eng as fetch # pylint: disable=import-outside-toplevel
+        for msid in fetch.content:
+            entry = rows.setdefault(msid.upper(), ["", "", "", ""])
+            entry[3] = ",".join(filter(None, [entry[3], "cheta"]))
+    except (ImportError, AttributeError) as error:
+        print(f" - Warning! cheta archive content unavailable ({error}).")
+
+    return rows
+
+
+class MsidCatalog:
+    """
+    SQLite catalog of MSID name, units, description, state codes and source
+    availability. Validates whole MSID lists in one lookup.
+    """
+    def __init__(self, path=None, ttl=CATALOG_TTL, retry=CATALOG_RETRY):
+        path = path or CATALOG_PATH
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS msids (
+                msid TEXT PRIMARY KEY, units TEXT, description TEXT,
+                state_codes TEXT, sources TEXT);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+        self.names = None
+        meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+        now = time.time()
+        if (now - float(meta.get("built", 0)) > ttl
+                and now - float(meta.get("attempted", 0)) > retry):
+            self.refresh()
+
+    def refresh(self):
+        "Rebuild the catalog from the metadata sources"
+        print(" - Building local MSID catalog...")
+        rows = build_catalog_rows()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('attempted', ?)", (str(time.time()),))
+        if not rows:
+            print(" - No MSID metadata found, keeping the current catalog until the next attempt.")
+            return # keep whatever stale catalog exists
+        with self.connection:
+            self.connection.execute("DELETE FROM msids")
+            self.connection.executemany(
+                "INSERT INTO msids VALUES (?, ?, ?, ?, ?)",
+                ((msid, *values) for msid, values in rows.items()))
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('built', ?)", (str(time.time()),))
+        self.names = None
+
+    def lookup(self, msids):
+        "Return {msid: (units, description, state_codes, sources)} for known MSIDs"
+        msids = [msid.upper() for msid in msids]
+        rows = self.connection.execute(
+            f"SELECT * FROM msids WHERE msid IN ({','.join('?' * len(msids))})", msids)
+        return {row[0]: row[1:] for row in rows}
+
+    def suggestions(self, msid, count=3):
+        "Return close MSID names for a 'did you mean' prompt"
+        if self.names is None:
+            self.names = [row[0] for row in self.connection.execute("SELECT msid FROM msids")]
+        return difflib.get_close_matches(msid.upper(), self.names, n=count, cutoff=0.75)
+
+    def validate(self, msids):
+        """
+        Description: Validate a list of MSIDs with one catalog lookup. Names not
+                     in the catalog get one batched MAUDE probe; if MAUDE is
+                     unreachable they are passed through unchecked.
+        Output: list of valid MSIDs (input order), {invalid msid: [suggestions]}
+        """
+        msids = [msid.upper() for msid in msids]
+        known = self.lookup(msids)
+        unknown = [msid for msid in msids if msid not in known]
+        confirmed = probe_msids(unknown) if unknown else set()
+
+        if confirmed is None:
+            # Can't tell bad names from an unreachable MAUDE, so don't reject them
+            print(f" - MAUDE is unavailable, could not check {', '.join(unknown)} "
+                  "against it. Continuing with them unchecked.")
+            return msids, {}
+
+        if confirmed:
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO msids VALUES (?, '', '', '', 'maude')",
+                    ((msid,) for msid in confirmed))
+            self.names = None
+
+        valid = [msid for msid in msids if msid in known or msid in confirmed]
+        invalid = {
+            msid: self.suggestions(msid) for msid in msids
+            if msid not in known and msid not in confirmed
+        }
+        return valid, invalid
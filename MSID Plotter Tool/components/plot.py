@@ -1,43 +1,101 @@
 "Plotting Methods for MSID Plotter Tool"
 
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import plotly.graph_objects as go
 from plotly import subplots
-from components.formatting import format_times, format_plot_axes
+from components.formatting import format_plot_axes
 from components.data import data_request
 
 
-def generate_plot(user_vars):
+MAX_WORKERS = 6         # concurrent MSID requests
+PLOT_WIDTH_PX = 1920    # traces are downsampled to about this many columns
+
+
+def fetch_msid(user_vars, msid, request=data_request):
     """
-    Description: Generates plot using user inputed variables for MSIDs
-    Input: User Variables
+    Description: Request and decode one MSID
+    Input: User Variables, MSID, request function
+    Output: (times, values, trace title)
+    """
+    raw_data = request(user_vars, msid)
+    return raw_data.datetime64, raw_data.vals, raw_data.title
+
+
+def fetch_stage(user_vars, request=data_request):
+    """
+    Description: Fan the MSID requests out over a bounded thread pool
+    Input: User Variables, request function
+    Output: [(times, values, trace title)] in user_vars.msids order
+    """
+    workers = max(1, min(MAX_WORKERS, len(user_vars.msids)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(
+            lambda msid: fetch_msid(user_vars, msid, request), user_vars.msids))
+
+
+def downsample(times, values, width=PLOT_WIDTH_PX):
+    """
+    Description: Min/max decimation to about width buckets, so spikes survive
+                 while the trace carries no more points than the plot can show
+    Input: times, values arrays
+    Output: times, values arrays
+    """
+    if len(values) <= 2 * width or values.dtype.kind != "f":
+        return times, values
+
+    bucket = len(values) // width
+    usable = bucket * width
+    buckets = values[:usable].reshape(width, bucket)
+    filled = np.where(np.isnan(buckets), np.nanmean(values), buckets)
+    offsets = np.arange(width) * bucket
+    keep = np.unique(np.concatenate((
+        offsets + filled.argmin(axis=1),
+        offsets + filled.argmax(axis=1),
+        np.arange(usable, len(values)),
+    )))
+    return times[keep], values[keep]
+
+
+def render_stage(results, user_vars):
+    """
+    Description: Build the shared-axis figure from decoded MSID data in one call
+    Input: [(times, values, trace title)], User Variables
     Output: Plot object
     """
-    print("""\nGenerating plot ("ctrl + c" to cancel)...""")
-    plot = subplots.make_subplots(
-        rows = len(user_vars.msids), shared_xaxes = "columns",
-        specs = [[{}] for i in range(len(user_vars.msids))], vertical_spacing = 0.05)
-
-    for index, (msid) in enumerate(user_vars.msids):
-        raw_data = data_request(user_vars, msid)
-        formated_times = format_times(raw_data, user_vars)
-
-        if user_vars.data_source in "MAUDE Web":
-            y_values = [eval(i) for i in (raw_data["data-fmt-1"]["values"])]
-            title = raw_data["data-fmt-1"]["n"]
-        else:
-            y_values = raw_data.vals
-            title = f"{raw_data.msid} ({raw_data.unit})"
-
-        plot.add_trace(
+    rows = len(user_vars.msids)
+    layout = subplots.make_subplots(
+        rows = rows, shared_xaxes = "columns", specs = [[{}] for i in range(rows)],
+        vertical_spacing = min(0.05, 0.5 / max(1, rows - 1))).layout
+
+    traces = []
+    for index, (times, values, title) in enumerate(results):
+        times, values = downsample(times, values)
+        axis = "" if index == 0 else index + 1
+        traces.append(
             go.Scatter(
-                x = formated_times,
-                y = y_values,
+                x = times,
+                y = values,
                 mode = "lines",
                 name = title,
-            ),
-            row = index + 1, col = 1,
+                xaxis = f"x{axis}",
+                yaxis = f"y{axis}",
             )
+        )
 
+    plot = go.Figure(data = traces, layout = layout)
     format_plot_axes(plot, user_vars)
-
     return plot
+
+
+def generate_plot(user_vars):
+    """
+    Description: Generates plot using user inputed variables for MSIDs
+    Input: User Variables
+    Output: Plot object
+    """
+    print("""\nGenerating plot ("ctrl + c" to cancel)...""")
+    results = fetch_stage(user_vars)
+    print("  - Formatting Data...")
+    return render_stage(results, user_vars)
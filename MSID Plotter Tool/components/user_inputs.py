@@ -4,7 +4,7 @@ import dataclasses
 import time
 from os import system
 from components.formatting import get_titles
-from components.data import check_msid_validity
+from components.msid_catalog import MsidCatalog
 from cxotime import CxoTime
 
 
@@ -59,39 +59,50 @@ def get_user_inputs(user_vars, state):
 
 def get_msids():
     """
-    Description: Build list of MSIDs from user inputs
-    Input: User input string of MSID
+    Description: Build list of MSIDs from user inputs, validated as one batch
+    Input: User input string of MSID(s)
     Output: List of inputted MSIDs
     """
     print("Enter the MSIDs you wish to plot, press ENTER after each MSID inputted. "
-            "MSID1 -> enter, MSIDx -> enter\n"
+            "MSID1 -> enter, MSIDx -> enter (or MSID1, MSID2 -> enter)\n"
             """-- A blank input will finish inputing MSID(s). --\n""")
+    catalog = MsidCatalog()
     msid_list = []
 
     while True:
-        msid_input = input("Enter MSID: ").upper()
+        pending = []
 
-        # Checking if user ending input of MSID(s)
-        if msid_input in ("") and (len(msid_list) != 0):
-            break
+        while True:
+            msid_input = input("Enter MSID: ").upper().replace(",", " ").split()
+
+            # Checking if user ending input of MSID(s)
+            if not msid_input and (msid_list or pending):
+                break
 
-        # Check input for blank MSID input
-        if (msid_input in ("")) and (len(msid_list) == 0):
-            print(" - Error! You must enter at least one MSID...\n")
+            # Check input for blank MSID input
+            if not msid_input:
+                print(" - Error! You must enter at least one MSID...\n")
 
-        # Check if input is a duplicate MSID input
-        elif msid_input in msid_list:
-            print(f""" - Error! MSID "{msid_input}" was already entered...\n""")
+            for msid in msid_input:
+                # Check if input is a duplicate MSID input
+                if msid in msid_list or msid in pending:
+                    print(f""" - Error! MSID "{msid}" was already entered...\n""")
+                else:
+                    pending.append(msid)
 
-        # Check if an input is NOT an MSID
-        elif not check_msid_validity(msid_input):
-            print(f""" - Error! "{msid_input}" was an invalid MSID input """
-                  "\U0001F62D. Please try again.\n"
-                )
+        # Check all new inputs against the catalog in one lookup
+        valid, invalid = catalog.validate(pending)
+        msid_list.extend(valid)
 
-        # Check if input is a valid MSID, if so save input
-        elif check_msid_validity(msid_input):
-            msid_list.append(msid_input)
+        for msid, suggestions in invalid.items():
+            print(f""" - Error! "{msid}" was an invalid MSID input \U0001F62D.""", end="")
+            if suggestions:
+                print(f""" Did you mean: {", ".join(suggestions)}?""", end="")
+            print()
+
+        if not invalid:
+            break
+        print(" - Please re-enter the invalid MSID(s), or a blank input to continue.\n")
 
     return msid_list
 
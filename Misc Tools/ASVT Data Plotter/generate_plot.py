@@ -1,50 +1,146 @@
 "Module to build plotly object from ASVT data txt file"
 
-from datetime import datetime
-from itertools import islice
+import os
+from pathlib import Path
+import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
-class DataPoint:
-    "A blank dataclass used to store data point attributes"
+CHUNK_ROWS = 200_000        # log lines parsed per read_csv chunk
+TIME_FORMAT = "%Y%j.%H%M%S%f"
 
-def build_plot(self):
-    "build a ploty figure from the ASVT data txt file"
-    data_list= []
 
-    with open(self.selected_file, "r") as f:
-        # Read header
-        msids= f.readline().split()[1:]
+class PlotCancelled(Exception):
+    "Raised between chunks when the caller cancels a load"
+
+
+def read_msids(path):
+    "Return the MSID names from the ASVT data file header"
+    with open(path, "r", encoding="utf-8") as f:
+        return f.readline().split()[1:]
+
+
+def sidecar_path(path):
+    "Parquet sidecar for path, keyed by the file's size and mtime"
+    stat = os.stat(path)
+    path = Path(path)
+    return path.with_name(f".{path.name}.{stat.st_size}-{stat.st_mtime_ns}.parquet")
+
+
+def read_sidecar(path):
+    "Return the cached columns for path, or an empty frame if none are cached"
+    sidecar = sidecar_path(path)
+    if sidecar.exists():
+        try:
+            return pd.read_parquet(sidecar)
+        except (ImportError, ValueError, OSError):
+            pass
+    return pd.DataFrame()
+
+
+def write_sidecar(path, frame):
+    """
+    Cache frame next to path and remove sidecars left by older versions of the
+    file. Written to a temp file renamed into place, so a killed run never
+    leaves a truncated sidecar; a directory we can't write to just runs uncached.
+    """
+    sidecar = sidecar_path(path)
+    temp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+    try:
+        for stale in sidecar.parent.glob(f".{Path(path).name}.*.parquet"):
+            if stale != sidecar:
+                stale.unlink(missing_ok=True)
+        frame.to_parquet(temp_path, index=False)
+        os.replace(temp_path, sidecar)
+    except (ImportError, TypeError, ValueError, OSError):
+        # no parquet engine, mixed column types or a read-only/shared directory
+        try:
+            temp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
 
-        while True:
-            lines = list(islice(f, 10000))
-            if not lines:
-                break
+def decode_column(values):
+    "Float column when every value is numeric, otherwise keep the raw strings"
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().sum() == values.isna().sum():
+        return numeric.astype("float64")
+    return values
 
-            for line in lines:
-                data_line= line.split()
-                data_point= DataPoint()
-                data_point.datetime= datetime.strptime(data_line[0], "%Y%j.%H%M%S%f")
 
-                for msid, num in zip(msids, range(1, len(msids)*2, 2)):
-                    try:
-                        setattr(data_point, msid, float(data_line[num]))
-                    except ValueError:
-                        setattr(data_point, msid, data_line[num])
+def iter_chunks(path, msids, chunk_rows=CHUNK_ROWS):
+    """
+    Description: Stream the time column and the selected MSID columns from the
+                 ASVT data file in chunks, without touching the other columns
+    Input: File path, list of MSIDs to parse, rows per chunk
+    Output: Yields (DataFrame chunk, byte offset read so far, file size in bytes)
+    """
+    header = read_msids(path)
+    # Each MSID occupies two columns after the time stamp, the value is the first
+    columns = {0: "datetime", **{header.index(msid) * 2 + 1: msid for msid in msids}}
+    file_size = os.path.getsize(path)
 
-                data_list.append(data_point)
+    with open(path, "rb") as f:
+        reader = pd.read_csv(
+            f, sep=r"\s+", header=None, skiprows=1, usecols=list(columns),
+            dtype=str, chunksize=chunk_rows, engine="c")
+        for chunk in reader:
+            chunk = chunk.rename(columns=columns)[list(columns.values())]
+            chunk["datetime"] = pd.to_datetime(chunk["datetime"], format=TIME_FORMAT)
+            for msid in msids:
+                chunk[msid] = decode_column(chunk[msid])
+            yield chunk, min(f.tell(), file_size), file_size
+
+
+def load_columns(path, msids=None, progress=None, cancelled=None):
+    """
+    Description: Return the time column and the selected MSID columns, parsing
+                 only the columns not already held in the parquet sidecar
+    Input: File path, list of MSIDs (all MSIDs in the file if None),
+           progress(chunks so far, byte offset, file size) called per chunk,
+           cancelled() checked between chunks
+    Output: DataFrame with a "datetime" column and one column per MSID
+    """
+    msids = msids or read_msids(path)
+    cached = read_sidecar(path)
+    missing = [msid for msid in msids if msid not in cached.columns]
+
+    if missing:
+        chunks = []
+        for chunk, offset, file_size in iter_chunks(path, missing):
+            if cancelled is not None and cancelled():
+                raise PlotCancelled()
+            chunks.append(chunk)
+            if progress is not None:
+                progress(chunks, offset, file_size)
+        parsed = pd.concat(chunks, ignore_index=True)
+        if cached.empty:
+            cached = parsed
+        else:
+            cached = pd.concat([cached, parsed.drop(columns="datetime")], axis=1)
+        write_sidecar(path, cached)
+
+    return cached[["datetime", *msids]]
+
+
+def build_figure(data, msids, max_points=None):
+    "build a ploty figure from parsed columns, decimated to max_points per trace if given"
+    if max_points and len(data) > max_points:
+        data = data.iloc[::-(-len(data) // max_points)]
 
-    # Access data from data_list and plot
     fig= make_subplots(rows= len(msids), cols= 1, shared_xaxes= True, subplot_titles= msids)
 
     for i, (msid) in enumerate(msids):
-        x, y= ([] for i in range(2))
-        for data_point in data_list:
-            x.append(getattr(data_point, "datetime"))
-            y.append(getattr(data_point, msid))
-
-        fig.add_trace(go.Scatter(x= x, y= y, mode='lines', name= msid), row= i + 1, col=1)
+        fig.add_trace(
+            go.Scatter(x= data["datetime"], y= data[msid], mode='lines', name= msid),
+            row= i + 1, col=1)
 
     fig.update_layout(autosize= True, showlegend= True)
 
     return fig
+
+
+def build_plot(self):
+    "build a ploty figure from the ASVT data txt file"
+    msids = getattr(self, "selected_msids", None) or read_msids(self.selected_file)
+    return build_figure(load_columns(self.selected_file, msids), msids)
@@ -1,17 +1,22 @@
 import sys
 import tempfile
 import threading
+import time
 from pathlib import Path
 import plotly.graph_objs as go
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QPushButton, QLabel,
     QVBoxLayout, QHBoxLayout, QFileDialog, QSizePolicy,
-    QTextEdit, QProgressBar
+    QTextEdit, QProgressBar, QListWidget, QAbstractItemView
 )
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtCore import Qt, QUrl, pyqtSignal, QObject, QThread
 from PyQt5.QtGui import QMovie
-from generate_plot import build_plot
+import pandas as pd
+from generate_plot import build_figure, load_columns, read_msids, PlotCancelled
+
+PREVIEW_INTERVAL = 3    # sec between incremental preview figures
+PREVIEW_POINTS = 5000   # points per trace in a preview figure
 
 
 class DataPoint:
@@ -30,21 +35,41 @@ class WorkerSignals(QObject):
 # -------------------------------------------------------
 class PlotWorker(QThread):
     finished = pyqtSignal(object)
+    preview = pyqtSignal(object)    # downsampled figure of the rows read so far
+    progress = pyqtSignal(int)      # percent of the file's bytes read
     error = pyqtSignal(str)
 
     def __init__(self, gui):
         super().__init__()
-        self.gui = gui
+        self.selected_file = gui.selected_file
+        self.selected_msids = list(gui.selected_msids)
         self._cancel = False
+        self._last_preview = 0
+
+    def on_chunk(self, chunks, offset, file_size):
+        "Report byte progress and push a throttled preview of the rows read so far"
+        self.progress.emit(5 + int(85 * offset / max(file_size, 1)))
+
+        if time.monotonic() - self._last_preview < PREVIEW_INTERVAL:
+            return
+        partial = pd.concat(chunks, ignore_index=True)
+        msids = [msid for msid in self.selected_msids if msid in partial.columns]
+        self.preview.emit(build_figure(partial, msids, PREVIEW_POINTS))
+        self._last_preview = time.monotonic()
 
     def run(self):
         try:
+            self.selected_msids = self.selected_msids or read_msids(self.selected_file)
+            self._last_preview = time.monotonic()
+            data = load_columns(
+                self.selected_file, self.selected_msids,
+                progress=self.on_chunk, cancelled=lambda: self._cancel)
             if self._cancel:
                 return
-            fig = build_plot(self.gui)
-            if self._cancel:
-                return
-            self.finished.emit(fig)
+            self.progress.emit(95)
+            self.finished.emit(build_figure(data, self.selected_msids))
+        except PlotCancelled:
+            pass
         except Exception as e:
             self.error.emit(str(e))
 
@@ -59,6 +84,7 @@ class FileLoaderApp(QWidget):
     def __init__(self):
         super().__init__()
         self.selected_file = None
+        self.selected_msids = []
         self.worker = None
         self.signals = WorkerSignals()
         self.signals.finished.connect(self.plot_ready)
@@ -103,6 +129,11 @@ class FileLoaderApp(QWidget):
         self.spinner.setAlignment(Qt.AlignCenter)
         self.spinner.setVisible(False)
 
+        # MSID selection (nothing selected plots every MSID)
+        self.msid_list = QListWidget()
+        self.msid_list.setSelectionMode(QAbstractItemView.MultiSelection)
+        self.msid_list.setFixedWidth(200)
+
         # Web view (Plot)
         self.plot_view = QWebEngineView()
         self.plot_view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
@@ -190,7 +221,10 @@ class FileLoaderApp(QWidget):
 
         main.addLayout(top)
         main.addWidget(self.spinner)
-        main.addWidget(self.plot_view, stretch=1)
+        plot_row = QHBoxLayout()
+        plot_row.addWidget(self.msid_list)
+        plot_row.addWidget(self.plot_view, stretch=1)
+        main.addLayout(plot_row, stretch=1)
         main.addWidget(self.progress)
         main.addWidget(self.console)
         main.addLayout(buttons)
@@ -206,6 +240,8 @@ class FileLoaderApp(QWidget):
             self.selected_file = file
             self.label.setText(f"Loaded: {file}")
             self.log(f"[INFO] File selected: {file}")
+            self.msid_list.clear()
+            self.msid_list.addItems(read_msids(file))
 
     # ---------------------------------------------------
     # START THREAD
@@ -215,6 +251,7 @@ class FileLoaderApp(QWidget):
             self.log("[ERROR] No file selected.")
             return
 
+        self.selected_msids = [item.text() for item in self.msid_list.selectedItems()]
         self.log("[INFO] Starting plot generation...")
 
         self.spinner.setVisible(True)
@@ -222,18 +259,24 @@ class FileLoaderApp(QWidget):
         self.progress.setValue(5)
 
         # Use QThread-based worker
+        self.cancel_worker(quiet=True)
         self.worker = PlotWorker(self)
         self.worker.finished.connect(self.plot_ready)
+        self.worker.preview.connect(self.plot_preview)
+        self.worker.progress.connect(self.plot_progress)
         self.worker.error.connect(self.plot_error)
         self.worker.start()
 
     # ---------------------------------------------------
     # CANCEL THREAD
     # ---------------------------------------------------
-    def cancel_worker(self):
+    def cancel_worker(self, quiet=False):
         if self.worker:
             self.worker.cancel()
-            self.worker.wait()  # ensures the thread stops safely
+            self.worker.wait()  # returns within one chunk of the cancel
+            self.worker = None  # signals still queued from it are ignored
+            if quiet:
+                return
             self.log("[WARNING] Operation cancelled.")
             self.spinner_movie.stop()
             self.spinner.setVisible(False)
@@ -243,8 +286,30 @@ class FileLoaderApp(QWidget):
     # WORKER FINISHED
     # ---------------------------------------------------
     def plot_ready(self, fig):
+        if self.sender() is not self.worker:
+            return
         self.log("[SUCCESS] Plot generated.")
+        self.show_figure(fig)
+
+        self.spinner_movie.stop()
+        self.spinner.setVisible(False)
+        self.progress.setValue(100)
+
+    # ---------------------------------------------------
+    # WORKER PROGRESS
+    # ---------------------------------------------------
+    def plot_preview(self, fig):
+        if self.sender() is self.worker:
+            self.show_figure(fig)
+
+    def plot_progress(self, value):
+        if self.sender() is self.worker:
+            self.progress.setValue(value)
 
+    # ---------------------------------------------------
+    # DISPLAY FIGURE
+    # ---------------------------------------------------
+    def show_figure(self, fig):
         # Delete previous temp file if it exists
         if hasattr(self, 'current_temp_file') and self.current_temp_file:
             try:
@@ -271,20 +336,18 @@ class FileLoaderApp(QWidget):
         """
 
         # Write to disk
-        with open(temp_path, "w", encoding="utf-8") as f:
+        with open(fd, "w", encoding="utf-8") as f:  # closes the mkstemp handle
             f.write(html_content)
 
-        # Load into QWebEngineView
+        # Load into QWebEngineView from disk, avoiding the setHtml size limit
         self.plot_view.load(QUrl.fromLocalFile(temp_path))
 
-        self.spinner_movie.stop()
-        self.spinner.setVisible(False)
-        self.progress.setValue(100)
-
     # ---------------------------------------------------
     # WORKER ERROR
     # ---------------------------------------------------
     def plot_error(self, msg):
+        if self.sender() is not self.worker:
+            return
         self.log(f"[ERROR] Failed to generate plot: {msg}")
         self.spinner_movie.stop()
         self.spinner.setVisible(False)
@@ -0,0 +1,24 @@
+"""
+CCDM telemetry access shared by the tools: one fetch() over pluggable
+MAUDE / cheta backends, returning columnar NumPy arrays.
+
+    from ccdm_telemetry import fetch
+    data = fetch("COBSRQID", "2024:100", "2024:101", source="maude")
+    data.times, data.vals      # CXC seconds, values
+
+iFOT events go through a local store that only fetches uncovered intervals:
+
+    from ccdm_telemetry import events
+    passes = events("PASSPLAN", "2024:100", "2024:107")
+    passes.tstart, passes.ts_bot, passes.eot
+"""
+
+from .backends import BACKENDS, MaudeBackend, ChetaBackend, ArrayBackend, register_backend
+from .cache import TelemetryStore
+from .core import fetch, latest
+from .events import EventStore, EventTable, events
+from .ifot import EVENT_TYPES, record_fixture
+from .pool import TelemetryError, FetchCancelled, HTTPStatusError
+from .telemetry import Telemetry
+from .times import (maude_to_datetime64, maude_to_secs, datetime64_to_secs, secs_to_datetime64,
+                    secs_to_yday, to_secs)
@@ -0,0 +1,142 @@
+"""
+Telemetry backends. Each one fetches a single MSID over [start, stop) in CXC
+seconds and returns a Telemetry; fetch() looks them up by name in BACKENDS,
+so tools can register their own (register_backend) for stand-in data.
+"""
+
+import os
+import threading
+import numpy as np
+from .pool import FetchCancelled, TelemetryError, get_json, MAX_ATTEMPTS, REQUEST_TIMEOUT
+from .times import maude_to_secs, secs_to_yday
+from .telemetry import Telemetry
+
+try:
+    from cheta import fetch_eng
+except ImportError: # older Ska3 installs only ship the Ska.engarchive name
+    try:
+        from Ska.engarchive import fetch_eng
+    except ImportError: # MAUDE-only installs
+        fetch_eng = None
+
+MAUDE_URL = os.environ.get("MAUDE_BASE_URL", "https://occweb.cfa.harvard.edu/maude/mrest/")
+MAX_PAGES = 10000   # safety stop for all-points paging
+
+
+class MaudeBackend:
+    """
+    MAUDE REST web service (msid.json). allow_subset=False requests all points
+    (ap=t) and pages forward until the window is covered; otherwise MAUDE
+    returns a subsample sized to the window.
+    """
+    name = "maude"
+
+    def url(self, msid, start=None, stop=None, channel="FLIGHT", allow_subset=True,
+            base_url=None):
+        query = f"m={msid}"
+        if start is not None:
+            start_text, stop_text = secs_to_yday([start, stop])
+            query += f"&ts={start_text}&tp={stop_text}"
+        if not allow_subset:
+            query += "&ap=t"
+        return f"{base_url or MAUDE_URL}{channel.upper()}/msid.json?{query}"
+
+    def cacheable(self, allow_subset=True, **_):
+        "Only full resolution data is independent of the query window"
+        return not allow_subset
+
+    def request(self, url, timeout, attempts, cancelled):
+        data = get_json(url, timeout, attempts, cancelled).get("data-fmt-1", {})
+        return (np.asarray(data.get("times", []), dtype=np.int64),
+                np.asarray(data.get("values", [])), data.get("n"))
+
+    def fetch(self, msid, start, stop, *, channel="FLIGHT", allow_subset=True, base_url=None,
+              timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS, cancelled=None, **_):
+        times, vals, pages = [], [], 0
+        page_start = start
+        while pages < MAX_PAGES:
+            if cancelled is not None and cancelled.is_set():
+                raise FetchCancelled(msid)
+            url = self.url(msid, page_start, stop, channel, allow_subset, base_url)
+            page_times, page_vals, _ = self.request(url, timeout, attempts, cancelled)
+            page_secs = maude_to_secs(page_times)
+            if times: # pages restart at the last time already held
+                keep = page_secs > times[-1][-1]
+                page_secs, page_vals = page_secs[keep], page_vals[keep]
+            if not len(page_secs):
+                break
+            times.append(page_secs)
+            vals.append(page_vals)
+            pages += 1
+            if allow_subset or page_secs[-1] >= stop:
+                break
+            page_start = page_secs[-1]
+        return Telemetry.from_parts(msid, times, vals, source=self.name)
+
+    def latest(self, msid, *, channel="FLIGHT", base_url=None, timeout=REQUEST_TIMEOUT,
+               attempts=MAX_ATTEMPTS, **_):
+        "The most recent sample(s) MAUDE holds for msid"
+        url = self.url(msid, channel=channel, base_url=base_url)
+        times, vals, _ = self.request(url, timeout, attempts, None)
+        return Telemetry(msid, maude_to_secs(times), vals, source=self.name)
+
+
+class ChetaBackend:
+    """
+    cheta / Ska.engarchive fetch_eng. data_source is a cheta data source
+    ("cxc", "maude", ...); for "maude" allow_subset is passed on. cheta keeps
+    the data source in module state, so fetches through it are serialized.
+    """
+    name = "cheta"
+    lock = threading.Lock()
+
+    def cacheable(self, data_source="maude", allow_subset=True, **_):
+        "The cxc archive is already local, only full resolution MAUDE data is worth caching"
+        return data_source == "maude" and not allow_subset
+
+    def fetch(self, msid, start, stop, *, data_source="maude", allow_subset=True,
+              filter_bad=False, **_):
+        if fetch_eng is None:
+            raise TelemetryError("cheta (Ska.engarchive) is not installed")
+        if data_source == "maude":
+            data_source = f"maude allow_subset={allow_subset}"
+        with self.lock, fetch_eng.data_source(data_source):
+            cls = fetch_eng.Msid if filter_bad else fetch_eng.MSID
+            data = cls(msid, start, stop)
+        return Telemetry(msid, data.times, data.vals, unit=data.unit, source=self.name)
+
+
+class ArrayBackend:
+    """
+    In-memory backend over {msid: (times, vals)} with times in CXC seconds,
+    for stand-in data and benchmarks.
+    """
+    name = "array"
+
+    def __init__(self, series=None):
+        self.series = {}
+        for msid, (times, vals) in (series or {}).items():
+            self.add(msid, times, vals)
+
+    def add(self, msid, times, vals):
+        times = np.asarray(times, dtype=np.float64)
+        order = np.argsort(times, kind="stable")
+        self.series[msid.upper()] = (times[order], np.asarray(vals)[order])
+
+    def cacheable(self, **_):
+        return False
+
+    def fetch(self, msid, start, stop, **_):
+        if msid.upper() not in self.series:
+            raise TelemetryError(f"No stand-in data for {msid}")
+        times, vals = self.series[msid.upper()]
+        first, last = np.searchsorted(times, [start, stop])
+        return Telemetry(msid, times[first:last], vals[first:last], source=self.name)
+
+
+BACKENDS = {"maude": MaudeBackend(), "cheta": ChetaBackend()}
+
+
+def register_backend(name, backend):
+    "Make backend available as fetch(..., source=name)"
+    BACKENDS[name] = backend
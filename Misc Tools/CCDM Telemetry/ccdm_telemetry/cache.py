@@ -0,0 +1,75 @@
+"""
+Persistent on-disk cache of settled telemetry days: one SQLite row per
+(backend options, MSID, UTC day) holding the day's times and values as .npy
+blobs. Days are only stored once they ended SETTLE_TIME ago, so late and
+back-filled telemetry is still picked up while it can change.
+"""
+
+import io
+import os
+import sqlite3
+import threading
+from pathlib import Path
+import numpy as np
+from .telemetry import Telemetry
+
+CACHE_PATH = Path(os.environ.get(
+    "TELEMETRY_CACHE", Path.home() / ".cache" / "ccdm" / "telemetry.sqlite"))
+SETTLE_TIME = 86400     # sec, a day is only cached once it ended this long ago
+DAY = 86400
+
+
+def to_blob(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def from_blob(blob):
+    return np.load(io.BytesIO(blob), allow_pickle=False)
+
+
+class TelemetryStore:
+    "SQLite store of whole-day Telemetry, shared by the fetch worker threads"
+    def __init__(self, path=None):
+        self.path = Path(path or CACHE_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS days (
+                    key TEXT, msid TEXT, day TEXT, times BLOB, vals BLOB, unit TEXT,
+                    PRIMARY KEY (key, msid, day))
+                """)
+
+    def get_days(self, key, msid, days):
+        "Return {day: Telemetry} for the days (ISO date strings) held for key/msid"
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT day, times, vals, unit FROM days "
+                "WHERE key = ? AND msid = ? AND day BETWEEN ? AND ?",
+                (key, msid, days[0], days[-1])).fetchall()
+        return {day: Telemetry(msid, from_blob(times), from_blob(vals), unit, "cache")
+                for day, times, vals, unit in rows if day in days}
+
+    def put_days(self, key, msid, telemetry_by_day):
+        "Store {day: Telemetry}"
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?, ?)",
+                ((key, msid, day, to_blob(data.times), to_blob(data.vals), data.unit)
+                 for day, data in telemetry_by_day.items()))
+
+    def clear(self, key=None):
+        "Drop every cached day, or only those of one backend key"
+        with self.lock, self.connection:
+            if key is None:
+                self.connection.execute("DELETE FROM days")
+            else:
+                self.connection.execute("DELETE FROM days WHERE key = ?", (key,))
+
+    def close(self):
+        "Close the database connection"
+        self.connection.close()
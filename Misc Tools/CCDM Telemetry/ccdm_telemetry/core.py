@@ -0,0 +1,183 @@
+"fetch() / latest(): backend selection, cache planning and resampling"
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import numpy as np
+from .backends import BACKENDS
+from .cache import TelemetryStore, SETTLE_TIME
+from .pool import FetchCancelled, TelemetryError
+from .telemetry import Telemetry
+from .times import to_secs, datetime64_to_secs, secs_to_datetime64
+
+MAX_WORKERS = 6     # concurrent backend requests per fetch()
+# Options that change how a request runs but not what it returns
+RUN_OPTIONS = ("cancelled", "timeout", "attempts", "base_url")
+
+STORES = {}
+
+
+def get_backend(source):
+    if source not in BACKENDS:
+        raise TelemetryError(f"Unknown telemetry source {source!r} (known: {sorted(BACKENDS)})")
+    return BACKENDS[source]
+
+
+def get_store(cache):
+    "True = the default store, a path = the store at that path, a store as is, else None"
+    if not cache:
+        return None
+    if isinstance(cache, TelemetryStore):
+        return cache
+    path = None if cache is True else Path(cache)
+    if path not in STORES:
+        STORES[path] = TelemetryStore(path)
+    return STORES[path]
+
+
+def cache_key(source, options):
+    "Key of the backend options that change the data returned"
+    return ",".join([source] + [f"{name}={value}" for name, value in sorted(options.items())
+                                if name not in RUN_OPTIONS])
+
+
+def settled_days(start, stop):
+    """
+    Description: UTC days lying wholly inside [start, stop) that ended at
+                 least SETTLE_TIME ago
+    Output: list of (ISO day, day start, day end) with times in CXC seconds
+    """
+    first = secs_to_datetime64(start).astype("datetime64[D]")
+    last = secs_to_datetime64(stop).astype("datetime64[D]")
+    days = np.arange(first, last + 1)
+    starts, ends = datetime64_to_secs(days), datetime64_to_secs(days + 1)
+    settled = datetime64_to_secs(np.datetime64("now", "us")) - SETTLE_TIME
+    keep = (starts >= start) & (ends <= min(stop, settled))
+    return [(str(day), day_start, day_end)
+            for day, day_start, day_end in zip(days[keep], starts[keep], ends[keep])]
+
+
+def plan_segments(start, stop, days, held):
+    """
+    Description: Split [start, stop) into the requests still needed: the
+                 partial edges, plus each run of consecutive days not held
+    Output: list of (segment start, segment end, days to store from it)
+    """
+    if not days:
+        return [(start, stop, [])]
+    segments = []
+    if start < days[0][1]:
+        segments.append((start, days[0][1], []))
+    for day in days:
+        if day[0] in held:
+            continue
+        if segments and segments[-1][2] and segments[-1][1] == day[1]:
+            segments[-1] = (segments[-1][0], day[2], segments[-1][2] + [day])
+        else:
+            segments.append((day[1], day[2], [day]))
+    if days[-1][2] < stop:
+        segments.append((days[-1][2], stop, []))
+    return segments
+
+
+def split_days(data, days):
+    "{day: Telemetry} of a segment's samples, split on day boundaries"
+    bounds = np.searchsorted(data.times, [[day_start, day_end] for _, day_start, day_end in days])
+    return {day: data.select(slice(first, last)) for (day, _, _), (first, last) in zip(days, bounds)}
+
+
+def join(msid, pieces, start, stop, source):
+    "Concatenate time-ordered pieces, trimmed to [start, stop)"
+    pieces = [piece for piece in pieces if len(piece)]
+    unit = next((piece.unit for piece in pieces if piece.unit), None)
+    data = Telemetry.from_parts(msid, [piece.times for piece in pieces],
+                                [piece.vals for piece in pieces], unit, source)
+    order = np.argsort(data.times, kind="stable")
+    data = data.select(order)
+    first, last = np.searchsorted(data.times, [start, stop])
+    return data.select(slice(first, last))
+
+
+def resample_to(data, grid):
+    """
+    Sample-and-hold onto grid (CXC seconds). Grid points before the first
+    sample hold NaN (numeric) or "" (state codes).
+    """
+    index = np.searchsorted(data.times, grid, side="right") - 1
+    if data.vals.dtype.kind == "f":
+        vals = np.where(index >= 0, data.vals[np.maximum(index, 0)] if len(data) else np.nan, np.nan)
+    else:
+        vals = np.where(index >= 0, data.vals[np.maximum(index, 0)] if len(data) else "", "")
+    return Telemetry(data.msid, grid, vals, data.unit, data.source)
+
+
+def fetch(msids, start, stop, *, source="maude", resample=None, cache=True, **options):
+    """
+    Description: Fetch one or more MSIDs over [start, stop)
+    Input: MSID or list of MSIDs; start/stop as CxoTime, datetime (naive =
+           UTC), datetime64, date string or CXC seconds; backend name
+           ("maude", "cheta" or a registered one); optional resample step in
+           seconds (sample-and-hold onto a common grid); cache (True = the
+           default store, a path, a TelemetryStore, or False); backend options:
+               maude: channel="FLIGHT", allow_subset=True, base_url,
+                      timeout, attempts, cancelled (threading.Event)
+               cheta: data_source="maude" (or "cxc", ...), allow_subset=True,
+                      filter_bad=False
+    Output: Telemetry for a single MSID, {msid: Telemetry} for a list.
+            TelemetryError (FetchCancelled on cancel) on failure
+    """
+    single = isinstance(msids, str)
+    msid_list = [msids] if single else list(msids)
+    start, stop = to_secs(start), to_secs(stop)
+    backend = get_backend(source)
+    store = get_store(cache) if backend.cacheable(**options) else None
+    key = cache_key(source, options)
+    cancelled = options.get("cancelled")
+
+    plans = {}
+    for msid in msid_list:
+        days = settled_days(start, stop) if store else []
+        held = store.get_days(key, msid.upper(), [day for day, _, _ in days]) if days else {}
+        plans[msid] = (days, held, plan_segments(start, stop, days, held))
+
+    def run(msid, segment):
+        if cancelled is not None and cancelled.is_set():
+            raise FetchCancelled(msid)
+        data = backend.fetch(msid, segment[0], segment[1], **options)
+        if segment[2]:
+            store.put_days(key, msid.upper(), split_days(data, segment[2]))
+        return data
+
+    tasks = [(msid, segment) for msid in msid_list for segment in plans[msid][2]]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        futures = [pool.submit(run, msid, segment) for msid, segment in tasks]
+        try:
+            results = [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    fetched = {}
+    for (msid, _), data in zip(tasks, results):
+        fetched.setdefault(msid, []).append(data)
+    grid = np.arange(start, stop, resample) if resample else None
+    output = {}
+    for msid in msid_list:
+        held = plans[msid][1]
+        data = join(msid, list(held.values()) + fetched.get(msid, []), start, stop, source)
+        output[msid] = data if grid is None else resample_to(data, grid)
+    return output[msids] if single else output
+
+
+def latest(msids, *, source="maude", **options):
+    """
+    Description: Most recent sample(s) of one or more MSIDs (MAUDE only)
+    Output: Telemetry, or {msid: Telemetry} for a list
+    """
+    backend = get_backend(source)
+    if not hasattr(backend, "latest"):
+        raise TelemetryError(f"Source {source!r} has no latest value lookup")
+    if isinstance(msids, str):
+        return backend.latest(msids, **options)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        return dict(zip(msids, pool.map(lambda msid: backend.latest(msid, **options), msids)))
@@ -0,0 +1,214 @@
+"""
+Local store of iFOT events keyed by event type and start time. events() only
+asks iFOT for the parts of a window the store does not cover yet and returns
+an EventTable: typed columns sorted by start time, with indexed interval
+lookups.
+
+A fetched interval stays covered for good when it had already ended
+SETTLE_TIME before the fetch (playback status and DRs are filled in after the
+fact); more recent intervals are only trusted for FRESH_TIME.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+import numpy as np
+from . import ifot
+from .ifot import column_types, request_events
+from .times import to_secs, datetime64_to_secs, secs_to_yday
+
+EVENTS_PATH = Path(os.environ.get(
+    "IFOT_CACHE", Path.home() / ".cache" / "ccdm" / "ifot_events.sqlite"))
+SETTLE_TIME = 3 * 86400    # sec, events are final once they started this long ago
+FRESH_TIME = 600           # sec, how long a fetch of unsettled events is reused
+
+EVENT_STORES = {}
+
+
+def now_secs():
+    "Current time in CXC seconds"
+    return float(datetime64_to_secs(np.datetime64("now", "us")))
+
+
+class EventTable:
+    """
+    Events of one iFOT type sorted by tstart. Columns (see ifot.EVENT_TYPES)
+    are NumPy arrays, reachable as table["name"] or table.name; times are CXC
+    seconds.
+    """
+    def __init__(self, event, columns):
+        self.event = event
+        order = np.argsort(columns["tstart"], kind="stable")
+        self.columns = {name: np.asarray(values)[order] for name, values in columns.items()}
+
+    def __len__(self):
+        return len(self.columns["tstart"])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def __repr__(self):
+        return f"<EventTable {self.event} n={len(self)}>"
+
+    def select(self, mask):
+        "An EventTable holding only the events selected by mask (bool array, index array or slice)"
+        return EventTable(self.event, {name: values[mask] for name, values in self.columns.items()})
+
+    def between(self, start, stop):
+        "Events starting within [start, stop)"
+        first, last = np.searchsorted(self.tstart, [to_secs(start), to_secs(stop)])
+        return self.select(slice(first, last))
+
+    def containing(self, times) -> np.ndarray:
+        "Index of the latest event whose [tstart, tstop) holds each time (CXC seconds), -1 for none"
+        times = np.asarray(times, dtype=np.float64)
+        index = np.searchsorted(self.tstart, times, side="right") - 1
+        inside = (index >= 0) & (times < self.tstop[np.maximum(index, 0)]) if len(self) else False
+        return np.where(inside, index, -1)
+
+    def to_frame(self, columns=None):
+        "pandas DataFrame of the events, times as 'YYYY:DDD:HH:MM:SS.sss' strings"
+        import pandas as pd # pylint: disable=import-outside-toplevel
+        types = column_types(self.event)
+        frame = {}
+        for name in columns or self.columns:
+            values = self.columns[name]
+            if types[name] == "time":
+                text = np.full(len(values), "", dtype=object)
+                known = np.isfinite(values)
+                text[known] = secs_to_yday(values[known]) if known.any() else []
+                values = text
+            frame[name] = values
+        return pd.DataFrame(frame)
+
+
+class EventStore:
+    "SQLite store of iFOT events and of the intervals already fetched per event type"
+    def __init__(self, path=None):
+        self.path = Path(path or EVENTS_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.connection:
+            self.connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS events (
+                    event TEXT, id TEXT, tstart REAL, row TEXT, PRIMARY KEY (event, id));
+                CREATE INDEX IF NOT EXISTS events_by_time ON events (event, tstart);
+                CREATE TABLE IF NOT EXISTS coverage (
+                    event TEXT, start REAL, stop REAL, expires REAL);
+                """)
+
+    def missing(self, event, start, stop, now):
+        "Parts of [start, stop) not covered for event at time now, as (start, stop) pairs"
+        with self.lock:
+            covered = self.connection.execute(
+                "SELECT start, stop FROM coverage WHERE event = ? AND stop > ? AND start < ? "
+                "AND (expires IS NULL OR expires > ?) ORDER BY start",
+                (event, start, stop, now)).fetchall()
+        gaps, cursor = [], start
+        for covered_start, covered_stop in covered:
+            if covered_start > cursor:
+                gaps.append((cursor, min(covered_start, stop)))
+            cursor = max(cursor, covered_stop)
+        if cursor < stop:
+            gaps.append((cursor, stop))
+        return gaps
+
+    def put(self, event, start, stop, columns, now, settle_time=SETTLE_TIME, fresh_time=FRESH_TIME):
+        "Replace the events of [start, stop) with columns and mark the interval covered"
+        types = column_types(event)
+        rows = []
+        for values in zip(*(columns[name] for name in types)):
+            row = {name: (None if kind == "time" and not np.isfinite(value) else
+                          float(value) if kind == "time" else str(value))
+                   for (name, kind), value in zip(types.items(), values)}
+            key = row["id"] or json.dumps(row, sort_keys=True)
+            rows.append((event, key, row["tstart"], json.dumps(row)))
+
+        settled = min(stop, now - settle_time)
+        coverage = []
+        if settled > start:
+            coverage.append((event, start, settled, None))
+        if stop > max(start, settled):
+            coverage.append((event, max(start, settled), stop, now + fresh_time))
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM events WHERE event = ? AND tstart >= ? AND tstart < ?", (event, start, stop))
+            self.connection.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?)", rows)
+            self.connection.execute("DELETE FROM coverage WHERE expires IS NOT NULL AND expires <= ?",
+                                    (now,))
+            self.connection.executemany("INSERT INTO coverage VALUES (?, ?, ?, ?)", coverage)
+
+    def get(self, event, start, stop):
+        "{column: np.ndarray} of the stored events starting within [start, stop)"
+        with self.lock:
+            rows = [json.loads(row) for row, in self.connection.execute(
+                "SELECT row FROM events WHERE event = ? AND tstart >= ? AND tstart < ? ORDER BY tstart",
+                (event, start, stop))]
+        columns = {}
+        for name, kind in column_types(event).items():
+            if kind == "time":
+                columns[name] = np.array([np.nan if row[name] is None else row[name] for row in rows],
+                                         dtype=np.float64)
+            else:
+                columns[name] = np.array([row[name] for row in rows], dtype=str)
+        return columns
+
+    def clear(self, event=None):
+        "Drop every stored event and coverage interval, or only those of one event type"
+        with self.lock, self.connection:
+            for table in ("events", "coverage"):
+                if event is None:
+                    self.connection.execute(f"DELETE FROM {table}")
+                else:
+                    self.connection.execute(f"DELETE FROM {table} WHERE event = ?", (event,))
+
+    def close(self):
+        "Close the database connection"
+        self.connection.close()
+
+
+def get_event_store(cache):
+    "True = the default store, a path = the store at that path, a store as is, else None"
+    if not cache:
+        return None
+    if isinstance(cache, EventStore):
+        return cache
+    path = None if cache is True else Path(cache)
+    if path not in EVENT_STORES:
+        EVENT_STORES[path] = EventStore(path)
+    return EVENT_STORES[path]
+
+
+def events(event, start, stop, *, cache=True, fixtures=None, base_url=None, **options):
+    """
+    Description: iFOT events of one type starting within [start, stop)
+    Input: event type (a key of ifot.EVENT_TYPES); start/stop as for fetch();
+           cache (True = the default store, a path, an EventStore, or False);
+           fixtures: directory of recorded <EVENT>.html pages to read instead
+           of iFOT (offline mode, also set by IFOT_FIXTURES; not cached);
+           base_url, timeout, attempts for the iFOT requests
+    Output: EventTable. TelemetryError on failure
+    """
+    start, stop = to_secs(start), to_secs(stop)
+    column_types(event)
+    fixtures = fixtures or ifot.FIXTURE_DIR
+    store = None if fixtures else get_event_store(cache)
+    if store is None:
+        return EventTable(event, request_events(event, start, stop, base_url=base_url,
+                                                fixtures=fixtures, **options))
+
+    now = now_secs()
+    for gap_start, gap_stop in store.missing(event, start, stop, now):
+        columns = request_events(event, gap_start, gap_stop, base_url=base_url, **options)
+        store.put(event, gap_start, gap_stop, columns, now)
+    return EventTable(event, store.get(event, start, stop))
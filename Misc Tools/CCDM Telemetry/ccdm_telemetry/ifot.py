@@ -0,0 +1,136 @@
+"""
+iFOT event source: builds ifot.php list queries and parses the returned HTML
+table into typed columns. Each event type has a schema (EVENT_TYPES); every
+event also carries the STANDARD_COLUMNS. Times are CXC seconds (NaN where iFOT
+leaves a time blank), text columns are str arrays.
+
+iFOT list tables hold the requested columns first, then the event's
+properties in the order named in the query.
+"""
+
+import os
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np
+from .pool import TelemetryError, get_text, MAX_ATTEMPTS, REQUEST_TIMEOUT
+from .times import parse_date, datetime64_to_secs, secs_to_yday
+
+IFOT_URL = os.environ.get(
+    "IFOT_BASE_URL", "https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php")
+FIXTURE_DIR = os.environ.get("IFOT_FIXTURES")    # offline mode: recorded <EVENT>.html tables
+
+STANDARD_COLUMNS = {"id": "str", "tstart": "time", "tstop": "time", "type_desc": "str"}
+# event type: {iFOT property: column type}
+EVENT_TYPES = {
+    "PASSPLAN": {"sched_support_time": "str", "ts_bot": "time", "eot": "str"},
+    "PLAYBACK_BCW": {"ssr": "str", "playback_status": "str", "ts_ssr_start_pb": "time",
+                     "status_comment": "str"},
+    "DSN_DR": {"problem": "str"},
+    "OBS": {"MODE": "str"},
+    "BIAS": {},
+}
+# Extra query terms some event types were always requested with
+EVENT_PARAMS = {"DSN_DR": "&op=properties"}
+
+
+def column_types(event):
+    "{column name: type} of an event type, column names lower case"
+    if event not in EVENT_TYPES:
+        raise TelemetryError(f"Unknown iFOT event type {event!r} (known: {sorted(EVENT_TYPES)})")
+    return {**STANDARD_COLUMNS, **{name.lower(): kind for name, kind in EVENT_TYPES[event].items()}}
+
+
+def query_url(event, start, stop, base_url=None):
+    "ifot.php list query for event over [start, stop] (CXC seconds)"
+    start_text, stop_text = secs_to_yday([start, stop])
+    selector = f"{event}.{'.'.join(EVENT_TYPES[event])}"
+    return (f"{base_url or IFOT_URL}?r=home&t=qserver&a=show&format=list&size=auto"
+            f"&columns={','.join(STANDARD_COLUMNS)}&e={quote(selector)}{EVENT_PARAMS.get(event, '')}"
+            f"&tstart={start_text}&tstop={stop_text}&ul=12")
+
+
+class TableParser(HTMLParser):
+    "Cell text of every <table> in a page, as lists of rows"
+    def __init__(self):
+        super().__init__()
+        self.tables, self.row, self.cell = [], None, None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.tables.append([])
+        elif tag == "tr" and self.tables:
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self.cell is not None:
+            self.row.append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            self.tables[-1].append(self.row)
+            self.row = None
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+
+def parse_times(texts) -> np.ndarray:
+    "iFOT time strings to CXC seconds, NaN for blank or unreadable ones"
+    secs = np.full(len(texts), np.nan)
+    for index, text in enumerate(texts):
+        try:
+            secs[index] = datetime64_to_secs(parse_date(text))
+        except (ValueError, IndexError):
+            pass
+    return secs
+
+
+def parse_table(event, page):
+    """
+    Description: Parse an ifot.php list page into typed columns
+    Input: event type, page HTML
+    Output: {column: np.ndarray}, rows in page order
+    """
+    types = column_types(event)
+    parser = TableParser()
+    parser.feed(page)
+    rows = [row for row in (parser.tables[-1][1:] if parser.tables else []) if any(row)]
+    rows = [(row + [""] * len(types))[:len(types)] for row in rows]
+    cells = list(zip(*rows)) if rows else [()] * len(types)
+
+    columns = {}
+    for (name, kind), texts in zip(types.items(), cells):
+        columns[name] = parse_times(texts) if kind == "time" else np.array(texts, dtype=str)
+    return columns
+
+
+def request_events(event, start, stop, *, base_url=None, fixtures=None,
+                   timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS):
+    """
+    Description: Events of one type from iFOT, or from a recorded page in
+                 offline fixture mode (fixtures directory or IFOT_FIXTURES)
+    Input: event type, [start, stop) in CXC seconds
+    Output: {column: np.ndarray}, only events starting within [start, stop)
+    """
+    fixtures = fixtures or FIXTURE_DIR
+    if fixtures:
+        path = Path(fixtures) / f"{event}.html"
+        if not path.exists():
+            raise TelemetryError(f"No iFOT fixture for {event} in {fixtures}")
+        page = path.read_text(encoding="utf-8")
+    else:
+        page = get_text(query_url(event, start, stop, base_url), timeout, attempts)
+    columns = parse_table(event, page)
+    keep = (columns["tstart"] >= start) & (columns["tstart"] < stop)
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def record_fixture(event, start, stop, fixtures, base_url=None):
+    "Save the live iFOT page for event over [start, stop] as fixtures/<EVENT>.html"
+    path = Path(fixtures) / f"{event}.html"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(get_text(query_url(event, start, stop, base_url)), encoding="utf-8")
+    return path
@@ -0,0 +1,143 @@
+"""
+Keep-alive HTTP connection pool with per-request timeouts and jittered
+exponential backoff, shared by the HTTP backends (MAUDE) and iFOT.
+"""
+
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+MAX_ATTEMPTS = 5        # per request
+REQUEST_TIMEOUT = 60    # sec, per request
+BACKOFF_BASE = 2        # sec, doubled each retry, full jitter
+POOL_SIZE = 8           # idle connections kept per host
+
+
+class TelemetryError(Exception):
+    "A telemetry request failed (bad request, or no answer after every retry)"
+
+
+class FetchCancelled(TelemetryError):
+    "Raised inside a fetch when the caller has cancelled it"
+
+
+class HTTPStatusError(TelemetryError):
+    "The server answered with an HTTP error status"
+    def __init__(self, url, status, reason):
+        super().__init__(f"HTTP {status} {reason} for {url}")
+        self.status = status
+
+
+class ConnectionPool:
+    """
+    Idle http.client connections per (scheme, host), reused across requests
+    and threads so paged and per-day queries skip the TCP/TLS handshake.
+    """
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, scheme, netloc, timeout):
+        "Return (connection, reused) for the host"
+        with self.lock:
+            connections = self.idle.get((scheme, netloc))
+            if connections:
+                connection = connections.pop()
+                connection.timeout = timeout
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                return connection, True
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return cls(netloc, timeout=timeout), False
+
+    def release(self, scheme, netloc, connection):
+        with self.lock:
+            connections = self.idle.setdefault((scheme, netloc), [])
+            if len(connections) < self.size:
+                connections.append(connection)
+                return
+        connection.close()
+
+    def get(self, url, timeout=REQUEST_TIMEOUT, accept="application/json"):
+        """
+        Description: One GET on a pooled connection. A reused connection the
+                     server has since dropped is retried once on a fresh one.
+        Output: response body bytes. HTTPStatusError for status >= 400
+        """
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        while True:
+            connection, reused = self.acquire(parts.scheme, parts.netloc, timeout)
+            try:
+                connection.request("GET", target, headers={"Accept": accept})
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                self.release(parts.scheme, parts.netloc, connection)
+            if response.status >= 400:
+                raise HTTPStatusError(url, response.status, response.reason)
+            return body
+
+    def close(self):
+        "Close every idle connection"
+        with self.lock:
+            for connections in self.idle.values():
+                for connection in connections:
+                    connection.close()
+            self.idle.clear()
+
+
+POOL = ConnectionPool()
+
+
+def get_json(url, timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS, cancelled=None):
+    """
+    Description: GET and decode a JSON document, retrying connection errors,
+                 timeouts and 5xx answers with jittered exponential backoff.
+                 4xx answers are not retried.
+    Input: URL, per-request timeout, number of attempts, optional
+           threading.Event checked before each attempt
+    Output: decoded JSON. TelemetryError once every attempt has failed
+    """
+    return get_parsed(url, json.loads, "application/json", timeout, attempts, cancelled)
+
+
+def get_text(url, timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS, cancelled=None):
+    "As get_json, for a UTF-8 text (HTML) document"
+    return get_parsed(url, lambda body: body.decode("utf-8", errors="replace"), "text/html",
+                      timeout, attempts, cancelled)
+
+
+def get_parsed(url, parse, accept, timeout=REQUEST_TIMEOUT, attempts=MAX_ATTEMPTS, cancelled=None):
+    "GET url and return parse(body), with the retries of get_json"
+    for attempt in range(attempts):
+        if cancelled is not None and cancelled.is_set():
+            raise FetchCancelled(url)
+        try:
+            return parse(POOL.get(url, timeout, accept))
+        except HTTPStatusError as error:
+            if error.status < 500 or attempt == attempts - 1:
+                raise
+            failure = error
+        except (OSError, http.client.HTTPException, ValueError) as error:
+            if attempt == attempts - 1:
+                raise TelemetryError(f"{url}: {error}") from error
+            failure = error
+        delay = random.uniform(0, BACKOFF_BASE * 2 ** attempt)
+        print(f"     - Query attempt failed ({failure}), trying again in {delay:.1f} sec...")
+        time.sleep(delay)
+    raise TelemetryError(f"{url}: no attempts made")
@@ -0,0 +1,56 @@
+"Columnar container returned by fetch()"
+
+import numpy as np
+from .times import secs_to_datetime64
+
+
+def numeric_values(vals) -> np.ndarray:
+    "Values as float64 when every one of them is numeric, otherwise unchanged"
+    vals = np.asarray(vals)
+    if vals.dtype.kind in "USO" and vals.size:
+        try:
+            return vals.astype(np.float64)
+        except ValueError: # state codes such as "ON"/"OFF"
+            return vals.astype(str)
+    if vals.dtype.kind in "USO":
+        return vals.astype(np.float64)
+    return vals
+
+
+class Telemetry:
+    """
+    Samples of one MSID: times (CXC seconds, float64) and vals (float64 for
+    numeric telemetry, str for state codes), sorted by time.
+    """
+    def __init__(self, msid, times, vals, unit=None, source=None):
+        self.msid = msid.upper()
+        self.times = np.asarray(times, dtype=np.float64)
+        self.vals = numeric_values(vals)
+        self.unit = unit
+        self.source = source
+
+    @classmethod
+    def from_parts(cls, msid, times, vals, unit=None, source=None):
+        "Join lists of time/value chunks"
+        return cls(msid, np.concatenate(times) if times else np.array([]),
+                   np.concatenate(vals) if vals else np.array([]), unit, source)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __repr__(self):
+        return f"<Telemetry {self.msid} n={len(self)} source={self.source}>"
+
+    @property
+    def datetime64(self) -> np.ndarray:
+        "Sample times as UTC datetime64[us]"
+        return secs_to_datetime64(self.times)
+
+    @property
+    def title(self) -> str:
+        "'MSID (unit)' as used for plot titles"
+        return f"{self.msid} ({self.unit})" if self.unit else self.msid
+
+    def select(self, mask):
+        "A Telemetry holding only the samples selected by mask (bool array or slice)"
+        return Telemetry(self.msid, self.times[mask], self.vals[mask], self.unit, self.source)
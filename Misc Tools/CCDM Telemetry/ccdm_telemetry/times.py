@@ -0,0 +1,116 @@
+"""
+Vectorized time conversion between MAUDE timestamps, datetime64 (UTC) and
+CXC seconds (TT seconds since 1998-01-01T00:00:00 TT, as used by cheta/CxoTime).
+
+Leap seconds come from a fixed TAI-UTC table; CxoTime is not needed.
+"""
+
+from datetime import datetime, timezone
+import numpy as np
+
+CXC_EPOCH = np.datetime64("1998-01-01T00:00:00", "us")
+TT_TAI = 32.184
+
+# (first UTC day the offset applies, TAI - UTC in seconds)
+LEAP_SECONDS = [
+    ("1972-01-01", 10), ("1997-07-01", 31), ("1999-01-01", 32), ("2006-01-01", 33),
+    ("2009-01-01", 34), ("2012-07-01", 35), ("2015-07-01", 36), ("2017-01-01", 37),
+]
+LEAP_DATES = np.array([day for day, _ in LEAP_SECONDS], dtype="datetime64[us]")
+LEAP_OFFSETS = np.array([offset for _, offset in LEAP_SECONDS], dtype=np.float64)
+# The same table expressed as CXC seconds at each step, for the inverse lookup
+LEAP_SECS = (LEAP_DATES - CXC_EPOCH) / np.timedelta64(1, "s") + LEAP_OFFSETS + TT_TAI
+
+
+def maude_to_datetime64(times) -> np.ndarray:
+    """
+    Decode MAUDE integer timestamps (YYYYDDDHHMMSS followed by fractional
+    seconds digits) into datetime64[us] using integer arithmetic only.
+    """
+    t = np.asarray(times).astype(np.int64)
+    if t.size == 0:
+        return np.array([], dtype="datetime64[us]")
+    frac_digits = np.floor(np.log10(t)).astype(np.int64) + 1 - 13
+    scale = 10 ** frac_digits
+    whole, frac = np.divmod(t, scale)
+    microseconds = frac * 10 ** (6 - frac_digits)
+
+    whole, seconds = np.divmod(whole, 100)
+    whole, minutes = np.divmod(whole, 100)
+    whole, hours = np.divmod(whole, 100)
+    years, doy = np.divmod(whole, 1000)
+
+    days = (years - 1970).astype("datetime64[Y]").astype("datetime64[D]") + (doy - 1)
+    offset = (hours * 3600 + minutes * 60 + seconds) * 1_000_000 + microseconds
+    return days.astype("datetime64[us]") + offset.astype("timedelta64[us]")
+
+
+def datetime64_to_secs(times) -> np.ndarray:
+    "UTC datetime64 values to CXC seconds"
+    times = np.asarray(times).astype("datetime64[us]")
+    leap = LEAP_OFFSETS[np.searchsorted(LEAP_DATES, times, side="right") - 1]
+    return (times - CXC_EPOCH) / np.timedelta64(1, "s") + leap + TT_TAI
+
+
+def secs_to_datetime64(secs) -> np.ndarray:
+    "CXC seconds to UTC datetime64[us] (rounded to the microsecond)"
+    secs = np.asarray(secs, dtype=np.float64)
+    leap = LEAP_OFFSETS[np.searchsorted(LEAP_SECS, secs, side="right") - 1]
+    utc = secs - leap - TT_TAI
+    return CXC_EPOCH + np.round(utc * 1e6).astype(np.int64).astype("timedelta64[us]")
+
+
+def maude_to_secs(times) -> np.ndarray:
+    "MAUDE integer timestamps to CXC seconds"
+    return datetime64_to_secs(maude_to_datetime64(times))
+
+
+def parse_date(text: str) -> np.datetime64:
+    """
+    Parse one date string: "YYYY:DDD[:HH:MM:SS[.sss]]", greta "YYYYDDD.HHMMSSsss",
+    MAUDE "YYYYDDDHHMMSS[sss]" or ISO "YYYY-MM-DD[THH:MM:SS]"
+    """
+    text = text.strip()
+    if "-" in text[1:]:
+        return np.datetime64(text.replace(" ", "T").rstrip("Z"), "us")
+    if ":" in text:
+        fields = text.split(":")
+        year, doy = int(fields[0]), int(fields[1])
+        hours, minutes = (int(value) for value in (fields[2:4] + ["0", "0"])[:2])
+        seconds = float(fields[4]) if len(fields) > 4 else 0.0
+    else:
+        digits = text.replace(".", "")
+        year, doy = int(digits[:4]), int(digits[4:7])
+        hours, minutes = int(digits[7:9] or 0), int(digits[9:11] or 0)
+        seconds = float(f"{digits[11:13] or 0}.{digits[13:] or 0}")
+    day = np.datetime64(f"{year:04d}-01-01", "us") + np.timedelta64(doy - 1, "D")
+    return day + np.timedelta64(round((hours * 3600 + minutes * 60 + seconds) * 1e6), "us")
+
+
+def to_secs(value) -> float:
+    """
+    One time in any of the forms the tools pass around to CXC seconds:
+    CxoTime/DateTime (anything with .secs), datetime (naive = UTC),
+    datetime64, date string (see parse_date) or a number of CXC seconds
+    """
+    if hasattr(value, "secs"):
+        return float(np.asarray(value.secs))
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        value = np.datetime64(value, "us")
+    elif isinstance(value, str):
+        value = parse_date(value)
+    if isinstance(value, np.datetime64):
+        return float(datetime64_to_secs(value))
+    return float(value)
+
+
+def secs_to_yday(secs) -> np.ndarray:
+    "CXC seconds to 'YYYY:DDD:HH:MM:SS.sss' strings (the form MAUDE queries take)"
+    times = np.atleast_1d(secs_to_datetime64(secs)).astype("datetime64[ms]")
+    years = times.astype("datetime64[Y]")
+    doy = (times.astype("datetime64[D]") - years.astype("datetime64[D]")).astype(np.int64) + 1
+    clock = np.datetime_as_string(times, unit="ms")
+    return np.array([f"{str(year)}:{day:03d}:{text[11:]}"
+                     for year, day, text in zip(years, doy, clock)])
@@ -0,0 +1,120 @@
+"Parallel, deduplicated static image export for the Clock Rate plots"
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import plotly.io as pio
+from clock_rate_ingest import CACHE_DIR
+
+MAX_WORKERS = 3     # one kaleido instance per worker process
+STATE_FILE = "export_state.json"
+
+
+class ImageJob:
+    "One figure rendered once and placed as filename in every destination directory"
+
+    def __init__(self, name, figure, filename, destinations, height=1000, width=1600, scale=2):
+        self.name = name
+        self.spec = figure.to_json()
+        self.filename = filename
+        self.destinations = [Path(destination) for destination in destinations]
+        self.options = {"format": "png", "height": height, "width": width, "scale": scale}
+
+    @property
+    def spec_hash(self):
+        "Hash of everything that affects the rendered bytes"
+        digest = hashlib.sha256(self.spec.encode("utf-8"))
+        digest.update(json.dumps(self.options, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+
+def warm_kaleido():
+    "Process pool initializer, start this worker's kaleido instance once up front"
+    pio.to_image({"data": [], "layout": {}}, format="png", width=10, height=10)
+
+
+def render(spec, options):
+    "Render a figure JSON spec in a worker process, return (png bytes, seconds)"
+    start = time.perf_counter()
+    image = pio.to_image(pio.from_json(spec), **options)
+    return image, time.perf_counter() - start
+
+
+def place(source, destination):
+    """
+    Atomically place source at destination: hard link when on the same volume,
+    copy otherwise, always through a temp file renamed over the target.
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=destination.parent, suffix=".tmp")
+    os.close(fd)
+    os.unlink(temp_path)
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copyfile(source, temp_path)
+    try:
+        os.replace(temp_path, destination)
+    except OSError:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
+
+class ExportManager:
+    """
+    Renders distinct figures concurrently in a pool of persistent kaleido
+    workers, skips figures whose spec hash matches the last export, and
+    places each rendered image into all of its destinations.
+    """
+    def __init__(self, cache_dir=None, max_workers=MAX_WORKERS):
+        self.cache_dir = Path(cache_dir or CACHE_DIR) / "images"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.cache_dir / STATE_FILE
+        self.max_workers = max_workers
+        self.state = {}
+        if self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def is_current(self, job):
+        "True when the job's last render matches its spec and is in every destination"
+        rendered = self.cache_dir / f"{job.name}.png"
+        return (self.state.get(job.name) == job.spec_hash and rendered.exists() and
+                all((destination / job.filename).exists() for destination in job.destinations))
+
+    def export(self, jobs):
+        "Render and place every job, print per-figure timings"
+        pending = [job for job in jobs if not self.is_current(job)]
+        for job in jobs:
+            if job not in pending:
+                print(f" - {job.filename} unchanged since the last export, skipped")
+        if not pending:
+            return
+
+        with ProcessPoolExecutor(
+                max_workers=min(self.max_workers, len(pending)), initializer=warm_kaleido) as pool:
+            futures = [(job, pool.submit(render, job.spec, job.options)) for job in pending]
+
+            for job, future in futures:
+                image, elapsed = future.result()
+                # New inode per render, so links placed by earlier runs are never rewritten
+                rendered = self.cache_dir / f"{job.name}.png"
+                fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with open(fd, "wb") as f:
+                    f.write(image)
+                os.chmod(temp_path, 0o644) # mkstemp is owner-only, the web copies must be readable
+                os.replace(temp_path, rendered)
+
+                for destination in job.destinations:
+                    place(rendered, destination / job.filename)
+                    print(f" - {job.filename} written to {destination}")
+                print(f"   - {job.name} rendered in {elapsed:.2f} sec")
+
+                self.state[job.name] = job.spec_hash
+                with open(self.state_path, "w", encoding="utf-8") as f:
+                    json.dump(self.state, f, indent=2)
@@ -0,0 +1,129 @@
+"Typed parquet snapshot of the Clock Rate Trending workbook"
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.chartsheet import Chartsheet
+from openpyxl.chartsheet.publish import WebPublishItem
+
+WebPublishItem.sourceRef.expected_type = (str, type(None))
+
+CACHE_DIR = Path(os.environ.get(
+    "CLOCK_RATE_CACHE", Path.home() / ".cache" / "ccdm" / "clock_rate"))
+TIME_COLUMN = "RefTime(UTC)"
+RATE_COLUMN = "1-day rate"
+TIME_FORMAT = "%Y:%j:%H:%M:%S.%f"
+SNAPSHOT_VERSION = 2    # bump when decode_rows changes, so older snapshots are rebuilt
+
+
+def file_hash(path):
+    "sha256 of the workbook bytes"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_rows(path, sheet_name, first_row=0):
+    """
+    Description: Stream raw (time, rate) cells from the worksheet, starting at
+                 data row first_row (0 is the row under the header)
+    Output: list of time cells, list of rate cells
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        real_sheets = {ws.title: ws for ws in wb.worksheets if not isinstance(ws, Chartsheet)}
+        if not real_sheets:
+            raise ValueError("Workbook contains no real worksheets (only chartsheets).")
+        if sheet_name not in real_sheets:
+            raise ValueError(
+                f"'{sheet_name}' is not a real worksheet. "
+                f"Available worksheets: {list(real_sheets.keys())}"
+            )
+        ws = real_sheets[sheet_name]
+
+        headers = next(ws.iter_rows(max_row=1, values_only=True))
+        time_index, rate_index = headers.index(TIME_COLUMN), headers.index(RATE_COLUMN)
+        times, rates = [], []
+        for row in ws.iter_rows(min_row=first_row + 2, values_only=True):
+            times.append(row[time_index] if len(row) > time_index else None)
+            rates.append(row[rate_index] if len(row) > rate_index else None)
+    finally:
+        wb.close()
+
+    return times, rates
+
+
+def decode_rows(times, rates):
+    "Typed frame of the raw cells, a row whose date fails to parse is kept as a NaT/NaN gap"
+    times = pd.Series(times, dtype=object)
+    date = pd.to_datetime(times.where(times.map(type) == str), format=TIME_FORMAT, errors="coerce")
+    rate = pd.to_numeric(pd.Series(rates, dtype=object), errors="coerce").astype(np.float64)
+    return pd.DataFrame({"date": date, "rate": rate.where(date.notna())})
+
+
+class ClockRateSnapshot:
+    """
+    Parquet snapshot of one worksheet keyed on the workbook hash. When the
+    workbook changes, only rows past the snapshot are read and appended,
+    unless the overlapping last row no longer matches (then it is rebuilt).
+    """
+    def __init__(self, path, sheet_name, cache_dir=None):
+        self.path = Path(path)
+        self.sheet_name = sheet_name
+        cache_dir = Path(cache_dir or CACHE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.data_path = cache_dir / f"{sheet_name}.parquet"
+        self.meta_path = cache_dir / f"{sheet_name}.json"
+
+    def read_meta(self):
+        "Return the snapshot metadata, or None if there is no usable snapshot"
+        if not (self.meta_path.exists() and self.data_path.exists()):
+            return None
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta if meta.get("version") == SNAPSHOT_VERSION else None
+
+    def write(self, frame, source_hash):
+        "Write the snapshot, then its metadata, so a partial write is never trusted"
+        try:
+            frame.to_parquet(self.data_path, index=False)
+        except ImportError:
+            print(" - Warning! No parquet engine installed, workbook snapshot disabled.")
+            return
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"version": SNAPSHOT_VERSION, "hash": source_hash, "sheet": self.sheet_name,
+                       "rows": len(frame)}, f)
+
+    def load(self):
+        """
+        Description: Return the typed worksheet, reusing the snapshot when the
+                     workbook is unchanged and appending new rows when it grew
+        Output: DataFrame with "date" (datetime64) and "rate" (float64) columns
+        """
+        source_hash = file_hash(self.path)
+        meta = self.read_meta()
+
+        if meta is not None and meta["hash"] == source_hash:
+            print(" - Workbook unchanged, using parquet snapshot")
+            return pd.read_parquet(self.data_path)
+
+        if meta is not None and meta["rows"] > 0:
+            cached = pd.read_parquet(self.data_path)
+            # Re-read the last snapshot row as an overlap check for edited history
+            new_rows = decode_rows(*read_rows(self.path, self.sheet_name, meta["rows"] - 1))
+            if len(new_rows) and new_rows.iloc[0].equals(cached.iloc[-1]):
+                frame = pd.concat([cached, new_rows.iloc[1:]], ignore_index=True)
+                print(f" - Appended {len(new_rows) - 1} new rows to the workbook snapshot")
+                self.write(frame, source_hash)
+                return frame
+
+        print(" - Building workbook snapshot...")
+        frame = decode_rows(*read_rows(self.path, self.sheet_name))
+        self.write(frame, source_hash)
+        return frame
@@ -2,110 +2,41 @@ from datetime import datetime, timedelta, date
 import plotly.graph_objects as go
 import plotly.io as pio
 from pathlib import Path
+import sys
 import numpy as np
-from openpyxl import load_workbook
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.chartsheet.publish import WebPublishItem
+import pandas as pd
+from clock_rate_ingest import ClockRateSnapshot
+from clock_rate_export import ExportManager, ImageJob
 
-WebPublishItem.sourceRef.expected_type = (str, type(None))
-pio.renderers.default= "browser"
-
-def parse_excel_to_lists(path, sheet_name=None):
-    wb = load_workbook(path, data_only=True)
-
-    real_sheets = {
-        ws.title: ws
-        for ws in wb.worksheets
-        if isinstance(ws, Worksheet)
-    }
-
-    if not real_sheets:
-        raise ValueError("Workbook contains no real worksheets (only chartsheets).")
-
-    if sheet_name:
-        if sheet_name not in real_sheets:
-            raise ValueError(
-                f"'{sheet_name}' is not a real worksheet. "
-                f"Available worksheets: {list(real_sheets.keys())}"
-            )
-        ws = real_sheets[sheet_name]
-    else:
-        ws = list(real_sheets.values())[0]
-
-    headers = [cell.value for cell in ws[1]]
-    data = {h: [] for h in headers}
-
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        for header, value in zip(headers, row):
-            data[header].append(value)
-
-    return data
-
-
-def correct_data(dates, values):
-    corrected_dates, corrected_values = [], []
-
-    for date, value in zip(dates, values):
-        try:
-            new_date = datetime.strptime(date, "%Y:%j:%H:%M:%S.%f")
-            new_value = value
-        except (ValueError, TypeError):
-            new_date = None
-            new_value = None
-
-        corrected_dates.append(new_date)
-        corrected_values.append(new_value)
-
-    return corrected_dates, corrected_values
-
-
-def moving_average_np(values, window):
-    values = np.array(values, dtype=float)
-    ma = np.convolve(values, np.ones(window)/window, mode='valid')
-    pad = [None] * (window - 1)
-    return pad + ma.tolist()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "SCLK Correlation"))
+from sclk_correlation import STORE_PATH, CorrelationStore, gmt_to_datetime64
 
+pio.renderers.default= "browser"
+CLOCK_TIMING_DIR= Path("//noodle/FOT/engineering/ccdm/Clock_Timing/Clock Rate Trending_files")
+VWEB_DIR= Path("//noodle/vweb/fot_web/eng/subsystems/ccdm/Clock_Rate/images")
 
-def clean_float_list(values):
-    cleaned = []
-    for v in values:
-        try:
-            cleaned.append(float(v))
-        except (TypeError, ValueError):
-            cleaned.append(None)
-    return cleaned
+def window_range(plot, low_range, offset):
+    "Vectorized y-range over samples dated low_range through plot.end_range"
+    dates = plot.data["date"]
+    in_window = (dates >= pd.Timestamp(low_range)) & \
+                (dates < pd.Timestamp(plot.end_range) + pd.Timedelta(days=1))
+    # Limits start at 1/-1 and widen to the data, as the range always has
+    rates = plot.data["rate"][in_window].to_numpy()
+    return [np.nanmin(np.append(rates, 1)) - offset, np.nanmax(np.append(rates, -1)) + offset]
 
 
 def get_y_ranges(plot, duration= None, start_date= None):
-    low_value, high_value, offset= 1,-1, 0
-
-    for date, value in zip(plot.dates, plot.values):
-        try:
-            # Check if in date range:
-            if duration == "mission":
-                low_range= datetime(1999,7,1).date()
-                offset= 5e-10
-            elif duration == "biannual" and start_date is not None:
-                low_range= datetime.strptime(start_date, "%Y:%j").date()
-                offset= 2e-11
-            else:
-                low_range= plot.start_range
-                offset= 2e-11
-
-            if low_range <= date.date() <= plot.end_range:
-                if value <= low_value:
-                    low_value= value
-                if value >= high_value:
-                    high_value= value
-        except (AttributeError, TypeError):
-            pass
-
-    return [low_value - offset, high_value + offset]
+    if duration == "mission":
+        return window_range(plot, datetime(1999,7,1).date(), 5e-10)
+    if duration == "biannual" and start_date is not None:
+        return window_range(plot, datetime.strptime(start_date, "%Y:%j").date(), 2e-11)
+    return window_range(plot, plot.start_range, 2e-11)
 
 
 def mission_plot(plot):
-    "Format and write the mission plot"
-    plot.plot.update_layout(
+    "Format the mission plot, write its html and return its image export"
+    fig= go.Figure(plot.plot)
+    fig.update_layout(
         title= dict(text= f"Mission VCDU Clock Rate", xanchor= "center",
                     yanchor= "top", y= 0.95, x=0.5, font= dict(size= 30)),
         xaxis= dict(showline= True, linewidth= 1, linecolor= "black", mirror= True,
@@ -117,23 +48,16 @@ def mission_plot(plot):
                     range= get_y_ranges(plot, "mission")))
 
     # Write to Clock_Timing directory
-    set_dir= Path("//noodle/FOT/engineering/ccdm/Clock_Timing/Clock Rate Trending_files")
-    plot.plot.write_html(f"{set_dir}/Mission_VCDU_Clock_Rate_Plotly.html")
-    plot.plot.write_image(f"{set_dir}/Mission_VCDU_Clock_Rate.png",
-                          height=1000, width= 1600, scale= 2)
-    print(f" - Mission_VCDU_Clock_Rate.html written to {set_dir}")
-    print(f" - Mission_VCDU_Clock_Rate.png written to {set_dir}")
+    fig.write_html(f"{CLOCK_TIMING_DIR}/Mission_VCDU_Clock_Rate_Plotly.html")
+    print(f" - Mission_VCDU_Clock_Rate.html written to {CLOCK_TIMING_DIR}")
 
-    # Write to vweb directory
-    set_dir= Path("//noodle/vweb/fot_web/eng/subsystems/ccdm/Clock_Rate/images")
-    plot.plot.write_image(f"{set_dir}/Mission_VCDU_Clock_Rate.png",
-                          height=1000, width= 1600, scale= 2)
-    print(f" - Mission_VCDU_Clock_Rate.png written to {set_dir}")
+    return ImageJob("mission", fig, "Mission_VCDU_Clock_Rate.png", [CLOCK_TIMING_DIR, VWEB_DIR])
 
 
 def year_plot(plot):
-    "Format and write the current year plot"
-    plot.plot.update_layout(
+    "Format the current year plot and return its image export"
+    fig= go.Figure(plot.plot)
+    fig.update_layout(
         title= dict(xanchor= "center", yanchor= "top", y= 0.95, x=0.5, font= dict(size= 30),
                     text= f"{datetime.now().year} VCDU Clock Rate"),
         xaxis= dict(showline= True, linewidth= 1, linecolor= "black", mirror= True,
@@ -144,21 +68,12 @@ def year_plot(plot):
                     title= dict(text= "Rate (seconds/seconds)", font= dict(size= 30)),
                     range= get_y_ranges(plot)))
 
-    # Write to Clock_Timing directory
-    set_dir= Path("//noodle/FOT/engineering/ccdm/Clock_Timing/Clock Rate Trending_files")
-    plot.plot.write_image(f"{set_dir}/{datetime.now().year}_Daily_Clock_Rate.png",
-                          height=1000, width= 1600, scale= 2)
-    print(f" - {datetime.now().year}_Daily_Clock_Rate.png written to {set_dir}")
-
-    # Write to vweb directory
-    set_dir= Path("//noodle/vweb/fot_web/eng/subsystems/ccdm/Clock_Rate/images")
-    plot.plot.write_image(f"{set_dir}/{datetime.now().year}_Daily_Clock_Rate.png",
-                          height=1000, width= 1600, scale= 2)
-    print(f" - {datetime.now().year}_Daily_Clock_Rate.png written to {set_dir}")
+    return ImageJob("year", fig, f"{datetime.now().year}_Daily_Clock_Rate.png",
+                    [CLOCK_TIMING_DIR, VWEB_DIR])
 
 
 def biannual_plot(plot):
-    "format and write the current biannual plot"
+    "format the current biannual plot and return its image export"
     while True:
         try:
             start_date= datetime.strptime(input(" - Enter biannual period start (yyyy:ddd): "),
@@ -170,7 +85,8 @@ def biannual_plot(plot):
             continue
         break
 
-    plot.plot.update_layout(
+    fig= go.Figure(plot.plot)
+    fig.update_layout(
         title= dict(xanchor= "center", yanchor= "top", y= 0.95, x=0.5, font= dict(size= 30),
                     text= f"{start_date.strftime("%b %Y")} - {end_date.strftime("%b %Y")} Daily Clock Rate"),
         xaxis= dict(showline= True, linewidth= 1, linecolor= "black", mirror= True,
@@ -181,14 +97,26 @@ def biannual_plot(plot):
                     range= get_y_ranges(plot, "biannual", start_date.strftime("%Y:%j"))))
 
     # Write to user desktop directory
-    set_dir= Path.home() / "Desktop"
-    plot.plot.write_image(f"{set_dir}/Biannual_Daily_Clock_Rate.png",
-                          height=1000, width= 1600, scale= 2)
-    print(f" - Biannual_Daily_Clock_Rate.png written to {set_dir}")
+    return ImageJob("biannual", fig, "Biannual_Daily_Clock_Rate.png", [Path.home() / "Desktop"])
+
+def add_rate_steps(plot_obj):
+    "Mark anomalous SCLK rate steps from the clock correlation store, if one exists"
+    if not STORE_PATH.exists():
+        return
+    store= CorrelationStore()
+    try:
+        _, gmt, _, _= store.load().rate_steps()
+    finally:
+        store.close()
+    for step_time in gmt_to_datetime64(gmt):
+        plot_obj.add_vline(x= step_time, line_dash= "dot", line_color= "gray", opacity= 0.6)
+    if len(gmt):
+        print(f" - Marked {len(gmt)} anomalous SCLK rate steps")
+
 
 def generate_plot(self):
-    self.dates, self.values = correct_data(self.parsed["RefTime(UTC)"], self.parsed["1-day rate"])
-    self.ma07 = moving_average_np(clean_float_list(self.values), window=7)
+    self.dates, self.values = self.data["date"], self.data["rate"]
+    self.ma07 = self.values.rolling(window=7).mean()
 
     plot_obj = go.Figure()
 
@@ -205,6 +133,8 @@ def generate_plot(self):
         text= f"(Generated On {datetime.now().date()})", showarrow= False,
         font= dict(size= 18, color= "black"), xanchor= "center")
 
+    add_rate_steps(plot_obj)
+
     # Set General Layout
     plot_obj.update_layout(
         hovermode= "x unified", paper_bgcolor= "rgb(255,255,255)", plot_bgcolor= "rgb(255,255,255)",
@@ -222,20 +152,21 @@ class ClockPlot:
                          "/Clock Rate Trending (Data Only).xlsx")
         self.start_range= datetime(date.today().year, 1, 1).date()
         self.end_range= datetime.now().date()
-        self.parsed= parse_excel_to_lists(parse_file, "dailyrate")
+        self.data= ClockRateSnapshot(parse_file, "dailyrate").load()
         self.plot= generate_plot(self)
 
 
 def main():
     plot= ClockPlot()
-    mission_plot(plot)
-    year_plot(plot)
+    jobs= [mission_plot(plot), year_plot(plot)]
 
     if input(" - Do you want to open the plot in a web browser? (y/n): ").lower() in ("y"):
-        plot.plot.show()
+        pio.from_json(jobs[1].spec).show()
 
     if input(" - Do you want to create a biannual plot? (y/n): ").lower() in ["y"]:
-        biannual_plot(plot)
+        jobs.append(biannual_plot(plot))
+
+    ExportManager().export(jobs)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 import os.path
 from PyQt5.QtWidgets import QMessageBox, QLabel, QPushButton, QHBoxLayout
 from components.misc import validate_all_conditions, get_user_directory, create_separator
+from components.sheets_diff import MasterSnapshot
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -85,17 +86,32 @@ def get_sheets_api_service(self):
         os._exit(1)
 
 
+def google_login_job(self, job):
+    "Background part of the login: OAuth2 flow, master download and snapshot"
+    oauth_data= get_oauth2_api_data(self)
+    if oauth_data is None:
+        raise RuntimeError("Google login failed")
+    job.report("Downloading Google Sheets Master...")
+    sheets_service, sheets_data= get_sheets_api_service(self)
+    job.check_cancelled()
+    master_snapshot= MasterSnapshot()
+    master_snapshot.replace(sheets_data)
+    return oauth_data, sheets_service, sheets_data, master_snapshot
+
+
 def handle_google_login(self):
     """
-    Description: Orchestrates the Google OAuth2 login flow. It triggers the 
-                    authentication process and, upon success, captures user profile 
-                    and spreadsheet data to the GUI instance.
+    Description: Orchestrates the Google OAuth2 login flow. The authentication
+                    and spreadsheet download run as a background job; upon success
+                    the user profile and spreadsheet data are stored on the GUI instance.
     
     Instance Attributes Updated:
         - self.oauth_data: Dictionary containing 'User ID', 'Email', and 'Username' 
                             retrieved from Google OAuth2 API.
         - self.sheets_data: A list of values (rows) retrieved from the Master 
                             Google Sheet spreadsheet.
+        - self.master_snapshot: Local MasterSnapshot of those rows, used to diff
+                            loaded files before merging.
         - self.is_logged_in: Boolean flag set to True on success.
 
     Side Effects:
@@ -103,26 +119,33 @@ def handle_google_login(self):
         - Toggles the enabled state of login/logout buttons.
         - Triggers validate_all_conditions() to refresh action button availability.
     """
-    try:
-        self.oauth_data= get_oauth2_api_data(self)
-        self.sheets_service, self.sheets_data= get_sheets_api_service(self)
+    def login_done(result):
+        self.oauth_data, self.sheets_service, self.sheets_data, self.master_snapshot= result
         self.is_logged_in= True # Declare user logged in
         QMessageBox.information(self, "Success",
                 f"Logged in to CFA Google Account ({self.oauth_data['Email']}) Successfully!")
-    except Exception as e:
-        print(e)
+        validate_all_conditions(self) # Check if we can enable buttons
+
+    def login_failed(error):
+        print(error)
         self.is_logged_in= False # Declare user logged out
+        validate_all_conditions(self)
 
-    validate_all_conditions(self) # Check if we can enable buttons
+    self.btn_login.setEnabled(False) # Until the login job finishes
+    self.jobs.submit("Logging in to Google", lambda job: google_login_job(self, job),
+                     on_done= login_done, on_error= login_failed,
+                     on_cancel= lambda: validate_all_conditions(self), group= "master")
 
 
 def handle_google_logout(self):
     """
-    Description: Orchestrates the Google OAuth2 logout flow.
+    Description: Orchestrates the Google OAuth2 logout flow. Queued behind any
+                    running master job so the service is not dropped mid-merge.
     
     Instance Attributes Updated:
         - self.oauth_data: None
         - self.sheets_data: None
+        - self.master_snapshot: None
         - self.is_logged_in: Boolean flag set to False.
 
     Side Effects:
@@ -130,11 +153,15 @@ def handle_google_logout(self):
         - Toggles the enabled state of login/logout buttons.
         - Triggers validate_all_conditions() to refresh action button availability.
     """
-    self.oauth_data= None
-    self.sheets_service, self.sheets_data= None, None
-    self.is_logged_in= False
-    QMessageBox.information(self, "Success", "Logged out of CFA Google Account Successfully!")
-    validate_all_conditions(self) # Check if we can enable buttons
+    def logout_done(_):
+        self.oauth_data= None
+        self.sheets_service, self.sheets_data= None, None
+        self.master_snapshot= None
+        self.is_logged_in= False
+        QMessageBox.information(self, "Success", "Logged out of CFA Google Account Successfully!")
+        validate_all_conditions(self) # Check if we can enable buttons
+
+    self.jobs.submit("Logging out", lambda job: None, on_done= logout_done, group= "master")
 
 
 def add_google_auth_section(self):
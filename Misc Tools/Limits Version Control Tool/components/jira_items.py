@@ -33,10 +33,16 @@ def handle_jira_error(self, error_type, error_message):
     QMessageBox.information(self, "JIRA Check Failed", error_message)
 
 
+def fetch_jira_ticket(ticket_id, job):
+    "Background part of the status check: connect and look the ticket up"
+    ticket= init_jira_connection().issue(ticket_id)
+    job.check_cancelled()
+    return ticket
+
+
 def check_jira_status(self):
-    try:
-        jira_connection= init_jira_connection()
-        self.ticket_obj= jira_connection.issue(self.jira_ticket.text())
+    def check_done(ticket):
+        self.ticket_obj= ticket
         status= str(self.ticket_obj.fields.status).strip()
 
         if status.lower() in ["waiting for configuration", "configured"]:
@@ -46,13 +52,19 @@ def check_jira_status(self):
 
         validate_all_conditions(self) # Check if we can enable buttons
 
-    except ValueError:
-        error_message= ("ERROR! Unable to connect to JIRA server.")
-        handle_jira_error(self, "CONNECTION ERROR", error_message)
-    except JIRAError:
-        error_message= ("ERROR! Invalid JIRA ticket ID. Please input a "
-                        "valid JIRA ticket ID (e.g., CRF-12345)")
-        handle_jira_error(self, "INVALID TICKET ID", error_message)
+    def check_failed(error):
+        if isinstance(error, JIRAError):
+            error_message= ("ERROR! Invalid JIRA ticket ID. Please input a "
+                            "valid JIRA ticket ID (e.g., CRF-12345)")
+            handle_jira_error(self, "INVALID TICKET ID", error_message)
+        else:
+            print(f"JIRA check failed: {error}")
+            error_message= ("ERROR! Unable to connect to JIRA server.")
+            handle_jira_error(self, "CONNECTION ERROR", error_message)
+
+    ticket_id= self.jira_ticket.text()
+    self.jobs.submit(f"Checking {ticket_id}", lambda job: fetch_jira_ticket(ticket_id, job),
+                     on_done= check_done, on_error= check_failed, group= "jira")
 
 
 def add_jira_section(self):
@@ -0,0 +1,161 @@
+"Background job runner for the blocking network and SVN actions of the limits tool"
+
+import threading
+from collections import deque
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtWidgets import QLabel, QPushButton, QHBoxLayout
+
+
+class JobCancelled(Exception):
+    "Raised inside a job when it is cancelled"
+
+
+class JobSignals(QObject):
+    "Signals emitted by Job (QRunnable cannot define signals itself)"
+    progress= pyqtSignal(str)
+    finished= pyqtSignal(object)
+    failed= pyqtSignal(object)
+    cancelled= pyqtSignal()
+    done= pyqtSignal()      # after any of the three above
+
+
+class Job(QRunnable):
+    """
+    One blocking call run on the job pool. work(job) runs off the GUI thread,
+    must not touch widgets, and reports through job.report() / job.check_cancelled().
+    Its return value (or exception) is delivered to the GUI thread by signals.
+    """
+    def __init__(self, name, work, group=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.name= name
+        self.work= work
+        self.group= group
+        self.signals= JobSignals()
+        self.cancel_event= threading.Event()
+
+    def cancel(self):
+        "Ask the job to stop at its next check_cancelled() (or svn poll)"
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+    def report(self, text):
+        self.signals.progress.emit(text)
+
+    def run(self):
+        try:
+            result= self.work(self)
+        except Exception as e:
+            # Anything raised after a cancel request (e.g. a killed svn) counts as cancelled
+            if isinstance(e, JobCancelled) or self.is_cancelled():
+                self.signals.cancelled.emit()
+            else:
+                self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(result)
+        self.signals.done.emit()
+
+
+class JobRunner(QObject):
+    """
+    QThreadPool front end. Jobs sharing a group run one at a time in submission
+    order, so conflicting actions (merge, save, SVN commit/update) queue up
+    behind each other; jobs in different groups run concurrently.
+    """
+    status= pyqtSignal(str)     # progress text of the newest running job, "" when idle
+
+    def __init__(self, parent=None, max_threads=4):
+        super().__init__(parent)
+        self.pool= QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.queues= {}         # group -> deque of waiting jobs
+        self.running= {}        # group -> running job
+        self.jobs= []           # every job not yet done, in submission order
+
+    def submit(self, name, work, on_done=None, on_error=None, on_cancel=None, group=None):
+        """
+        Description: Queue work(job) to run in the background
+        Input: display name, work callable, GUI-thread callbacks for the result,
+               for an exception and for a cancel, serialization group (None = run at once)
+        Output: the Job
+        """
+        job= Job(name, work, group)
+        if on_done:
+            job.signals.finished.connect(on_done)
+        if on_error:
+            job.signals.failed.connect(on_error)
+        else:
+            job.signals.failed.connect(lambda e, name=name: print(f"{name} failed: {e}"))
+        if on_cancel:
+            job.signals.cancelled.connect(on_cancel)
+        job.signals.progress.connect(self.status)
+        job.signals.done.connect(lambda job=job: self.job_done(job))
+        self.jobs.append(job)
+
+        if group is not None and group in self.running:
+            self.queues.setdefault(group, deque()).append(job)
+            self.status.emit(f"{name} queued behind {self.running[group].name}")
+        else:
+            self.start(job)
+        return job
+
+    def start(self, job):
+        if job.group is not None:
+            self.running[job.group]= job
+        job.report(f"{job.name}...")
+        self.pool.start(job)
+
+    def job_done(self, job):
+        self.jobs.remove(job)
+        if job.is_cancelled():
+            print(f" - {job.name} cancelled")
+        if job.group is not None and self.running.get(job.group) is job:
+            del self.running[job.group]
+            queue= self.queues.get(job.group)
+            if queue:
+                self.start(queue.popleft())
+        if not self.jobs:
+            self.status.emit("")
+
+    def is_busy(self, group=None):
+        return bool(self.jobs) if group is None else group in self.running
+
+    def cancel_all(self):
+        "Drop every queued job and ask the running ones to stop"
+        queued= [job for queue in self.queues.values() for job in queue]
+        for queue in self.queues.values():
+            queue.clear()
+        for job in list(self.jobs):
+            job.cancel()
+        for job in queued: # never started, so report them here
+            job.signals.cancelled.emit()
+            job.signals.done.emit()
+
+    def wait(self, msecs=-1):
+        "Block until the pool is idle (used on exit)"
+        return self.pool.waitForDone(msecs)
+
+
+def add_job_status_section(self):
+    "Add the background job status line and its Cancel button to the GUI"
+    self.jobs= JobRunner(self)
+    self.lbl_job_status= QLabel()
+    self.btn_cancel_jobs= QPushButton("Cancel")
+    self.btn_cancel_jobs.setEnabled(False)
+    self.btn_cancel_jobs.clicked.connect(self.jobs.cancel_all)
+    self.jobs.status.connect(lambda text: on_job_status(self, text))
+    self.job_layout= QHBoxLayout()
+    self.job_layout.addWidget(self.lbl_job_status, 1)
+    self.job_layout.addWidget(self.btn_cancel_jobs)
+    self.layout.addLayout(self.job_layout)
+
+
+def on_job_status(self, text):
+    self.lbl_job_status.setText(text)
+    self.btn_cancel_jobs.setEnabled(self.jobs.is_busy())
@@ -8,6 +8,7 @@ from components.jira_items import add_jira_section
 from components.google_auth import add_google_auth_section
 from components.sheets_master import add_sheet_master_btns
 from components.svn_items import add_svn_section
+from components.jobs import add_job_status_section
 
 
 class LimitsGatekeeperlGUI(QWidget):
@@ -17,6 +18,7 @@ class LimitsGatekeeperlGUI(QWidget):
         self.is_jira_valid=  False
         self.is_file_loaded= False
         self.is_svn_valid=   False
+        self.last_exports=   {}  # export path -> (rows digest, file mtime) of the last save
         self.initUI()
 
     def initUI(self):
@@ -38,5 +40,12 @@ class LimitsGatekeeperlGUI(QWidget):
         add_sheet_master_btns(self)        
         add_jira_section(self)
         add_svn_section(self)
+        add_job_status_section(self)
         add_exit_btn(self)
         validate_all_conditions(self)
+
+    def closeEvent(self, event):
+        "Stop queued jobs and let a running push/commit finish before exiting"
+        self.jobs.cancel_all()
+        self.jobs.wait()
+        super().closeEvent(event)
@@ -0,0 +1,262 @@
+"""
+Keyed diff/merge of a loaded limits file against a local snapshot of the
+Google Sheets master.
+
+A master row is keyed by MSID plus its effective time (Year, DoY, Hour, Min,
+Sec, mSec), i.e. one limit set per MSID per switch time. Each loaded row is
+classified as:
+    insert   key not in the master
+    update   key in the master with different enable state or limits
+    no-op    key in the master with identical enable state and limits
+    conflict key is ambiguous (duplicated in the file with different limits,
+             or matching several master rows) or the master row was edited
+             by someone else since the snapshot was taken
+
+Only inserts and updates are pushed, as one values().batchUpdate with a range
+per contiguous block of rows. This module has no Qt/Google imports so it can
+run against components.sheets_fake.FakeSheetsService offline.
+"""
+
+import json
+import os
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+SPREADSHEET_ID= "15rRk5JAMWXBGiKTly4aP0cUuFE1qECZe01tNESSKXBo"
+SHEET_NAME= "Sheet1"
+SNAPSHOT_PATH= Path(os.environ.get(
+    "LIMITS_SNAPSHOT", Path.home() / ".chandra_limits" / "master_snapshot.json"))
+
+KEY_COLUMNS= list(range(0, 7))      # MSID, Year, DoY, Hour, Min, Sec, mSec
+VALUE_COLUMNS= list(range(7, 16))   # Enabled, Warning/Caution/Greta/Planning Low & High
+TICKET_COLUMN= 16                   # JIRA ticket that last changed the row (column Q)
+NUM_COLUMNS= 17
+LAST_COLUMN= "Q"
+
+
+class MasterSnapshot:
+    "Local copy of the master sheet rows (header included), persisted between sessions"
+
+    def __init__(self, path=None):
+        self.path= Path(path or SNAPSHOT_PATH)
+        self.rows= []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.rows= json.load(f)["rows"]
+
+    def replace(self, rows):
+        "Replace the snapshot with freshly downloaded master rows"
+        self.rows= [[cell_text(value) for value in row] for row in rows]
+        self.save()
+
+    def refresh(self, service):
+        "Download the whole master sheet into the snapshot"
+        result= service.spreadsheets().values().get(
+            spreadsheetId= SPREADSHEET_ID, range= f"{SHEET_NAME}!A1:{LAST_COLUMN}").execute()
+        self.replace(result.get("values", []))
+
+    def apply(self, sheet_rows):
+        "Record rows written to the master, dict of sheet row number (1-based) -> values"
+        for sheet_row, values in sorted(sheet_rows.items()):
+            while len(self.rows) < sheet_row:
+                self.rows.append([])
+            self.rows[sheet_row - 1]= [cell_text(value) for value in values]
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents= True, exist_ok= True)
+        temp_path= self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"rows": self.rows}, f)
+        os.replace(temp_path, self.path)
+
+
+def cell_text(value):
+    "Cell value as the text pushed to / stored for the sheet, blank for None"
+    return "" if value is None else str(value)
+
+
+def rows_to_frame(rows):
+    """
+    Description: Data rows (header excluded) to a DataFrame of NUM_COLUMNS
+                 object columns, indexed by sheet row number (data starts on row 2)
+    """
+    padded= [list(row[:NUM_COLUMNS]) + [None] * (NUM_COLUMNS - len(row[:NUM_COLUMNS]))
+             for row in rows]
+    return pd.DataFrame(padded, columns= range(NUM_COLUMNS), dtype= object,
+                        index= pd.RangeIndex(2, len(padded) + 2))
+
+
+def normalize(frame):
+    """
+    Description: Canonical text per cell so sheet text, spreadsheet numbers
+                 and booleans compare equal: blanks -> "", numbers -> float text,
+                 booleans -> TRUE/FALSE, MSIDs upper case
+    """
+    text= frame.where(frame.notna(), "").astype(str)
+    text[KEY_COLUMNS[0]]= text[KEY_COLUMNS[0]].str.strip().str.upper()
+    for column in text.columns[1:]:
+        stripped= text[column].str.strip()
+        numeric= pd.to_numeric(stripped, errors= "coerce")
+        upper= stripped.str.upper()
+        text[column]= np.where(numeric.notna(), numeric.astype(float).astype(str),
+                               np.where(upper.isin(["TRUE", "FALSE"]), upper, stripped))
+    return text
+
+
+def join_columns(text, columns):
+    "Join normalized columns into one signature string per row"
+    return text[columns[0]].str.cat([text[column] for column in columns[1:]], sep= "|")
+
+
+def diff_rows(master_rows, loaded_rows):
+    """
+    Description: Classify every non-blank loaded row against the master rows
+    Input: master rows and loaded file rows, both lists of lists with a header row
+    Output: DataFrame indexed by loaded file row number with columns key,
+            action, sheet_row (master row number, NaN for inserts) and reason
+    """
+    master= normalize(rows_to_frame(master_rows[1:]))
+    loaded= normalize(rows_to_frame(loaded_rows[1:]))
+    loaded= loaded[loaded[KEY_COLUMNS + VALUE_COLUMNS].ne("").any(axis= 1)]
+
+    master_keys= pd.DataFrame({"key": join_columns(master, KEY_COLUMNS),
+                               "master_values": join_columns(master, VALUE_COLUMNS)})
+    master_keys["sheet_row"]= master_keys.index
+    master_count= master_keys.groupby("key").size()
+
+    plan= pd.DataFrame({"key": join_columns(loaded, KEY_COLUMNS),
+                        "values": join_columns(loaded, VALUE_COLUMNS)})
+    plan.index.name= "file_row"
+    # Identical duplicates in the file are pushed once
+    plan= plan[~plan.duplicated(["key", "values"])]
+    file_variants= plan.groupby("key")["values"].transform("size")
+
+    plan= plan.reset_index().merge(
+        master_keys.drop_duplicates("key"), on= "key", how= "left").set_index("file_row")
+    plan["master_count"]= plan["key"].map(master_count).fillna(0).astype(int)
+    file_variants= file_variants.reindex(plan.index)
+
+    conditions= [file_variants > 1, plan["master_count"] > 1,
+                 plan["sheet_row"].isna(), plan["values"] == plan["master_values"]]
+    plan["action"]= np.select(conditions, ["conflict", "conflict", "insert", "no-op"], "update")
+    plan["reason"]= np.select(
+        conditions[:2],
+        ["key repeated in the file with different limits", "key matches several master rows"], "")
+    return plan[["key", "action", "sheet_row", "reason"]]
+
+
+def contiguous_ranges(sheet_rows):
+    "Group sorted sheet row numbers into (first, last) runs of consecutive rows"
+    sheet_rows= np.sort(np.asarray(sheet_rows, dtype= int))
+    if len(sheet_rows) == 0:
+        return []
+    breaks= np.flatnonzero(np.diff(sheet_rows) != 1)
+    starts= np.append(sheet_rows[0], sheet_rows[breaks + 1])
+    ends= np.append(sheet_rows[breaks], sheet_rows[-1])
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def a1_range(first, last):
+    return f"{SHEET_NAME}!A{first}:{LAST_COLUMN}{last}"
+
+
+def verify_snapshot(service, snapshot, plan):
+    """
+    Description: Read back only the master rows about to be updated plus the
+                 row after the snapshot's end, in one values().batchGet
+    Output: (True if rows were appended since the snapshot,
+             dict of sheet row -> live values for rows edited since the snapshot)
+    """
+    update_rows= plan.loc[plan["action"] == "update", "sheet_row"].astype(int).tolist()
+    end_row= len(snapshot.rows) + 1
+    ranges= [a1_range(first, last) for first, last in contiguous_ranges(update_rows)]
+    ranges.append(a1_range(end_row, end_row))
+    result= service.spreadsheets().values().batchGet(
+        spreadsheetId= SPREADSHEET_ID, ranges= ranges).execute()
+    value_ranges= result.get("valueRanges", [])
+
+    grown= bool(value_ranges[-1].get("values")) if value_ranges else False
+    live= {}
+    for (first, last), value_range in zip(contiguous_ranges(update_rows), value_ranges):
+        values= value_range.get("values", [])
+        for sheet_row in range(first, last + 1):
+            offset= sheet_row - first
+            live[sheet_row]= values[offset] if offset < len(values) else []
+
+    if not live:
+        return grown, {}
+    rows= sorted(live)
+    live_text= normalize(rows_to_frame([live[row] for row in rows]))
+    snap_text= normalize(rows_to_frame([snapshot.rows[row - 1] for row in rows]))
+    edited= (live_text.values != snap_text.values).any(axis= 1)
+    return grown, {row: live[row] for row, changed in zip(rows, edited) if changed}
+
+
+def push_rows(service, plan, loaded_rows, snapshot, ticket):
+    """
+    Description: Write the plan's inserts and updates with one values().batchUpdate
+    Output: dict of sheet row -> values written
+    """
+    written= {}
+    for file_row, sheet_row in plan.loc[plan["action"] == "update", "sheet_row"].items():
+        written[int(sheet_row)]= loaded_rows[file_row - 1]
+    next_row= len(snapshot.rows) + 1
+    for file_row in plan.index[plan["action"] == "insert"]:
+        written[next_row]= loaded_rows[file_row - 1]
+        next_row+= 1
+
+    written= {
+        sheet_row: ["" if value is None else value for value in (list(row[:TICKET_COLUMN]) +
+                    [None] * (TICKET_COLUMN - len(row)))] + [str(ticket)]
+        for sheet_row, row in written.items()
+    }
+    data= [{"range": a1_range(first, last),
+            "values": [written[row] for row in range(first, last + 1)]}
+           for first, last in contiguous_ranges(list(written))]
+    if data:
+        service.spreadsheets().values().batchUpdate(
+            spreadsheetId= SPREADSHEET_ID,
+            body= {"valueInputOption": "USER_ENTERED", "data": data}).execute()
+    return written
+
+
+def merge_file(service, snapshot, loaded_rows, ticket):
+    """
+    Description: Diff the loaded rows against the snapshot, check the rows to be
+                 touched against the live master, and push the minimal changes.
+                 Nothing is pushed while any row is in conflict. When rows were
+                 appended to the master since the snapshot it is refreshed once
+                 and the diff redone.
+    Input: Sheets service, MasterSnapshot, loaded file rows (header first), ticket
+    Output: The final plan DataFrame (see diff_rows)
+    """
+    for attempt in range(2):
+        if not snapshot.rows:
+            snapshot.refresh(service)
+        plan= diff_rows(snapshot.rows, loaded_rows)
+        if (plan["action"] == "conflict").any() or plan["action"].isin(["insert", "update"]).sum() == 0:
+            return plan
+
+        grown, edited= verify_snapshot(service, snapshot, plan)
+        if edited:
+            snapshot.apply(edited)
+            is_edited= plan["sheet_row"].isin(list(edited))
+            plan.loc[is_edited, "action"]= "conflict"
+            plan.loc[is_edited, "reason"]= "master row edited since the snapshot"
+            return plan
+        if grown and attempt == 0:
+            snapshot.refresh(service)
+            continue
+        if grown:
+            raise RuntimeError("Master sheet keeps changing, try the merge again")
+
+        snapshot.apply(push_rows(service, plan, loaded_rows, snapshot, ticket))
+        return plan
+
+
+def summarize(plan):
+    "Counts per action, e.g. {'insert': 2, 'update': 1, 'no-op': 10, 'conflict': 0}"
+    counts= plan["action"].value_counts()
+    return {action: int(counts.get(action, 0)) for action in ("insert", "update", "no-op", "conflict")}
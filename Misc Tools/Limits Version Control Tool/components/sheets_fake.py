@@ -0,0 +1,136 @@
+"""
+In-memory stand-in for the Google Sheets v4 service object, covering the calls
+the Limits tool makes (values get/batchGet/batchUpdate/append, spreadsheets
+get/batchUpdate). Values are kept as the text the sheet would display, and
+every executed call is recorded in `calls` so pushes can be checked offline.
+"""
+
+import re
+
+A1_PATTERN= re.compile(r"^(?:(?P<sheet>[^!]+)!)?(?P<c1>[A-Z]+)(?P<r1>\d*)(?::(?P<c2>[A-Z]+)(?P<r2>\d*))?$")
+
+
+def column_index(letters):
+    "A -> 0, Q -> 16, AA -> 26"
+    index= 0
+    for letter in letters:
+        index= index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def parse_a1(a1_range):
+    "'Sheet1!A2:Q5' -> (sheet, first row, last row or None, first col, last col), 0-based"
+    match= A1_PATTERN.match(a1_range)
+    if not match:
+        raise ValueError(f"Unsupported A1 range: {a1_range}")
+    c1, r1, c2, r2= match.group("c1", "r1", "c2", "r2")
+    c2= c2 or c1
+    r2= r2 if match.group("c2") else r1
+    return (match.group("sheet"), int(r1) - 1 if r1 else 0, int(r2) - 1 if r2 else None,
+            column_index(c1), column_index(c2))
+
+
+def display_text(value):
+    "Text a USER_ENTERED value shows as in the sheet"
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class FakeRequest:
+    def __init__(self, service, name, handler):
+        self.service, self.name, self.handler= service, name, handler
+
+    def execute(self):
+        self.service.calls.append(self.name)
+        return self.handler()
+
+
+class FakeValues:
+    def __init__(self, service):
+        self.service= service
+
+    def get(self, spreadsheetId, range, **kwargs):
+        return FakeRequest(self.service, "values.get",
+                           lambda: {"range": range, "values": self.service.read(range)})
+
+    def batchGet(self, spreadsheetId, ranges, **kwargs):
+        return FakeRequest(self.service, "values.batchGet", lambda: {
+            "valueRanges": [{"range": a1, "values": self.service.read(a1)} for a1 in ranges]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        def handler():
+            for entry in body["data"]:
+                self.service.write(entry["range"], entry["values"])
+            self.service.updated_ranges.extend(entry["range"] for entry in body["data"])
+            return {"totalUpdatedRows": sum(len(entry["values"]) for entry in body["data"])}
+        return FakeRequest(self.service, "values.batchUpdate", handler)
+
+    def append(self, spreadsheetId, range, valueInputOption, body):
+        def handler():
+            start= len(self.service.rows)
+            for offset, row in enumerate(body["values"]):
+                self.service.write(f"A{start + offset + 1}", [row])
+            return {"updates": {"updatedRows": len(body["values"])}}
+        return FakeRequest(self.service, "values.append", handler)
+
+
+class FakeSpreadsheets:
+    def __init__(self, service):
+        self.service= service
+
+    def values(self):
+        return FakeValues(self.service)
+
+    def get(self, spreadsheetId, **kwargs):
+        return FakeRequest(self.service, "spreadsheets.get", lambda: {"sheets": [
+            {"properties": {"title": self.service.sheet_name, "sheetId": self.service.sheet_id}}]})
+
+    def batchUpdate(self, spreadsheetId, body):
+        def handler():
+            self.service.format_requests.extend(body["requests"])
+            return {"replies": [{} for _ in body["requests"]]}
+        return FakeRequest(self.service, "spreadsheets.batchUpdate", handler)
+
+
+class FakeSheetsService:
+    "Single-sheet fake of build('sheets', 'v4', ...)"
+
+    def __init__(self, rows=None, sheet_name="Sheet1", sheet_id=0):
+        self.rows= [[display_text(value) for value in row] for row in (rows or [])]
+        self.sheet_name= sheet_name
+        self.sheet_id= sheet_id
+        self.calls= []
+        self.updated_ranges= []
+        self.format_requests= []
+
+    def spreadsheets(self):
+        return FakeSpreadsheets(self)
+
+    def read(self, a1_range):
+        "Values in the range, with trailing blank cells and rows trimmed like the API"
+        _, first_row, last_row, first_col, last_col= parse_a1(a1_range)
+        last_row= len(self.rows) - 1 if last_row is None else last_row
+        values= []
+        for row in self.rows[first_row:last_row + 1]:
+            cells= row[first_col:last_col + 1]
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+        return values
+
+    def write(self, a1_range, values):
+        _, first_row, _, first_col, _= parse_a1(a1_range)
+        for offset, row in enumerate(values):
+            while len(self.rows) <= first_row + offset:
+                self.rows.append([])
+            target= self.rows[first_row + offset]
+            if len(target) < first_col + len(row):
+                target.extend([""] * (first_col + len(row) - len(target)))
+            target[first_col:first_col + len(row)]= [display_text(value) for value in row]
@@ -4,27 +4,12 @@ from pathlib import Path
 from PyQt5.QtWidgets import QMessageBox, QPushButton, QHBoxLayout
 from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtCore import QUrl
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from components.google_auth import get_sheets_api_service
 from components.load_file import clear_loaded_file
 from components.misc import create_separator
-
-
-SPREADSHEET_ID= "15rRk5JAMWXBGiKTly4aP0cUuFE1qECZe01tNESSKXBo"
-
-
-def update_google_sheet(self):
-    "update the google sheets file via API"
-
-    body= {"values": self.excel_file_data[1:]}
-
-    self.sheets_service.spreadsheets().values().append(
-        spreadsheetId= SPREADSHEET_ID,
-        range= "Sheet1!A1:P",
-        valueInputOption= "USER_ENTERED",
-        body= body
-        ).execute()
+from components.sheets_diff import SPREADSHEET_ID, merge_file, summarize
+from components.xlsx_export import rows_digest, write_limits_workbook
+from limits_history import LimitsHistory
 
 
 def update_sheet_format(self):
@@ -32,7 +17,7 @@ def update_sheet_format(self):
     spreadsheet = self.sheets_service.spreadsheets().get(spreadsheetId= SPREADSHEET_ID).execute()
     sheet_id = next(s['properties']['sheetId'] for s in spreadsheet['sheets'] 
                         if s['properties']['title'] == "Sheet1")
-    num_rows= len(self.sheets_data) + len(self.excel_file_data) - 1
+    num_rows= len(self.master_snapshot.rows)
     num_cols= 17  # Columns A through Q
 
     border_style = {
@@ -93,144 +78,89 @@ def update_sheet_format(self):
     self.sheets_service.spreadsheets().batchUpdate(spreadsheetId= SPREADSHEET_ID, body={"requests": requests}).execute()
 
 
-def append_jira_ticket_num(self):
-    "Append the jira ticket number to the end of the excel sheet data before push to google sheets"
-    for row in self.excel_file_data:
-        try:
-            row[16] = str(self.ticket_obj)
-        except IndexError:
-            row.append(str(self.ticket_obj))
+def record_limits_history(self, source):
+    "Append the current master state to the local limits history"
+    history= LimitsHistory()
+    try:
+        added, removed= history.ingest(self.master_snapshot.rows, source)
+        print(f" - Limits history: {added} rows added, {removed} removed ({source})")
+    finally:
+        history.close()
 
 
-def try_numeric(value):
+def export_master(self, file_output_path, job):
     """
-        Attempts to convert a string value into a native Python integer or float.
-
-        This utility is primarily used when preparing data for Excel exports to 
-        ensure that numeric strings are stored as numbers rather than text. This 
-        enables proper sorting, filtering, and mathematical calculations within 
-        the spreadsheet.
-
-        The conversion follows a specific priority:
-        1. Integer (if the string represents a whole number).
-        2. Float (if the string represents a decimal).
-        3. Original value (if conversion fails or the input is not a string).
-
-        Args:
-            value (any): The input data to be checked. Usually a string extracted 
-                from a UI element or a raw data file.
-
-        Returns:
-            int | float | any: The converted numeric value if successful; 
-                otherwise, returns the original value unchanged.
-
-        Example:
-            >>> try_numeric(" 123 ")
-            123
-            >>> try_numeric("45.67")
-            45.67
-            >>> try_numeric("Chandra")
-            'Chandra'
+    Description: Background part of the export: refresh the master rows and
+                 write them to file_output_path unless that file is already current
+    Output: (master rows, True if the file was written)
     """
-    if isinstance(value, str):
-        # Remove whitespace to prevent conversion errors
-        clean_val = value.strip()
-        
-        # Try Integer first
-        try:
-            return int(clean_val)
-        except ValueError:
-            pass
-        
-        # Try Float second
-        try:
-            return float(clean_val)
-        except ValueError:
-            pass
-            
-    return value
+    # Refresh the sheets data in the event it was edited externally
+    _, sheets_data= get_sheets_api_service(self)
+    self.master_snapshot.replace(sheets_data)
+    job.check_cancelled()
 
+    digest= rows_digest(sheets_data)
+    last_export= self.last_exports.get(str(file_output_path))
+    if (last_export and file_output_path.exists() and
+            last_export == (digest, file_output_path.stat().st_mtime_ns)):
+        return sheets_data, False
 
-def sheet_data_to_excel(self, to_svn= False):
+    job.report(f"Writing {file_output_path.name}...")
+    write_limits_workbook(sheets_data, file_output_path)
+    self.last_exports[str(file_output_path)]= (digest, file_output_path.stat().st_mtime_ns)
+    return sheets_data, True
+
+
+def sheet_data_to_excel(self, to_svn= False, then= None):
     """
         Converts retrieved Google Sheets data into a formatted Excel (.xlsx) file.
 
-        This method initializes a new OpenPyXL workbook, applies custom styling 
-        (borders, fonts, and fills), and saves the final product to the local 
-        SVN directory.
+        The export itself is done by `components.xlsx_export.write_limits_workbook`,
+        which streams the rows with shared header/data formats and saves through a
+        temp file renamed over the target. Refresh and write run as a background
+        job queued with the other master actions; `then` is called on the GUI
+        thread once the file is current (used by Save to SVN to commit it).
 
         Process Flow:
-        1.  **Initialization**: Creates a workbook and sets the active sheet title.
-        2.  **Data Processing**: Iterates through `self.sheets_data`, converting 
-            numeric strings to actual integers/floats using `try_numeric`.
-        3.  **Styling**: 
-            - Applies a gray 'PatternFill' and bold font to the header row.
-            - Applies thin borders and center alignment to all cells.
-        4.  **Layout Optimization**: Dynamically calculates and adjusts column 
-            widths based on the longest string in each column.
-        5.  **I/O**: Saves the file as 'chandra_limits.xlsx' in the path defined 
-            by `self.svn_path`.
+        1.  **Refresh**: Pulls the current master rows and updates the local snapshot.
+        2.  **Skip Check**: If these exact rows were already exported to the target
+            and the file has not been touched since, nothing is rewritten.
+        3.  **Data Processing**: Numeric strings become integers/floats and column
+            widths are sized to the longest value, column by column in pandas.
+        4.  **Styling**: Gray bold header row; thin borders and center alignment
+            on all cells.
+        5.  **I/O**: Saves 'chandra_limits.xlsx' to `self.svn_path` (to_svn) or
+            the Desktop. A locked target (open in Excel) is left untouched.
 
         Raises:
             OSError: If the directory in `self.svn_path` is invalid or unwritable.
             AttributeError: If `self.sheets_data` or `self.svn_path` are not defined.
     """
-
-    # Refresh the sheets data in the event it was edited externally
-    _, self.sheets_data= get_sheets_api_service(self)
-
-    wb= openpyxl.Workbook()
-    ws= wb.active
-    ws.title= "Chandra Limits"
-
     if to_svn:
         file_output_path= Path(self.svn_path) / "chandra_limits.xlsx"
     else:
         file_output_path= Path.home() / "Desktop" / "chandra_limits.xlsx"
 
-    header_fill= PatternFill(start_color= "D9D9D9", end_color= "D9D9D9", fill_type= "solid")
-    header_font = Font(bold=True, size=12)
-    thin_border = Border(
-        left=Side(style='thin'), right=Side(style='thin'), 
-        top=Side(style='thin'), bottom=Side(style='thin'))
-    center_align = Alignment(horizontal="center", vertical="center")
-
-    # Append data to excel sheet
-    for element in self.sheets_data:
-        converted_row= [try_numeric(item) for item in element]
-        ws.append(converted_row)
-
-    # Apply formatting to Header (Row 1)
-    for cell in ws[1]:
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = thin_border
-
-    # Apply formatting to Data (All other rows)
-    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
-        for cell in row:
-            cell.alignment = center_align
-            cell.border = thin_border
-
-    # Auto-adjust column widths
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter
-        for cell in col:
-            if cell.value:
-                max_length = max(max_length, len(str(cell.value)))
-        ws.column_dimensions[column].width = max_length + 2
-
-    try:
-        wb.save(file_output_path)
-        save_msg= QMessageBox()
-        save_msg.setWindowTitle("File Saved...")
-        save_msg.setText("Successfully saved Google Sheets Master data "
-                         f"to chandra_limits.xlsx! on {file_output_path.parent}.")
-        save_msg.setIcon(QMessageBox.Icon.Information)
-        save_msg.exec()
-    except PermissionError:
+    def export_done(result):
+        self.sheets_data, written= result
+        if written:
+            save_msg= QMessageBox()
+            save_msg.setWindowTitle("File Saved...")
+            save_msg.setText("Successfully saved Google Sheets Master data "
+                             f"to chandra_limits.xlsx! on {file_output_path.parent}.")
+            save_msg.setIcon(QMessageBox.Icon.Information)
+            save_msg.exec()
+        else:
+            QMessageBox.information(self, "File Up To Date",
+                                    f"chandra_limits.xlsx on {file_output_path.parent} already "
+                                    "matches the Google Sheets Master.")
+        if then:
+            then()
+
+    def export_failed(error):
+        if not isinstance(error, PermissionError):
+            QMessageBox.critical(self, "Cannot Save File", str(error))
+            return
         # This triggers if the file is open in Excel
         err_msg = QMessageBox()
         err_msg.setIcon(QMessageBox.Critical)
@@ -243,8 +173,27 @@ def sheet_data_to_excel(self, to_svn= False):
         err_msg.setStandardButtons(QMessageBox.Ok | QMessageBox.Cancel)
         
         if err_msg.exec_() == QMessageBox.Ok:
-            # Recursive call to try saving again
-            sheet_data_to_excel(self)
+            # Queue the save again
+            sheet_data_to_excel(self, to_svn, then)
+
+    self.jobs.submit("Saving Google Sheets Master",
+                     lambda job: export_master(self, file_output_path, job),
+                     on_done= export_done, on_error= export_failed, group= "master")
+
+
+def merge_job(self, loaded_rows, ticket, job):
+    """
+    Background part of the merge: diff and push, then format the sheet and
+    record the history when rows changed. Not cancellable once pushed.
+    """
+    job.check_cancelled()
+    plan= merge_file(self.sheets_service, self.master_snapshot, loaded_rows, ticket)
+    counts= summarize(plan)
+    if not counts["conflict"] and (counts["insert"] or counts["update"]):
+        job.report("Formatting Google Sheets Master...")
+        update_sheet_format(self)
+        record_limits_history(self, f"merge {ticket}")
+    return plan
 
 
 def merge_to_master(self):
@@ -260,18 +209,41 @@ def merge_to_master(self):
     mrg_msg.addButton(QMessageBox.StandardButton.Cancel)
     mrg_msg.exec()
 
-    if mrg_msg.clickedButton() == continue_button:
-
-        # Refresh the sheets data in the event it was edited externally
-        _, self.sheets_data= get_sheets_api_service(self)
+    if mrg_msg.clickedButton() != continue_button:
+        return
+    # The loaded file and ticket may change while the merge waits in the queue
+    file_name, loaded_rows, ticket= self.fileName, self.excel_file_data, self.ticket_obj
+
+    def merge_done(plan):
+        self.sheets_data= self.master_snapshot.rows
+        counts= summarize(plan)
+
+        if counts["conflict"]:
+            conflicts= plan[plan["action"] == "conflict"]
+            conflict_msg= QMessageBox(self)
+            conflict_msg.setWindowTitle("Merge Conflicts")
+            conflict_msg.setIcon(QMessageBox.Icon.Warning)
+            conflict_msg.setText(f"{counts['conflict']} row(s) in ({file_name}) conflict with "
+                                 "the Google Sheets Master. Nothing was merged.")
+            conflict_msg.setDetailedText("\n".join(
+                f"Row {file_row}: {key.split('|')[0]} - {reason}"
+                for file_row, key, reason in zip(conflicts.index, conflicts["key"], conflicts["reason"])))
+            conflict_msg.exec()
+            return
 
-        # Update Google Sheets file with excel data
-        append_jira_ticket_num(self)
-        update_google_sheet(self)
-        update_sheet_format(self)
         QMessageBox.information(self, "Success",
-                        f"Successfully merged spreadsheet ({self.fileName}) to Google Sheets Master!")
-        clear_loaded_file(self)
+                        f"Successfully merged spreadsheet ({file_name}) to Google Sheets Master!"
+                        f"\n\n{counts['insert']} row(s) added, {counts['update']} row(s) updated, "
+                        f"{counts['no-op']} row(s) unchanged.")
+        if self.excel_file_data is loaded_rows:
+            clear_loaded_file(self)
+
+    # Diff against the local master snapshot and push only inserted/updated rows
+    self.jobs.submit(f"Merging {Path(file_name).name}",
+                     lambda job: merge_job(self, loaded_rows, ticket, job),
+                     on_done= merge_done,
+                     on_error= lambda e: QMessageBox.critical(self, "Merge Failed", str(e)),
+                     group= "master")
 
 
 def open_sheets_master():
@@ -1,11 +1,10 @@
 
 from PyQt5.QtWidgets import QHBoxLayout, QPushButton, QMessageBox, QFileDialog, QLabel
 from PyQt5.QtCore import Qt
-import os
 import subprocess
-from pathlib import Path
 from components.misc import create_separator, validate_all_conditions
 from components.sheets_master import sheet_data_to_excel
+from components.svn_ops import commit_limits_file, update_limits_file, record_svn_history
 
 
 class SVNCommitBox():
@@ -38,147 +37,108 @@ class SVNCommitBox():
         self.svn_commit_box.setTextFormat(Qt.RichText)
 
 
-def get_svn_bin_path():
+def svn_commit_file(svn_path, ticket, job):
     """
-        Dynamically locates the 'bin' directory of the bundled portable SVN tools.
-    """
-    # Locate the svn-tools directory relative to this component file
-    component_dir = Path(__file__).resolve().parent
-
-    # Try current folder, then one level up (root)
-    svn_bin_dir = component_dir / "svn-tools" / "bin"
-    if not svn_bin_dir.exists():
-        svn_bin_dir = component_dir.parent / "svn-tools" / "bin"
-
-    svn_exe = svn_bin_dir / "svn.exe"
-
-    # Environment and DLL Handling
-    # Adding the bin directory to PATH ensures svn.exe can see libapr-1.dll 
-    # even when running from a network share.
-    env = os.environ.copy()
-    env["PATH"] = str(svn_bin_dir) + os.pathsep + env.get("PATH", "")
-
-    # For Python 3.8+, we must explicitly trust the DLL directory
-    dll_handler = None
-    if hasattr(os, 'add_dll_directory'):
-        dll_handler = os.add_dll_directory(str(svn_bin_dir))
-    
-    return svn_exe, env, dll_handler
+        Commits the 'chandra_limits.xlsx' file to the Subversion repository using 
+        bundled portable SVN tools, then records the new revision in the local
+        limits history. Runs on the background job runner (components.jobs), so
+        it must not touch widgets; the result goes to commit_to_svn's callback.
 
+        The svn calls themselves live in components.svn_ops, which finds the
+        bundled tools, manages their DLLs and runs svn from a local disk path
+        rather than the UNC share the tool may be started from.
 
-def svn_commit_file(self):
-    """
-        Commits the 'chandra_limits.xlsx' file to the Subversion repository using 
-        bundled portable SVN tools.
-
-        This function handles the specific challenges of running portable binaries 
-        from a network share (UNC paths) and managing DLL dependencies in 
-        modern Python environments.
-
-        Key Features:
-        ----------
-        - Dynamic Path Resolution: Locates 'svn-tools' relative to the script 
-        location to maintain portability across different user environments.
-        - DLL Management: Uses 'os.add_dll_directory' (Python 3.8+) to explicitly 
-        trust the bundled bin folder, resolving 'libapr-1.dll not found' errors.
-        - Path Priority: Prepend the bin directory to the system PATH environment 
-        variable for the duration of the subprocess call.
-        - UNC Path Workaround: Sets the 'cwd' (Current Working Directory) to a 
-        local disk path (the file's parent directory) to prevent CMD errors 
-        when executing binaries from a network share.
-
-        Attributes Required:
+        Arguments:
         -------------------
-        - self.svn_path (str/Path): The local directory of the SVN checkout.
-        - self.ticket_obj (str, optional): JIRA ticket number for the commit message.
+        - svn_path (str/Path): The local directory of the SVN checkout.
+        - ticket (str): JIRA ticket number for the commit message.
+        - job (Job): The running job, checked for cancellation between svn calls.
 
         Returns:
         -------
-        - bool: True if 'add' and 'commit' operations were successful, False otherwise.
+        - (bool, bool): Whether the commit went through, and whether the limits
+        history import after it completed (False when it was cancelled; the
+        next commit or pull picks the revision up).
 
         Raises:
         -------
-        - subprocess.CalledProcessError: Captured internally; prints STDOUT and 
-        STDERR to the console for debugging.
+        - InterruptedError: Cancelled before the commit was made. A failed svn
+        call is not raised, its STDOUT and STDERR are printed and (False, False)
+        is returned.
     """
-    # Pathing for Excel file
-    file_path = Path(self.svn_path) / "chandra_limits.xlsx"
-    ticket = getattr(self, "ticket_obj", "No JIRA Ticket")
-    commit_message = f"Updated chandra_limits.xlsx ({ticket})"
-    svn_exe, env, dll_handler= get_svn_bin_path()
-
     try:
-        subprocess.run(
-            [str(svn_exe), "add", str(file_path), "--force"],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env,
-            cwd=str(file_path.parent) # Change working directory to local disk
-        )
-
-        subprocess.run(
-            [str(svn_exe), "commit", str(file_path), "-m", commit_message],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env,
-            cwd=str(file_path.parent)
-        )
-        return True
-
+        commit_limits_file(svn_path, ticket, job.is_cancelled)
     except subprocess.CalledProcessError as e:
         print(f"SVN FAILED.\nSTDOUT: {e.stdout}\nSTDERR: {e.stderr}")
-        return False
+        return False, False
 
-    finally:
-        if dll_handler:
-            dll_handler.close()
+    # The commit is in the repository now, a cancel only skips the history import
+    job.report("Recording limits history...")
+    try:
+        record_svn_history(svn_path, job.is_cancelled)
+    except InterruptedError:
+        print(" - Limits history import cancelled, the commit was made")
+        return True, False
+    return True, True
 
 
-def save_to_svn(self):
-    "Open the SVN Directory Select Dialog Box"
-    sheet_data_to_excel(self, to_svn= True)
+def commit_to_svn(self):
+    "Confirm, then queue the SVN commit of the freshly saved chandra_limits.xlsx"
     commit_box= SVNCommitBox()
     commit_box.svn_commit_box.exec_()
 
-    if commit_box.svn_commit_box.clickedButton() == commit_box.svn_cont_btn:
-        commit_success= svn_commit_file(self)
+    if commit_box.svn_commit_box.clickedButton() != commit_box.svn_cont_btn:
+        return
+    svn_path, ticket= self.svn_path, getattr(self, "ticket_obj", "No JIRA Ticket")
 
-        if commit_success:
+    def commit_done(result):
+        commit_success, history_recorded= result
+        if commit_success and not history_recorded:
+            QMessageBox.information(self, "File Successfully Commited",
+                                    "Successfully SVN commited chandra_limits.xlsx to repo.\n\n"
+                                    "Only the limits history import was cancelled, it catches up "
+                                    "on the next commit or pull.")
+        elif commit_success:
             QMessageBox.information(self, "File Successfully Commited",
                                     f"Successfully SVN commited chandra_limits.xlsx to repo")
         else:
             QMessageBox.information(self, "File Commit Failed",
                                     f"Thats not a moon, its a Space Station.")
 
+    self.jobs.submit("Committing chandra_limits.xlsx",
+                     lambda job: svn_commit_file(svn_path, ticket, job),
+                     on_done= commit_done, group= "master")
+
+
+def save_to_svn(self):
+    "Save the master to the SVN directory, then offer to commit it"
+    sheet_data_to_excel(self, to_svn= True, then= lambda: commit_to_svn(self))
+
+
+def svn_update_file(svn_path, job):
+    "Background part of the pull: svn update, then record new revisions in the history"
+    update_limits_file(svn_path, job.is_cancelled)
+    job.report("Recording limits history...")
+    record_svn_history(svn_path, job.is_cancelled)
+
 
 def pull_from_svn(self):
     "Pull the latest version of the chandra_limits.xlsx file from SVN and overwrite local copy"
-    # Pathing for Excel file
-    file_path = Path(self.svn_path) / "chandra_limits.xlsx"
-    svn_exe, env, dll_handler= get_svn_bin_path()
+    svn_path= self.svn_path
 
-    try:
-        subprocess.run(
-            [str(svn_exe), "update", str(file_path)],
-            check=True,
-            capture_output=True,
-            text=True,
-            env=env,
-            cwd=str(file_path.parent) # Change working directory to local disk
-        )
-        QMessageBox.information(self, "SVN Update Successful!",
-                        f"Successfully updated SVN repository {self.svn_path}.")
-
-    except subprocess.CalledProcessError as e:
-        print(f"SVN FAILED.\nSTDOUT: {e.stdout}\nSTDERR: {e.stderr}")
+    def pull_failed(e):
+        if isinstance(e, subprocess.CalledProcessError):
+            print(f"SVN FAILED.\nSTDOUT: {e.stdout}\nSTDERR: {e.stderr}")
+        else:
+            print(f"SVN FAILED: {e}")
         QMessageBox.information(self, "SVN Update Failed!",
-                        f"Failed to update SVN repository {self.svn_path}.")
+                        f"Failed to update SVN repository {svn_path}.")
 
-    finally:
-        if dll_handler:
-            dll_handler.close()
+    self.jobs.submit("Updating from SVN", lambda job: svn_update_file(svn_path, job),
+                     on_done= lambda _: QMessageBox.information(
+                         self, "SVN Update Successful!",
+                         f"Successfully updated SVN repository {svn_path}."),
+                     on_error= pull_failed, group= "master")
 
 
 def open_svn_dialog(self):
@@ -0,0 +1,108 @@
+"""
+Subversion calls for chandra_limits.xlsx, kept free of Qt so they can run in
+background jobs (components.jobs) and in svn_check.py.
+
+svn commands are always run to completion once started: killing svn midway
+leaves the working copy locked until an 'svn cleanup'. A cancelled() callable
+is checked between commands instead, raising InterruptedError.
+"""
+
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from limits_history import LimitsHistory
+
+LIMITS_FILE= "chandra_limits.xlsx"
+
+
+def get_svn_bin_path():
+    """
+        Dynamically locates the 'bin' directory of the bundled portable SVN tools,
+        falling back to the svn on PATH where the bundled Windows build is absent.
+    """
+    # Locate the svn-tools directory relative to this component file
+    component_dir = Path(__file__).resolve().parent
+
+    # Try current folder, then one level up (root)
+    svn_bin_dir = component_dir / "svn-tools" / "bin"
+    if not svn_bin_dir.exists():
+        svn_bin_dir = component_dir.parent / "svn-tools" / "bin"
+
+    svn_exe = svn_bin_dir / "svn.exe"
+    if os.name != "nt" and shutil.which("svn"): # bundled tools are a Windows build
+        return Path(shutil.which("svn")), os.environ.copy(), None
+
+    # Environment and DLL Handling
+    # Adding the bin directory to PATH ensures svn.exe can see libapr-1.dll
+    # even when running from a network share.
+    env = os.environ.copy()
+    env["PATH"] = str(svn_bin_dir) + os.pathsep + env.get("PATH", "")
+
+    # For Python 3.8+, we must explicitly trust the DLL directory
+    dll_handler = None
+    if hasattr(os, 'add_dll_directory'):
+        dll_handler = os.add_dll_directory(str(svn_bin_dir))
+
+    return svn_exe, env, dll_handler
+
+
+def check_cancelled(cancelled, step):
+    if cancelled and cancelled():
+        raise InterruptedError(f"SVN {step} cancelled")
+
+
+def run_svn(args, cwd, tool="svn"):
+    """
+    Description: Run one svn (or svnadmin) command with the bundled tools
+    Input: arguments, working directory (a local disk path, not the UNC share
+           the tool may be started from), executable name
+    Output: stdout. subprocess.CalledProcessError on failure
+    """
+    svn_exe, env, dll_handler= get_svn_bin_path()
+    if tool != "svn":
+        svn_exe= svn_exe.with_name(tool + svn_exe.suffix)
+    try:
+        return subprocess.run([str(svn_exe), *args], check= True, capture_output= True,
+                              text= True, env= env, cwd= str(cwd)).stdout
+    finally:
+        if dll_handler:
+            dll_handler.close()
+
+
+def commit_limits_file(svn_path, ticket, cancelled=None):
+    "svn add + commit of chandra_limits.xlsx in the working copy svn_path"
+    file_path= Path(svn_path) / LIMITS_FILE
+    check_cancelled(cancelled, "commit")
+    run_svn(["add", str(file_path), "--force"], file_path.parent)
+    check_cancelled(cancelled, "commit")
+    run_svn(["commit", str(file_path), "-m", f"Updated {LIMITS_FILE} ({ticket})"], file_path.parent)
+
+
+def update_limits_file(svn_path, cancelled=None):
+    "svn update of chandra_limits.xlsx in the working copy svn_path"
+    file_path= Path(svn_path) / LIMITS_FILE
+    check_cancelled(cancelled, "update")
+    run_svn(["update", str(file_path)], file_path.parent)
+
+
+def record_svn_history(svn_path, cancelled=None, history_path=None):
+    """
+    Description: Record new SVN revisions of chandra_limits.xlsx in the local
+                 limits history. SVN/IO failures are only reported, the history
+                 catches up on the next commit or pull.
+    Output: number of revisions recorded
+    """
+    svn_exe, env, dll_handler= get_svn_bin_path()
+    history= LimitsHistory(history_path)
+    try:
+        return history.import_svn(svn_path, svn_exe, env, cancelled)
+    except InterruptedError:
+        raise
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Limits history SVN import failed: {e}")
+        return 0
+    finally:
+        history.close()
+        if dll_handler:
+            dll_handler.close()
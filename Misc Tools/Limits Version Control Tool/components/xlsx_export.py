@@ -0,0 +1,140 @@
+"""
+Streaming export of the master limits rows to a formatted .xlsx.
+
+Rows are converted and measured column by column in pandas, then streamed
+row by row with one shared format for the header and one for the data cells:
+through XlsxWriter's constant-memory mode when it is installed, otherwise an
+openpyxl write-only workbook. The workbook is saved to a temp file next to the
+target and renamed over it, so a failed or locked save never leaves a partial
+chandra_limits.xlsx in the SVN working copy.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+try:
+    import xlsxwriter
+except ImportError: # optional, openpyxl write-only mode is used without it
+    xlsxwriter= None
+
+SHEET_TITLE= "Chandra Limits"
+INT_PATTERN= r"[+-]?\d+"
+
+
+def limits_styles():
+    "Named styles shared by every header / data cell"
+    thin_border= Border(left=Side(style='thin'), right=Side(style='thin'),
+                        top=Side(style='thin'), bottom=Side(style='thin'))
+    center_align= Alignment(horizontal="center", vertical="center")
+    header= NamedStyle(name= "limits_header", border= thin_border, alignment= center_align,
+                       font= Font(bold=True, size=12),
+                       fill= PatternFill(start_color= "D9D9D9", end_color= "D9D9D9",
+                                         fill_type= "solid"))
+    data= NamedStyle(name= "limits_data", border= thin_border, alignment= center_align)
+    return header, data
+
+
+def convert_frame(rows):
+    """
+    Description: Rows to a DataFrame whose numeric text is converted to int
+                 (whole numbers) or float, column by column; other text and
+                 non-string values are kept as they are
+    """
+    width= max((len(row) for row in rows), default= 0)
+    frame= pd.DataFrame([list(row) + [None] * (width - len(row)) for row in rows],
+                        columns= range(width), dtype= object)
+    for column in frame:
+        is_text= frame[column].map(type).eq(str)
+        stripped= frame[column].where(is_text, "").astype(str).str.strip()
+        numeric= pd.to_numeric(stripped.where(is_text, ""), errors= "coerce")
+        is_int= is_text & stripped.str.fullmatch(INT_PATTERN)
+        is_float= is_text & numeric.notna() & ~is_int
+        converted= frame[column].copy()
+        converted[is_int]= [int(value) for value in stripped[is_int]]
+        converted[is_float]= numeric[is_float].astype(float).tolist()
+        frame[column]= converted
+    return frame
+
+
+def column_widths(frame):
+    "Width per column: longest displayed value + 2, in one pass over the frame"
+    lengths= frame.astype(str).apply(lambda column: column.str.len())
+    lengths= lengths.where(frame.notna() & frame.ne("") & frame.ne(0), 0)
+    return (lengths.max(axis= 0).fillna(0).astype(int) + 2).tolist()
+
+
+def write_xlsxwriter(values, widths, path):
+    "Stream the rows with XlsxWriter, one shared format per row type"
+    wb= xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+    ws= wb.add_worksheet(SHEET_TITLE)
+    data_format= wb.add_format({"border": 1, "align": "center", "valign": "vcenter"})
+    header_format= wb.add_format({"border": 1, "align": "center", "valign": "vcenter",
+                                  "bold": True, "font_size": 12,
+                                  "pattern": 1, "fg_color": "#D9D9D9"})
+    for index, width in enumerate(widths):
+        ws.set_column(index, index, width)
+    for row_index, row in enumerate(values):
+        ws.write_row(row_index, 0, [value.item() if isinstance(value, np.generic) else value
+                                    for value in row],
+                     header_format if row_index == 0 else data_format)
+    wb.close()
+
+
+def write_openpyxl(values, widths, path):
+    "Stream the rows through an openpyxl write-only workbook with shared named styles"
+    header_style, data_style= limits_styles()
+    wb= Workbook(write_only= True)
+    wb.add_named_style(header_style)
+    wb.add_named_style(data_style)
+    ws= wb.create_sheet(SHEET_TITLE)
+    for index, width in enumerate(widths, start= 1):
+        ws.column_dimensions[get_column_letter(index)].width= width
+
+    for row_index, row in enumerate(values):
+        style= "limits_header" if row_index == 0 else "limits_data"
+        cells= []
+        for value in row:
+            cell= WriteOnlyCell(ws, value= value.item() if isinstance(value, np.generic) else value)
+            cell.style= style
+            cells.append(cell)
+        ws.append(cells)
+    wb.save(path)
+
+
+def rows_digest(rows):
+    "Hash of the exported rows, used to skip re-exporting identical data"
+    return hashlib.sha256(json.dumps(rows, default= str).encode("utf-8")).hexdigest()
+
+
+def write_limits_workbook(rows, output_path):
+    """
+    Description: Write rows (header first) to output_path as a formatted .xlsx,
+                 atomically via a temp file in the same directory
+    Input: list of row lists, target path
+    Output: None. PermissionError if the target is locked (e.g. open in Excel)
+    """
+    output_path= Path(output_path)
+    frame= convert_frame(rows)
+    widths= column_widths(frame)
+    values= frame.astype(object).where(frame.notna(), None).to_numpy()
+
+    fd, temp_path= tempfile.mkstemp(dir= output_path.parent, suffix= ".xlsx.tmp")
+    os.close(fd)
+    try:
+        if xlsxwriter is not None:
+            write_xlsxwriter(values, widths, temp_path)
+        else:
+            write_openpyxl(values, widths, temp_path)
+        os.chmod(temp_path, 0o644) # mkstemp is owner-only, the SVN copy must stay readable
+        os.replace(temp_path, output_path)
+    finally:
+        Path(temp_path).unlink(missing_ok= True)
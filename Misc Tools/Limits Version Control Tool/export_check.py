@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+export_check.py
+Check the streaming limits export against the original cell-by-cell openpyxl
+export (values, header/data styles, column widths), plus timings.
+
+Usage:
+    python export_check.py [--rows 20000] [--openpyxl]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+import numpy as np
+import openpyxl
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from components import xlsx_export
+from components.xlsx_export import write_limits_workbook
+
+HEADER= ["MSID", "Year", "DoY", "Hour", "Min", "Sec", "mSec", "Enabled MSID\n(True/False)",
+         "Warning-Low", "Caution-Low", "Caution-High", "Warning-High", "Greta-Low",
+         "Greta-High", "Planning-Low", "Planning-High", "JIRA"]
+
+
+# ----------------- Reference (original sheet_data_to_excel body) -----------------
+def try_numeric(value):
+    if isinstance(value, str):
+        clean_val = value.strip()
+        try:
+            return int(clean_val)
+        except ValueError:
+            pass
+        try:
+            return float(clean_val)
+        except ValueError:
+            pass
+    return value
+
+
+def reference_export(rows, file_output_path):
+    wb= openpyxl.Workbook()
+    ws= wb.active
+    ws.title= "Chandra Limits"
+
+    header_fill= PatternFill(start_color= "D9D9D9", end_color= "D9D9D9", fill_type= "solid")
+    header_font = Font(bold=True, size=12)
+    thin_border = Border(
+        left=Side(style='thin'), right=Side(style='thin'),
+        top=Side(style='thin'), bottom=Side(style='thin'))
+    center_align = Alignment(horizontal="center", vertical="center")
+
+    for element in rows:
+        ws.append([try_numeric(item) for item in element])
+    for cell in ws[1]:
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = center_align
+        cell.border = thin_border
+    for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
+        for cell in row:
+            cell.alignment = center_align
+            cell.border = thin_border
+    for col in ws.columns:
+        max_length = 0
+        column = col[0].column_letter
+        for cell in col:
+            if cell.value:
+                max_length = max(max_length, len(str(cell.value)))
+        ws.column_dimensions[column].width = max_length + 2
+    wb.save(file_output_path)
+
+
+# ----------------- Synthetic master rows (text, as the Sheets API returns them) ---------------
+def synthetic_rows(count, seed=0):
+    rng= np.random.default_rng(seed)
+    rows= [HEADER]
+    for index in range(count):
+        low= rng.uniform(-100, 0)
+        row= [f"C{index:06d}", "2024", str(1 + index % 366), "0", "0", "0", "0",
+              "TRUE" if index % 7 else "FALSE",
+              f"{low:.3f}", f"{low / 2:.2f}", f"{-low / 2:.2f}", f"{-low:.3f}",
+              str(int(low)), " 12 ", "", "1.5e3", f"CRF-{index % 50}"]
+        rows.append(row[:16] if index % 11 == 0 else row) # some rows lack the ticket
+    return rows
+
+
+def cell_signature(cell):
+    # Colors compared without the alpha byte, which the two writers set differently
+    return (cell.value, cell.font.b, cell.fill.fgColor.rgb[-6:] if cell.fill.fill_type else None,
+            cell.border.left.style, cell.alignment.horizontal)
+
+
+def column_width(ws, index):
+    "Width of a 1-based column, looking through grouped <col min max> entries"
+    for dimension in ws.column_dimensions.values():
+        if dimension.min <= index <= dimension.max:
+            return dimension.width
+    return None
+
+
+def compare(new_path, ref_path):
+    "Return a list of differences between the two workbooks"
+    new_ws= openpyxl.load_workbook(new_path).worksheets[0]
+    ref_ws= openpyxl.load_workbook(ref_path).worksheets[0]
+    problems= []
+    if new_ws.title != ref_ws.title:
+        problems.append(f"title {new_ws.title!r} != {ref_ws.title!r}")
+    for new_row, ref_row in zip(new_ws.iter_rows(), ref_ws.iter_rows()):
+        for new_cell, ref_cell in zip(new_row, ref_row):
+            if cell_signature(new_cell) != cell_signature(ref_cell):
+                problems.append(f"{ref_cell.coordinate}: {cell_signature(new_cell)} != "
+                                f"{cell_signature(ref_cell)}")
+    if (new_ws.max_row, new_ws.max_column) != (ref_ws.max_row, ref_ws.max_column):
+        problems.append("sheet dimensions differ")
+    # XlsxWriter stores widths with Excel's 0.71 character padding and groups equal columns
+    for index in range(1, ref_ws.max_column + 1):
+        new_width, ref_width= column_width(new_ws, index), column_width(ref_ws, index)
+        if abs(new_width - ref_width) > 1:
+            problems.append(f"column {index} width {new_width} != {ref_width}")
+    return problems
+
+
+def main():
+    parser= argparse.ArgumentParser(description= "Limits export regression check")
+    parser.add_argument("--rows", type= int, default= 20000, help= "Synthetic master rows")
+    parser.add_argument("--openpyxl", action= "store_true",
+                        help= "Check the openpyxl write-only path even if XlsxWriter is installed")
+    args= parser.parse_args()
+    if args.openpyxl:
+        xlsx_export.xlsxwriter= None
+
+    rows= synthetic_rows(args.rows)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        new_path, ref_path= Path(temp_dir, "new.xlsx"), Path(temp_dir, "reference.xlsx")
+        start= time.perf_counter()
+        write_limits_workbook(rows, new_path)
+        new_time= time.perf_counter() - start
+        start= time.perf_counter()
+        reference_export(rows, ref_path)
+        ref_time= time.perf_counter() - start
+
+        problems= compare(new_path, ref_path)
+        leftovers= [path.name for path in Path(temp_dir).iterdir()
+                    if path.name not in ("new.xlsx", "reference.xlsx")]
+    for problem in problems[:20]:
+        print(f"   - {problem}")
+    print(f" - {len(rows) - 1} rows: {'identical' if not problems else f'{len(problems)} differences'}, "
+          f"streaming ({'openpyxl' if xlsx_export.xlsxwriter is None else 'XlsxWriter'}) "
+          f"{new_time:.2f} sec, reference {ref_time:.2f} sec")
+    if leftovers:
+        print(f" - Temp files left behind: {leftovers}")
+    sys.exit(1 if problems or leftovers else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+limits_history.py
+Append-only local history of the Chandra limits, answering "what were the
+limits for MSID X at time Y".
+
+Every master state that is recorded (each merge, each SVN revision of
+chandra_limits.xlsx) appends only the rows that changed since the last state.
+Each row has two time axes:
+    effective_from/to   when the limit set is in force on the spacecraft, from
+                        the row's Year/DoY/Hour/Min/Sec/mSec to the next limit
+                        set for the same MSID (NULL while open ended)
+    recorded/superseded when the row was known, from the merge or SVN revision
+                        that added it to the one that changed or removed it
+
+Usage:
+    python limits_history.py import-svn SVN_DIR [--svn PATH_TO_SVN]
+    python limits_history.py ingest FILE.xlsx [--source NAME]
+    python limits_history.py at MSID YYYY:DDD:HH:MM:SS [...]
+    python limits_history.py history MSID
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+
+STORE_PATH= Path(os.environ.get(
+    "LIMITS_HISTORY", Path.home() / ".chandra_limits" / "limits_history.sqlite"))
+SVN_FILE= "chandra_limits.xlsx"
+LIMIT_FIELDS= ("enabled", "warning_low", "caution_low", "caution_high", "warning_high",
+               "greta_low", "greta_high", "planning_low", "planning_high")
+TICKET_COLUMN= 16
+
+
+def to_number(value):
+    "Sheet cell to float, None for blanks and text"
+    if isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip())
+    except (TypeError, ValueError):
+        text= str(value).strip().upper() if value is not None else ""
+        return {"TRUE": 1.0, "FALSE": 0.0}.get(text)
+
+
+def effective_seconds(year, doy, hour, minute, sec, msec):
+    "Year/DoY/Hour/Min/Sec/mSec arrays to unix seconds (UTC), vectorized"
+    days= (np.asarray(year, dtype= int) - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+    days= days + (np.asarray(doy, dtype= int) - 1)
+    return (days.astype("datetime64[s]").astype(np.int64)
+            + np.asarray(hour, dtype= float) * 3600 + np.asarray(minute, dtype= float) * 60
+            + np.asarray(sec, dtype= float) + np.asarray(msec, dtype= float) / 1000)
+
+
+def parse_time(text):
+    "YYYY:DDD:HH:MM:SS(.sss) or a datetime to unix seconds (naive datetimes are UTC)"
+    if isinstance(text, datetime):
+        stamp= text if text.tzinfo else text.replace(tzinfo= timezone.utc)
+        return stamp.timestamp()
+    fields= [float(field) for field in str(text).split(":")]
+    fields+= [0.0] * (5 - len(fields))
+    return float(effective_seconds(fields[0], fields[1], fields[2], fields[3], fields[4], 0))
+
+
+def format_time(seconds):
+    "Unix seconds to YYYY:DDD:HH:MM:SS.sss"
+    if seconds is None or np.isnan(seconds):
+        return "open"
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y:%j:%H:%M:%S.%f")[:-3]
+
+
+def parse_rows(rows):
+    """
+    Description: Master sheet / xlsx rows (header first) to limit records
+    Output: dict of (msid, effective_from) -> (limit values tuple, ticket),
+            rows without an MSID or a valid effective time are skipped
+    """
+    records= {}
+    for row in rows[1:]:
+        row= list(row) + [None] * (TICKET_COLUMN + 1 - len(row))
+        msid= str(row[0]).strip().upper() if row[0] is not None else ""
+        stamp= [to_number(value) or 0.0 for value in row[1:7]]
+        if not msid or to_number(row[1]) is None or to_number(row[2]) is None:
+            continue
+        effective_from= round(float(effective_seconds(*stamp)), 3)
+        values= tuple(to_number(value) for value in row[7:16])
+        ticket= str(row[TICKET_COLUMN]).strip() if row[TICKET_COLUMN] not in (None, "") else None
+        records[(msid, effective_from)]= (values, ticket)
+    return records
+
+
+def read_workbook(file):
+    "Rows of the first sheet of a limits .xlsx (path or file object)"
+    import openpyxl # only needed when reading workbooks, keeps the report tools light
+    workbook= openpyxl.load_workbook(file, read_only= True, data_only= True)
+    rows= list(workbook.worksheets[0].iter_rows(values_only= True))
+    workbook.close()
+    return rows
+
+
+def in_force_note(history, msid, date_time, value):
+    "Report note with a violation's state under the limits in force at date_time"
+    if history is None:
+        return ""
+    state= history.evaluate(msid, [parse_time(date_time)], [value])[0]
+    return f' Limits in force: "{state}".' if state else ""
+
+
+class LimitsHistory:
+    "SQLite limits history, rows are only ever appended or closed"
+
+    def __init__(self, path=None):
+        path= path or STORE_PATH
+        Path(path).parent.mkdir(parents= True, exist_ok= True)
+        self.connection= sqlite3.connect(path)
+        self.connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS limits (
+                msid TEXT NOT NULL, effective_from REAL NOT NULL, effective_to REAL,
+                {", ".join(f"{field} REAL" for field in LIMIT_FIELDS)},
+                ticket TEXT, source TEXT NOT NULL, recorded REAL NOT NULL, superseded REAL);
+            CREATE INDEX IF NOT EXISTS limits_msid_time ON limits (msid, effective_from);
+            CREATE INDEX IF NOT EXISTS limits_current ON limits (msid, effective_from)
+                WHERE superseded IS NULL;
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY, revision INTEGER, recorded REAL NOT NULL);
+        """)
+
+    def current(self, as_of=None):
+        """
+        Current records, or those known at record time as_of, as a dict of
+        (msid, effective_from) -> (limit values, ticket)
+        """
+        query= f"SELECT msid, effective_from, {', '.join(LIMIT_FIELDS)}, ticket FROM limits WHERE "
+        if as_of is None:
+            rows= self.connection.execute(query + "superseded IS NULL").fetchall()
+        else:
+            rows= self.connection.execute(
+                query + "recorded <= ? AND (superseded IS NULL OR superseded > ?)",
+                (as_of, as_of)).fetchall()
+        return {(row[0], row[1]): (tuple(row[2:-1]), row[-1]) for row in rows}
+
+    def ingest(self, rows, source, recorded=None, complete=True, revision=None):
+        """
+        Description: Record one master state. Rows whose limits differ from the
+                     record known at that time are appended and the old record
+                     superseded; with complete=True keys missing from rows are
+                     superseded too. A state older than one already recorded
+                     (an SVN revision imported after a merge) is slotted in
+                     between: its rows are superseded by the next newer state,
+                     and the rows it replaced come back from that state on.
+        Input: master rows (header first), source label, record time (unix sec,
+               default now), whether rows are the whole master, SVN revision
+        Output: (rows appended, rows removed from the master)
+        """
+        recorded= time.time() if recorded is None else recorded
+        incoming= parse_rows(rows)
+        later= self.connection.execute(
+            "SELECT MIN(recorded) FROM sources WHERE recorded > ?", (recorded,)).fetchone()[0]
+        existing= self.current(None if later is None else recorded)
+        added= [key for key, (values, _) in incoming.items()
+                if key not in existing or existing[key][0] != values]
+        changed= set(added)
+        removed= [key for key in existing if key in changed or (complete and key not in incoming)]
+        known_at= ("msid = ? AND effective_from = ? AND recorded <= ? "
+                   "AND (superseded IS NULL OR superseded > ?)")
+        columns= f"msid, effective_from, effective_to, {', '.join(LIMIT_FIELDS)}, ticket, source"
+
+        with self.connection:
+            if later is not None:
+                # Replaced rows still known at the next newer state are restored by it
+                self.connection.executemany(
+                    f"INSERT INTO limits ({columns}, recorded, superseded) "
+                    f"SELECT {columns}, ?, superseded FROM limits WHERE {known_at} "
+                    "AND (superseded IS NULL OR superseded > ?)",
+                    [(later, *key, recorded, recorded, later) for key in removed])
+            self.connection.executemany(
+                f"UPDATE limits SET superseded = ? WHERE {known_at}",
+                [(recorded, *key, recorded, recorded) for key in removed])
+            self.connection.executemany(
+                f"INSERT INTO limits (msid, effective_from, {', '.join(LIMIT_FIELDS)}, "
+                f"ticket, source, recorded, superseded) "
+                f"VALUES ({', '.join('?' * (len(LIMIT_FIELDS) + 6))})",
+                [(*key, *incoming[key][0], incoming[key][1], source, recorded, later)
+                 for key in added])
+            msids= {key[0] for key in added + removed}
+            self.close_intervals(msids)
+            if later is not None:
+                self.close_intervals(msids, recorded)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (source, revision, recorded))
+        return len(added), len(removed) - len(changed & set(existing))
+
+    def close_intervals(self, msids, recorded=None):
+        """
+        Recompute effective_to of the current records of each MSID, or of those
+        recorded at record time recorded, as the history was known then
+        """
+        for msid in msids:
+            if recorded is None:
+                self.connection.execute("""
+                    UPDATE limits SET effective_to = (
+                        SELECT MIN(later.effective_from) FROM limits AS later
+                        WHERE later.msid = limits.msid AND later.superseded IS NULL
+                          AND later.effective_from > limits.effective_from)
+                    WHERE msid = ? AND superseded IS NULL""", (msid,))
+            else:
+                self.connection.execute("""
+                    UPDATE limits SET effective_to = (
+                        SELECT MIN(later.effective_from) FROM limits AS later
+                        WHERE later.msid = limits.msid AND later.recorded <= limits.recorded
+                          AND (later.superseded IS NULL OR later.superseded > limits.recorded)
+                          AND later.effective_from > limits.effective_from)
+                    WHERE msid = ? AND recorded = ?""", (msid, recorded))
+
+    def last_revision(self):
+        "Newest SVN revision already recorded, 0 if none"
+        row= self.connection.execute("SELECT MAX(revision) FROM sources").fetchone()
+        return row[0] or 0
+
+    def import_svn(self, svn_dir, svn_exe="svn", env=None, cancelled=None):
+        """
+        Description: Record every SVN revision of chandra_limits.xlsx newer than
+                     the last one recorded, oldest first, via svn log / svn cat.
+                     cancelled() is checked before each revision; revisions
+                     already recorded are kept, so a later import resumes there.
+        Output: number of revisions recorded (InterruptedError when cancelled)
+        """
+        def svn(*args, text=True):
+            return subprocess.run([str(svn_exe), *args], check= True, capture_output= True,
+                                  text= text, env= env, cwd= str(svn_dir)).stdout
+
+        log= ET.fromstring(svn("log", "--xml", SVN_FILE))
+        count= 0
+        for entry in reversed(list(log.iter("logentry"))):
+            revision= int(entry.get("revision"))
+            if revision <= self.last_revision():
+                continue
+            if cancelled and cancelled():
+                raise InterruptedError(f"SVN history import cancelled before r{revision}")
+            stamp= datetime.strptime(entry.findtext("date")[:19], "%Y-%m-%dT%H:%M:%S")
+            rows= read_workbook(io.BytesIO(svn("cat", "-r", str(revision), SVN_FILE, text= False)))
+            added, removed= self.ingest(rows, f"svn r{revision}", parse_time(stamp),
+                                        revision= revision)
+            print(f" - SVN r{revision}: {added} limit rows added, {removed} removed")
+            count+= 1
+        return count
+
+    def limits_at(self, msid, times, as_of=None):
+        """
+        Description: Limits in force for one MSID at each time, vectorized
+        Input: MSID, unix seconds (array), optional record time to answer as
+               the history was known then
+        Output: dict of LIMIT_FIELDS + effective_from/ticket -> arrays (NaN /
+                None where no limit set was in force yet)
+        """
+        query= (f"SELECT effective_from, {', '.join(LIMIT_FIELDS)}, ticket FROM limits "
+                "WHERE msid = ? AND ")
+        if as_of is None:
+            rows= self.connection.execute(query + "superseded IS NULL ORDER BY effective_from",
+                                          (msid.upper(),)).fetchall()
+        else:
+            rows= self.connection.execute(
+                query + "recorded <= ? AND (superseded IS NULL OR superseded > ?) "
+                "ORDER BY effective_from", (msid.upper(), as_of, as_of)).fetchall()
+
+        times= np.atleast_1d(np.asarray(times, dtype= float))
+        table= np.array([row[:-1] for row in rows], dtype= float).reshape(-1, len(LIMIT_FIELDS) + 1)
+        index= np.searchsorted(table[:, 0], times, side= "right") - 1
+        valid= index >= 0
+        picked= table[np.clip(index, 0, None)] if len(table) else np.full(
+            (len(times), len(LIMIT_FIELDS) + 1), np.nan)
+        picked[~valid]= np.nan
+        result= {field: picked[:, column + 1] for column, field in enumerate(LIMIT_FIELDS)}
+        result["effective_from"]= picked[:, 0]
+        result["ticket"]= [rows[i][-1] if ok else None for i, ok in zip(index, valid)]
+        return result
+
+    def evaluate(self, msid, times, values):
+        """
+        Description: State of each sample under the limits in force at its time
+        Output: array of "NOMINAL", "CAUTION_LOW/HIGH", "WARNING_LOW/HIGH",
+                "DISABLED", or "" where no limits or no numeric value exist
+        """
+        limits= self.limits_at(msid, times)
+        values= np.array([to_number(value) for value in np.atleast_1d(values)], dtype= float)
+        with np.errstate(invalid= "ignore"):
+            state= np.select(
+                [np.isnan(limits["enabled"]) | np.isnan(values), limits["enabled"] == 0,
+                 values < limits["warning_low"], values > limits["warning_high"],
+                 values < limits["caution_low"], values > limits["caution_high"]],
+                ["", "DISABLED", "WARNING_LOW", "WARNING_HIGH", "CAUTION_LOW", "CAUTION_HIGH"],
+                "NOMINAL")
+        return state
+
+    def history(self, msid):
+        "Every record for an MSID, superseded ones included, oldest first"
+        return self.connection.execute(
+            f"SELECT effective_from, effective_to, {', '.join(LIMIT_FIELDS)}, ticket, source, "
+            "recorded, superseded FROM limits WHERE msid = ? ORDER BY effective_from, recorded",
+            (msid.upper(),)).fetchall()
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser= argparse.ArgumentParser(description= "Chandra limits history")
+    parser.add_argument("--store", help= "Limits history (SQLite) path")
+    commands= parser.add_subparsers(dest= "command", required= True)
+
+    svn_parser= commands.add_parser("import-svn", help= "Record new SVN revisions")
+    svn_parser.add_argument("svn_dir")
+    svn_parser.add_argument("--svn", default= "svn", help= "svn executable")
+
+    ingest_parser= commands.add_parser("ingest", help= "Record a limits .xlsx file")
+    ingest_parser.add_argument("file")
+    ingest_parser.add_argument("--source")
+
+    at_parser= commands.add_parser("at", help= "Limits in force at times")
+    at_parser.add_argument("msid")
+    at_parser.add_argument("times", nargs= "+", help= "YYYY:DDD:HH:MM:SS times")
+
+    history_parser= commands.add_parser("history", help= "Every record for an MSID")
+    history_parser.add_argument("msid")
+    args= parser.parse_args()
+
+    store= LimitsHistory(args.store)
+    try:
+        if args.command == "import-svn":
+            print(f" - {store.import_svn(args.svn_dir, args.svn)} SVN revisions recorded")
+        elif args.command == "ingest":
+            added, removed= store.ingest(read_workbook(args.file), args.source or Path(args.file).name)
+            print(f" - {added} limit rows added, {removed} removed")
+        elif args.command == "at":
+            limits= store.limits_at(args.msid, [parse_time(text) for text in args.times])
+            for index, text in enumerate(args.times):
+                values= ", ".join(f"{field}={limits[field][index]:g}" for field in LIMIT_FIELDS)
+                print(f" - {text}: {values} (from {format_time(limits['effective_from'][index])}, "
+                      f"{limits['ticket'][index]})")
+        else:
+            for row in store.history(args.msid):
+                state= "current" if row[-1] is None else f"superseded {format_time(row[-1])}"
+                print(f" - {format_time(row[0])} -> {format_time(row[1])}: "
+                      f"{', '.join(f'{value:g}' if value is not None else '-' for value in row[2:11])} "
+                      f"[{row[11]}, {row[12]}, {state}]")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+merge_check.py
+Offline check of the keyed master merge against the in-memory Sheets fake:
+insert/update/no-op/conflict classification, minimal pushes, concurrent
+edits and appends, plus a diff timing on a master-sized sheet.
+
+Usage:
+    python merge_check.py [--rows 20000]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from components.sheets_diff import MasterSnapshot, diff_rows, merge_file, summarize
+from components.sheets_fake import FakeSheetsService
+
+HEADER= ["MSID", "Year", "DoY", "Hour", "Min", "Sec", "mSec", "Enabled MSID\n(True/False)",
+         "Warning-Low", "Caution-Low", "Caution-High", "Warning-High", "Greta-Low",
+         "Greta-High", "Planning-Low", "Planning-High", "JIRA"]
+
+
+def limit_row(msid, doy, low=-10.0, high=10.0, enabled=True, ticket="CRF-1"):
+    "One master/file row; file rows simply drop the ticket column"
+    return [msid, 2024, doy, 0, 0, 0, 0, enabled, low, low / 2, high / 2, high,
+            low, high, low, high, ticket]
+
+
+def file_rows(rows):
+    "Rows as loaded from an .xlsx file: numbers as numbers, no ticket column"
+    return [HEADER[:16]] + [row[:16] for row in rows]
+
+
+def fresh_case(master_rows, temp_dir):
+    service= FakeSheetsService([HEADER] + master_rows)
+    snapshot= MasterSnapshot(Path(temp_dir) / f"snapshot_{time.perf_counter_ns()}.json")
+    snapshot.refresh(service)
+    service.calls.clear()
+    return service, snapshot
+
+
+def expect(name, condition, failures):
+    print(f" - {name}: {'ok' if condition else 'FAILED'}")
+    failures.append(not condition)
+
+
+def run_checks(temp_dir):
+    failures= []
+    master= [limit_row("CTXAPWR", 1), limit_row("CTXBPWR", 1), limit_row("CPA1PWR", 1)]
+
+    # Classification and minimal push
+    service, snapshot= fresh_case(master, temp_dir)
+    loaded= file_rows([limit_row("CTXAPWR", 1),                  # no-op
+                       limit_row("CPA1PWR", 1, high=12.0),       # update
+                       limit_row("CPA2PWR", 1), limit_row("CPA2PWR", 1),   # insert, pushed once
+                       [None] * 16])                             # blank row, ignored
+    plan= merge_file(service, snapshot, loaded, "CRF-2")
+    expect("classification", summarize(plan) ==
+           {"insert": 1, "update": 1, "no-op": 1, "conflict": 0}, failures)
+    expect("one batchGet + one batchUpdate",
+           service.calls == ["values.batchGet", "values.batchUpdate"], failures)
+    expect("updated ranges", service.updated_ranges == ["Sheet1!A4:Q5"], failures)
+    expect("sheet contents", service.rows[3][11] == "12" and service.rows[4][0] == "CPA2PWR"
+           and service.rows[4][16] == "CRF-2" and len(service.rows) == 5, failures)
+    expect("snapshot kept in step", diff_rows(snapshot.rows, service.rows)["action"]
+           .eq("no-op").all(), failures)
+
+    # Re-merging the same file is all no-ops and pushes nothing
+    service.calls.clear()
+    plan= merge_file(service, snapshot, loaded, "CRF-2")
+    expect("re-merge is a no-op", plan["action"].eq("no-op").all() and not service.calls, failures)
+
+    # Duplicate key with different limits blocks the merge
+    service, snapshot= fresh_case(master, temp_dir)
+    plan= merge_file(service, snapshot, file_rows(
+        [limit_row("CPA2PWR", 5), limit_row("CPA2PWR", 5, low=-20.0)]), "CRF-3")
+    expect("file duplicate conflict", summarize(plan)["conflict"] == 2 and not service.calls,
+           failures)
+
+    # Someone else edits a row after the snapshot was taken
+    service, snapshot= fresh_case(master, temp_dir)
+    service.rows[2][11]= "99"
+    plan= merge_file(service, snapshot, file_rows([limit_row("CTXBPWR", 1, high=15.0)]), "CRF-4")
+    expect("concurrent edit conflict", summarize(plan)["conflict"] == 1 and
+           "values.batchUpdate" not in service.calls and snapshot.rows[2][11] == "99", failures)
+
+    # Someone else appends rows after the snapshot was taken
+    service, snapshot= fresh_case(master, temp_dir)
+    service.rows.append([str(value) for value in limit_row("CPA2PWR", 9)])
+    plan= merge_file(service, snapshot, file_rows([limit_row("CPA2PWR", 9),
+                                                   limit_row("CXPNAIT", 9)]), "CRF-5")
+    expect("concurrent append refresh", summarize(plan) ==
+           {"insert": 1, "update": 0, "no-op": 1, "conflict": 0} and
+           service.rows[5][0] == "CXPNAIT" and len(service.rows) == 6, failures)
+    return failures
+
+
+def time_diff(row_count):
+    "Diff a row_count master against a file touching a quarter of it"
+    master= [limit_row(f"C{index:07d}", 1 + index % 365) for index in range(row_count)]
+    changed= [limit_row(f"C{index:07d}", 1 + index % 365, high=11.0)
+              for index in range(0, row_count, 8)]
+    new= [limit_row(f"P{index:07d}", 1) for index in range(row_count // 8)]
+    start= time.perf_counter()
+    plan= diff_rows([HEADER] + [[str(value) for value in row] for row in master],
+                    file_rows(changed + new))
+    elapsed= time.perf_counter() - start
+    print(f" - Diffed {len(plan)} file rows against {row_count} master rows "
+          f"in {elapsed:.2f} sec: {summarize(plan)}")
+
+
+def main():
+    parser= argparse.ArgumentParser(description= "Offline master merge check")
+    parser.add_argument("--rows", type= int, default= 20000, help= "Master rows for the timing")
+    args= parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        failures= run_checks(temp_dir)
+    time_diff(args.rows)
+    sys.exit(1 if any(failures) else 0)
+
+
+if __name__ == "__main__":
+    main()
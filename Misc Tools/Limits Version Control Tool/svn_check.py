@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+svn_check.py
+Integration check of the SVN commit / update paths against a throwaway local
+repository (svnadmin create + two file:// working copies): commits from one
+copy are pulled into the other, new revisions land in a temporary limits
+history (also behind a merge recorded first), and cancelled steps leave both
+untouched.
+
+Needs svn and svnadmin (the bundled svn-tools on Windows, PATH elsewhere).
+
+Usage:
+    python svn_check.py [--keep]
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from components.svn_ops import (LIMITS_FILE, run_svn, commit_limits_file, update_limits_file,
+                                record_svn_history)
+from components.xlsx_export import write_limits_workbook
+from limits_history import LimitsHistory, read_workbook, parse_time
+
+HEADER= ["MSID", "Year", "DoY", "Hour", "Min", "Sec", "mSec", "Enabled MSID\n(True/False)",
+         "Warning-Low", "Caution-Low", "Caution-High", "Warning-High", "Greta-Low",
+         "Greta-High", "Planning-Low", "Planning-High", "JIRA"]
+
+
+def limits_rows(warning_high, ticket):
+    "Master rows as exported to chandra_limits.xlsx (sheet text)"
+    return [HEADER,
+            ["CTXAPWR", "2024", "100", "0", "0", "0", "0", "TRUE", "-10", "-5", "5",
+             str(warning_high), "", "", "", "", ticket],
+            ["CPA1PWR", "2024", "100", "0", "0", "0", "0", "FALSE", "-20", "-15", "15",
+             "20", "", "", "", "", "CRF-1"]]
+
+
+def file_text(path):
+    "Cells of a chandra_limits.xlsx as text, blanks as ''"
+    return [["" if value is None else str(value) for value in row] for row in read_workbook(path)]
+
+
+def create_fixture(root):
+    "Empty local repository plus two working copies of it (the tool's and someone else's)"
+    repo= root / "repo"
+    run_svn(["create", str(repo)], root, tool= "svnadmin")
+    copies= root / "ops_wc", root / "tool_wc"
+    for copy in copies:
+        run_svn(["checkout", repo.as_uri(), str(copy)], root)
+    return copies
+
+
+def head_revision(root):
+    "Youngest revision of the fixture repository"
+    return int(run_svn(["info", "--show-item", "revision", (root / "repo").as_uri()], root))
+
+
+def expect(name, condition, failures):
+    print(f" - {name}: {'ok' if condition else 'FAILED'}")
+    failures.append(not condition)
+
+
+def run_checks(root):
+    failures= []
+    ops_wc, tool_wc= create_fixture(root)
+    history_path= root / "limits_history.sqlite"
+
+    # First commit adds the file
+    write_limits_workbook(limits_rows(10, "CRF-1"), tool_wc / LIMITS_FILE)
+    commit_limits_file(tool_wc, "CRF-1")
+    log= run_svn(["log", "--xml", LIMITS_FILE], tool_wc)
+    expect("commit adds the file", "Updated chandra_limits.xlsx (CRF-1)" in log, failures)
+
+    # Pull in the other working copy
+    update_limits_file(ops_wc)
+    expect("update pulls the commit",
+           file_text(ops_wc / LIMITS_FILE) == file_text(tool_wc / LIMITS_FILE), failures)
+
+    # Second commit of a changed limit
+    write_limits_workbook(limits_rows(12, "CRF-2"), tool_wc / LIMITS_FILE)
+    commit_limits_file(tool_wc, "CRF-2")
+    update_limits_file(ops_wc)
+    expect("update pulls the change", file_text(ops_wc / LIMITS_FILE)[1][11] == "12", failures)
+
+    # A cancelled commit runs no svn command
+    write_limits_workbook(limits_rows(14, "CRF-3"), tool_wc / LIMITS_FILE)
+    before= head_revision(root)
+    try:
+        commit_limits_file(tool_wc, "CRF-3", cancelled= lambda: True)
+        cancelled= False
+    except InterruptedError:
+        cancelled= True
+    status= run_svn(["status", str(tool_wc / LIMITS_FILE)], tool_wc)
+    expect("cancelled commit", cancelled and head_revision(root) == before and
+           status.startswith("M"), failures)
+    run_svn(["revert", str(tool_wc / LIMITS_FILE)], tool_wc)
+
+    # A cancelled history import records nothing, the next one picks up every revision
+    try:
+        record_svn_history(ops_wc, cancelled= lambda: True, history_path= history_path)
+        cancelled= False
+    except InterruptedError:
+        cancelled= True
+    history= LimitsHistory(history_path)
+    expect("cancelled history import", cancelled and history.last_revision() == 0, failures)
+    history.close()
+
+    recorded= record_svn_history(ops_wc, history_path= history_path)
+    again= record_svn_history(ops_wc, history_path= history_path)
+    history= LimitsHistory(history_path)
+    limits= history.limits_at("CTXAPWR", [parse_time("2024:150:00:00:00")])
+    revisions= history.connection.execute(
+        "SELECT source FROM sources ORDER BY revision").fetchall()
+    history.close()
+    expect("history import", recorded == 2 and again == 0 and
+           [source for (source,) in revisions] == ["svn r1", "svn r2"], failures)
+    expect("limits in force from the history",
+           limits["warning_high"][0] == 12 and limits["ticket"][0] == "CRF-2", failures)
+
+    # A merge recorded before the first pull stays current, the older revisions slot in behind it
+    merged_path= root / "merged_history.sqlite"
+    history= LimitsHistory(merged_path)
+    history.ingest(limits_rows(16, "CRF-9"), "merge CRF-9")
+    history.close()
+    record_svn_history(ops_wc, history_path= merged_path)
+    history= LimitsHistory(merged_path)
+    when= [parse_time("2024:150:00:00:00")]
+    r2_recorded= history.connection.execute(
+        "SELECT recorded FROM sources WHERE source = 'svn r2'").fetchone()[0]
+    inverted= history.connection.execute(
+        "SELECT COUNT(*) FROM limits WHERE superseded < recorded").fetchone()[0]
+    current, at_r2= (history.limits_at("CTXAPWR", when, as_of= as_of)["warning_high"][0]
+                     for as_of in (None, r2_recorded))
+    history.close()
+    expect("merge then SVN import", current == 16 and at_r2 == 12 and inverted == 0, failures)
+    return failures
+
+
+def main():
+    parser= argparse.ArgumentParser(description= "SVN commit/update integration check")
+    parser.add_argument("--keep", action= "store_true",
+                        help= "Keep the temporary repository and working copies")
+    args= parser.parse_args()
+
+    root= Path(tempfile.mkdtemp(prefix= "limits_svn_"))
+    try:
+        failures= run_checks(root)
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f" - SVN fixture failed: {e}\n{getattr(e, 'stderr', '') or ''}")
+        failures= [True]
+    finally:
+        if args.keep:
+            print(f" - Fixture kept in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors= True)
+    sys.exit(1 if any(failures) else 0)
+
+
+if __name__ == "__main__":
+    main()
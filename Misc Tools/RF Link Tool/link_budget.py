@@ -0,0 +1,106 @@
+"Vectorized RF link budget engine for the RF Link Tool"
+
+from dataclasses import dataclass
+import numpy as np
+from scipy.special import jv
+
+PA_POWER_W = {"High Power": 12.0, "Low Power": 2.0}
+ANTENNAS = ("DSS", "BWG")
+DATA_RATES_KBPS = (1024, 512, 256, 128, 64)
+
+
+@dataclass(frozen=True)
+class LinkParameters:
+    "RF link constants, one field per entry of the parameters dialog"
+    tx_gain: float = -1.25              # TX antenna gain (dBi)
+    tx_loss: float = 2.75               # TX cable loss (dB)
+    freq: float = 2250.0                # MHz
+    l_atm: float = 0.19                 # Atmospheric loss (dB)
+    l_pol: float = 0.22                 # Polarization loss (dB)
+    rx_gt: float = 33.63                # Rx G/T (dB/K)
+    k_boltzmann: float = -228.599167    # 10*log10(1.380649e-23) (dBW)
+    rx_system_loss: float = 0.6         # dB
+    bw_carrier: float = 45.0            # 2B0, carrier loop noise bandwidth (Hz)
+    mod_data: float = 1.25              # theta_1, data mod index (rad)
+    mod_rng: float = 0.176              # theta_2, ranging mod index
+    mod_cmd: float = 0.236              # theta_3, command turn-around mod index
+    req_snr: float = 10.0               # Required carrier SNR (dB)
+    req_ebno: float = 2.55              # Required Eb/No (dB)
+    dsn_ant_gain: float = 55.93         # DSS27 ground gain (dBi)
+    dsn_misc_loss: float = 0.10         # Coupling/misc loss in ground Rx (dB)
+    bwg_ant_gain: float = 56.8          # 34m BWG antenna gain (dBi)
+
+    @classmethod
+    def from_saved(cls, saved_params):
+        "Build from the ParametersGUI values dict (keys like 'TX_GAIN')"
+        return cls(**{key.lower(): float(value) for key, value in saved_params.items()})
+
+    def antenna_gain(self, antenna):
+        "Ground antenna gain (dBi) for 'DSS' or 'BWG', accepts an array of names"
+        antenna = np.asarray(antenna)
+        return np.where(antenna == "BWG", self.bwg_ant_gain, self.dsn_ant_gain)
+
+    def suppression(self):
+        "Carrier and TLM suppression (dB): cos^2 / sin^2(t1) * J0^2(t2) * J0^2(t3)"
+        ranging_cmd = 10 * (np.log10(jv(0, self.mod_rng)**2) + np.log10(jv(0, self.mod_cmd)**2))
+        sup_c = 10 * np.log10(np.cos(self.mod_data)**2) + ranging_cmd
+        sup_tlm = 10 * np.log10(np.sin(self.mod_data)**2) + ranging_cmd
+        return sup_c, sup_tlm
+
+
+def link_budget(params, altitudes_km, rates_kbps, tx_power_w, ant_gain_dbi):
+    """
+    Description: Evaluate the link budget element-wise; every argument after
+                 params broadcasts against the others with NumPy rules
+    Input: LinkParameters, altitude (km), data rate (kbps), PA power (W),
+           ground antenna gain (dBi)
+    Output: Eb/No margin (dB), DSN RCVR AGC w/ ranging (dBm), RCVR power (dBm)
+    """
+    sup_c, sup_tlm = params.suppression()
+
+    # Ground AGC Receiver Power (dBm)
+    eirp = 10 * np.log10(tx_power_w) - params.tx_loss + params.tx_gain
+    path_loss = 32.45 + 20 * (np.log10(params.freq) + np.log10(altitudes_km))
+    rcv_iso_pwr_dbw = eirp - path_loss - params.l_atm - params.l_pol
+    rcvr_pwr_dbm = rcv_iso_pwr_dbw + ant_gain_dbi + 30
+    agc_dbm = rcvr_pwr_dbm - params.dsn_misc_loss + sup_c
+
+    # Eb/No Margin
+    pd_no = rcv_iso_pwr_dbw + 34.83 - params.k_boltzmann + sup_tlm
+    eb_no_margin = pd_no - params.rx_system_loss - 10 * np.log10(np.multiply(rates_kbps, 1000))
+    eb_no_margin = eb_no_margin - params.req_ebno
+
+    return eb_no_margin, agc_dbm, rcvr_pwr_dbm
+
+
+class LinkSweep:
+    """
+    Link budget over the full altitude x data rate x PA mode x antenna grid,
+    computed in one broadcast pass. Arrays are indexed [mode, antenna, rate, altitude].
+    """
+    def __init__(self, params, altitudes_km, rates_kbps=DATA_RATES_KBPS,
+                 modes=tuple(PA_POWER_W), antennas=ANTENNAS):
+        self.params = params
+        self.altitudes = np.asarray(altitudes_km, dtype=float)
+        self.rates = list(rates_kbps)
+        self.modes = list(modes)
+        self.antennas = list(antennas)
+
+        power = np.array([PA_POWER_W[mode] for mode in self.modes])[:, None, None, None]
+        gain = params.antenna_gain(self.antennas)[None, :, None, None]
+        rates = np.asarray(self.rates, dtype=float)[None, None, :, None]
+        self.eb_no_margin, self.agc_dbm, self.rcvr_pwr_dbm = (
+            np.broadcast_to(result, (len(self.modes), len(self.antennas),
+                                     len(self.rates), len(self.altitudes)))
+            for result in link_budget(params, self.altitudes, rates, power, gain)
+        )
+
+    def curves(self, rate, mode, antenna):
+        "Return (Eb/No margin, AGC, RCVR power) vs altitude for one grid cell"
+        index = (self.modes.index(mode), self.antennas.index(antenna), self.rates.index(rate))
+        return self.eb_no_margin[index], self.agc_dbm[index], self.rcvr_pwr_dbm[index]
+
+    def at_altitude(self, altitude_km, rate, mode, antenna):
+        "Exact (not interpolated) values at a single altitude"
+        return tuple(float(value) for value in link_budget(
+            self.params, altitude_km, rate, PA_POWER_W[mode], self.params.antenna_gain(antenna)))
@@ -0,0 +1,226 @@
+"""
+Telemetry-driven validation of the RF link budget.
+
+Compares predicted Eb/No margin and DSN receiver AGC against what the ground
+actually measured, for every pass in a set of DSN monitor exports, and fits
+the residual bias per station and antenna.
+
+DSN monitor exports are CSV files with the columns in MONITOR_COLUMNS, one row
+per monitor sample (time as YYYY:DDD:HH:MM:SS). Spacecraft range and PA mode
+come from MAUDE through ccdm_telemetry and its on-disk cache.
+
+Usage (from the tool directory):
+    python link_validation.py --monitor DIR [--cache PATH]
+    python link_validation.py --standin [--passes 3000]     (offline)
+"""
+
+import argparse
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from link_budget import LinkParameters, PA_POWER_W, link_budget
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "CCDM Telemetry"))
+from ccdm_telemetry import ArrayBackend, datetime64_to_secs, fetch, register_backend
+
+MONITOR_COLUMNS = ["time", "station", "antenna", "data_rate_kbps", "agc_dbm", "ebno_db"]
+PASS_GAP = pd.Timedelta(minutes=30)     # a longer monitor gap starts a new pass
+RANGE_MSID = "CALC_AXAF_RANGE"          # km
+PA_MODE_MSIDS = ("CPA1MODE", "CPA2MODE")
+STANDIN_SOURCE = "rf-standin"           # telemetry backend registered by write_standin
+
+
+def load_monitor_exports(directory):
+    "Read every DSN monitor CSV export in directory into one time-sorted frame"
+    frames = [pd.read_csv(path, usecols=MONITOR_COLUMNS) for path in sorted(Path(directory).glob("*.csv"))]
+    if not frames:
+        raise FileNotFoundError(f"No DSN monitor exports (*.csv) found in {directory}")
+    samples = pd.concat(frames, ignore_index=True)
+    samples["time"] = pd.to_datetime(samples["time"], format="%Y:%j:%H:%M:%S")
+    return samples.sort_values(["station", "time"], ignore_index=True)
+
+
+def summarize_passes(samples):
+    """
+    Description: Split monitor samples into passes (per station, split on
+                 gaps over PASS_GAP) and reduce each pass to medians
+    Output: DataFrame, one row per pass
+    """
+    new_pass = (samples["station"] != samples["station"].shift()) | \
+               (samples["time"].diff() > PASS_GAP)
+    samples = samples.assign(pass_id=new_pass.cumsum())
+
+    grouped = samples.groupby("pass_id")
+    passes = grouped.agg(
+        station=("station", "first"), antenna=("antenna", "first"),
+        start=("time", "min"), stop=("time", "max"),
+        data_rate_kbps=("data_rate_kbps", "median"),
+        agc_dbm=("agc_dbm", "median"), ebno_db=("ebno_db", "median"),
+        samples=("time", "size"))
+    passes["time"] = passes["start"] + (passes["stop"] - passes["start"]) / 2
+    return passes.reset_index(drop=True)
+
+
+def spacecraft_state(passes, source="maude", cache=True):
+    """
+    Add range (km) and PA power (W) at each pass midpoint from full resolution
+    telemetry over the whole days spanned (settled days come from the cache)
+    """
+    start = passes["time"].min().normalize()
+    stop = passes["time"].max().normalize() + pd.Timedelta(days=1)
+    pass_times = datetime64_to_secs(passes["time"].to_numpy())
+    telemetry = fetch([RANGE_MSID, *PA_MODE_MSIDS], start, stop, source=source,
+                      allow_subset=False, cache=cache)
+
+    ranges = telemetry[RANGE_MSID]
+    passes["range_km"] = np.interp(pass_times, ranges.times, ranges.vals.astype(float))
+
+    high_power = np.zeros(len(passes), dtype=bool)
+    for msid in PA_MODE_MSIDS:
+        modes = telemetry[msid]
+        index = np.searchsorted(modes.times, pass_times, side="right") - 1
+        high_power |= np.char.strip(modes.vals.astype(str))[np.clip(index, 0, None)] == "HIGH"
+    passes["pa_mode"] = np.where(high_power, "High Power", "Low Power")
+    return passes
+
+
+def validate(passes, params):
+    """
+    Description: Predicted vs observed Eb/No margin and AGC for every pass in
+                 one vectorized link budget evaluation
+    Output: passes with predicted, observed and residual columns added
+    """
+    eb_no_margin, agc_dbm, _ = link_budget(
+        params, passes["range_km"].to_numpy(), passes["data_rate_kbps"].to_numpy(),
+        passes["pa_mode"].map(PA_POWER_W).to_numpy(),
+        params.antenna_gain(passes["antenna"].to_numpy()))
+
+    passes["predicted_margin_db"] = eb_no_margin
+    passes["observed_margin_db"] = passes["ebno_db"] - params.req_ebno
+    passes["margin_residual_db"] = passes["observed_margin_db"] - eb_no_margin
+    passes["predicted_agc_dbm"] = agc_dbm
+    passes["agc_residual_db"] = passes["agc_dbm"] - agc_dbm
+    return passes
+
+
+def fit_biases(results):
+    "Least-squares constant bias (mean residual) and scatter per station and antenna"
+    return results.groupby(["station", "antenna"]).agg(
+        passes=("margin_residual_db", "size"),
+        margin_bias_db=("margin_residual_db", "mean"),
+        margin_std_db=("margin_residual_db", "std"),
+        agc_bias_db=("agc_residual_db", "mean"),
+        agc_std_db=("agc_residual_db", "std"))
+
+
+def run_validation(monitor_dir, params=None, source="maude", cache=True):
+    "Full validation pipeline, returns (per-pass results, per-station biases)"
+    params = params or LinkParameters()
+    passes = summarize_passes(load_monitor_exports(monitor_dir))
+    print(f" - {len(passes)} passes found in the DSN monitor exports")
+    results = validate(spacecraft_state(passes, source, cache), params)
+    return results, fit_biases(results)
+
+
+def residual_figure(results):
+    "Eb/No margin residual vs range, one trace per station"
+    fig = go.Figure()
+    for (station, antenna), group in results.groupby(["station", "antenna"]):
+        fig.add_trace(go.Scattergl(
+            x=group["range_km"], y=group["margin_residual_db"], mode="markers",
+            name=f"{station} ({antenna})", marker=dict(size=5)))
+    fig.update_layout(
+        title=dict(text="Observed - Predicted Eb/No Margin", font=dict(color="#FFFFFF")),
+        paper_bgcolor="#202020", plot_bgcolor="#000000", autosize=True,
+        legend=dict(font=dict(color="#FFFFFF")),
+        xaxis=dict(title="Range (km)", color="#FFFFFF"),
+        yaxis=dict(title="Residual (dB)", color="#FFFFFF"))
+    return fig
+
+
+def write_standin(directory, pass_count=3000, seed=0):
+    """
+    Description: Write an offline stand-in dataset: DSN monitor exports plus
+                 spacecraft telemetry served as the STANDIN_SOURCE backend,
+                 generated from the nominal link budget with a known bias per station
+    Output: (monitor directory, {station: true bias})
+    """
+    rng = np.random.default_rng(seed)
+    params = LinkParameters()
+    stations = {"DSS-24": "BWG", "DSS-26": "BWG", "DSS-27": "DSS", "DSS-34": "BWG",
+                "DSS-36": "BWG", "DSS-54": "BWG", "DSS-55": "BWG"}
+    true_bias = {station: round(float(rng.normal(0, 1.5)), 2) for station in stations}
+    monitor_dir = Path(directory) / "monitor"
+    monitor_dir.mkdir(parents=True, exist_ok=True)
+
+    # Spacecraft telemetry: range every 10 min on a 63.5 hr orbit, PA mode hourly
+    first_day = date(2024, 1, 1)
+    day_count = max(1, pass_count // 8)
+    minutes = np.arange(0, day_count * 1440, 10)
+    times = np.datetime64(first_day, "ms") + minutes.astype("timedelta64[m]")
+    ranges = 80000 + 65000 * np.sin(2 * np.pi * minutes / (63.5 * 60))
+    mode_times = times[::6]
+    modes = np.where(rng.random(len(mode_times)) < 0.7, "HIGH", "LOW")
+    register_backend(STANDIN_SOURCE, ArrayBackend({
+        RANGE_MSID: (datetime64_to_secs(times), ranges),
+        PA_MODE_MSIDS[0]: (datetime64_to_secs(mode_times), modes),
+        PA_MODE_MSIDS[1]: (datetime64_to_secs(mode_times), np.full(len(mode_times), "LOW")),
+    }))
+
+    # Passes: 30 monitor samples a minute apart, starts spread over the span
+    names = np.array(list(stations))
+    pass_station = names[rng.integers(0, len(names), pass_count)]
+    pass_start = np.sort(rng.choice(len(times) - 12, pass_count, replace=False))
+    pass_rate = rng.choice([1024, 512, 256, 128, 64], pass_count)
+    offsets = np.arange(30)
+    sample_times = (times[pass_start][:, None] + offsets.astype("timedelta64[m]")).ravel()
+    sample_minutes = (minutes[pass_start][:, None] + offsets).ravel()
+    station = np.repeat(pass_station, len(offsets))
+    antenna = np.array([stations[name] for name in station])
+    rate = np.repeat(pass_rate, len(offsets))
+    mode_index = np.searchsorted(mode_times, sample_times, side="right") - 1
+    power = np.where(modes[mode_index] == "HIGH", PA_POWER_W["High Power"], PA_POWER_W["Low Power"])
+    sample_range = 80000 + 65000 * np.sin(2 * np.pi * sample_minutes / (63.5 * 60))
+    margin, agc, _ = link_budget(params, sample_range, rate, power, params.antenna_gain(antenna))
+    bias = np.array([true_bias[name] for name in station])
+
+    pd.DataFrame({
+        "time": pd.to_datetime(sample_times).strftime("%Y:%j:%H:%M:%S"),
+        "station": station, "antenna": antenna, "data_rate_kbps": rate,
+        "agc_dbm": np.round(agc + bias + rng.normal(0, 0.5, len(station)), 2),
+        "ebno_db": np.round(margin + params.req_ebno + bias + rng.normal(0, 0.5, len(station)), 2),
+    }).to_csv(monitor_dir / "standin_monitor.csv", index=False)
+
+    return monitor_dir, true_bias
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="RF link budget validation against telemetry")
+    parser.add_argument("--monitor", help="Directory of DSN monitor CSV exports")
+    parser.add_argument("--cache", help="Telemetry cache (SQLite) path")
+    parser.add_argument("--standin", action="store_true", help="Run on a generated offline dataset")
+    parser.add_argument("--passes", type=int, default=3000, help="Stand-in pass count")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        true_bias, source = None, "maude"
+        if args.standin:
+            (args.monitor, true_bias), source = write_standin(temp_dir, args.passes), STANDIN_SOURCE
+        elif not args.monitor:
+            parser.error("--monitor or --standin is required")
+
+        start = datetime.now()
+        _, biases = run_validation(args.monitor, source=source, cache=args.cache or True)
+        print(f" - Validated in {(datetime.now() - start).total_seconds():.2f} sec")
+        if true_bias is not None:
+            biases["true_bias_db"] = biases.index.get_level_values("station").map(true_bias)
+        print(biases.round(2).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,70 @@
 import tempfile
+from plotly.offline import get_plotlyjs
 from plot import generate_plot
+from link_budget import LinkParameters
+from link_validation import run_validation, residual_figure
 from parameters_gui import ParametersGUI
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QSpinBox,
-                             QHBoxLayout, QComboBox, QPushButton, QLabel, QFrame)
+                             QHBoxLayout, QComboBox, QPushButton, QLabel, QFrame, QFileDialog)
 from PyQt5.QtWebEngineWidgets import QWebEngineView
-from PyQt5.QtCore import QUrl
+from PyQt5.QtWebChannel import QWebChannel
+from PyQt5.QtCore import QUrl, QObject, pyqtSignal, pyqtSlot
+
+# Loaded once; every run pushes figure JSON through the web channel into Plotly.react
+PLOT_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        html, body {
+            margin: 0;
+            padding: 0;
+            height: 100vh;
+            width: 100vw;
+            overflow: hidden; /* This kills the scrollbars */
+            background-color: #202020;
+        }
+        #plot { height: 100vh; width: 100vw; }
+    </style>
+    <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
+    <script>PLOTLYJS</script>
+</head>
+<body>
+    <div id="plot"></div>
+    <script>
+        new QWebChannel(qt.webChannelTransport, function (channel) {
+            var bridge = channel.objects.bridge;
+            var gd = document.getElementById("plot");
+            function draw(json) {
+                if (!json) return;
+                var fig = JSON.parse(json);
+                Plotly.react(gd, fig.data, fig.layout, {responsive: true});
+            }
+            bridge.figureChanged.connect(draw);
+            bridge.latest(draw);
+        });
+    </script>
+</body>
+</html>
+"""
+
+
+class PlotBridge(QObject):
+    "Web channel object that hands figure JSON to the loaded plot page"
+    figureChanged = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.figure_json = ""
+
+    def publish(self, figure_json):
+        self.figure_json = figure_json
+        self.figureChanged.emit(figure_json)
+
+    @pyqtSlot(result=str)
+    def latest(self):
+        "Figure published before the page finished loading"
+        return self.figure_json
 
 
 class RFLinkToolGui(QMainWindow):
@@ -58,6 +118,13 @@ class RFLinkToolGui(QMainWindow):
         self.pause_btn.setToolTip("Pause the execution of the RF Link Budget Calculation.")
         self.controls_wrapper.addWidget(self.pause_btn)
 
+        self.validate_btn = QPushButton("Validate vs Telemetry")
+        self.validate_btn.setMinimumHeight(30)
+        self.validate_btn.setStyleSheet("background-color: #66b3ff; color: black; font-weight: bold; font-size: 12pt;")
+        self.validate_btn.clicked.connect(self.run_validation)
+        self.validate_btn.setToolTip("Compare predicted link margin against DSN monitor exports and telemetry.")
+        self.controls_wrapper.addWidget(self.validate_btn)
+
         # Button to open the Parameters GUI
         self.params_btn= QPushButton("Edit RF Parameters")
         self.params_btn.setStyleSheet("background-color: #ffffff; color: black; font-weight: bold; font-size: 12pt;")
@@ -75,8 +142,13 @@ class RFLinkToolGui(QMainWindow):
         # --- Right Display Area (The Plot Box) ---
         self.display_layout = QVBoxLayout()
 
-        # The Browser Widget
+        # The Browser Widget, its page is loaded once and updated over the web channel
         self.browser = QWebEngineView()
+        self.bridge = PlotBridge()
+        self.channel = QWebChannel()
+        self.channel.registerObject("bridge", self.bridge)
+        self.browser.page().setWebChannel(self.channel)
+        self.load_plot_page()
 
         # Optional: Add a visual border using a Container Frame
         self.plot_container = QFrame()
@@ -99,6 +171,15 @@ class RFLinkToolGui(QMainWindow):
         self.open_parameters_gui(True)
 
 
+    def load_plot_page(self):
+        "Write the plot page (with plotly.js) to disk once and load it by URL"
+        page= PLOT_PAGE.replace("PLOTLYJS", get_plotlyjs().replace(":focus-visible", ":focus"))
+        fd, self.page_path = tempfile.mkstemp(suffix=".html")
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(page)
+        self.browser.load(QUrl.fromLocalFile(self.page_path))
+
+
     def open_parameters_gui(self, initialize= False):
         dialog= ParametersGUI(self, initialize)
         if dialog.exec_():  # This waits until the user clicks Save or Cancel
@@ -109,38 +190,20 @@ class RFLinkToolGui(QMainWindow):
     def run_script(self):
             try:
                 fig= generate_plot(self)
+                self.bridge.publish(fig.to_json())
+
+            except Exception as e:
+                print(f"Error: {e}")
+
 
-                style_fix = """
-                    <style>
-                        html, body { 
-                            margin: 0; 
-                            padding: 0; 
-                            height: 100vh; 
-                            width: 100vw; 
-                            overflow: hidden; /* This kills the scrollbars */
-                        }
-                        .plotly-graph-div { 
-                            height: 100vh !important; 
-                            width: 100vw !important; 
-                        }
-                    </style>"""
-                html_content= fig.to_html(include_plotlyjs=True, full_html=True, config={'responsive': True})
-                html_content = html_content.replace(":focus-visible", ":focus")  # QtWebEngine CSS fix
-                html_content = html_content.replace("<head>", f"<head>{style_fix}")
-                html_content += """
-                    <script>
-                    window.addEventListener("resize", function() {
-                        var gd = document.querySelector('.plotly-graph-div');
-                        if (gd) Plotly.Plots.resize(gd);
-                    });
-                    </script>"""
-
-                td, temp_path = tempfile.mkstemp(suffix=".html")
-
-                with open(temp_path, "w", encoding="utf-8") as f:
-                    f.write(html_content)
-
-                self.browser.load(QUrl.fromLocalFile(temp_path))
+    def run_validation(self):
+            monitor_dir= QFileDialog.getExistingDirectory(self, "Select DSN Monitor Export Directory")
+            if not monitor_dir:
+                return
+            try:
+                results, biases= run_validation(monitor_dir, LinkParameters.from_saved(self.saved_params))
+                print(biases.round(2).to_string())
+                self.bridge.publish(residual_figure(results).to_json())
 
             except Exception as e:
                 print(f"Error: {e}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+sclk_check.py
+Round-trip check of the fitted SCLK model inversion: counts_at() followed by
+fitted() must land back on the requested time, from seconds up to 1e8 sec past
+an update, with and without drift. Also checks that times before the first
+update are formatted as such.
+
+Usage:
+    python sclk_check.py [--tolerance 1e-6]
+"""
+
+import argparse
+import sys
+import numpy as np
+from sclk_correlation import BEFORE_FIRST_UPDATE, CorrelationModel, format_gmt
+
+RATE = 0.25625          # sec/cnt, nominal VCDU period
+
+
+def synthetic_model(drift, updates=5, seed=0):
+    "Correlation updates about a day apart, consistent with the given drift"
+    rng = np.random.default_rng(seed)
+    ref_cnts = 1e8 + np.cumsum(rng.uniform(3e5, 4e5, updates))
+    rate = RATE + rng.normal(0, 1e-9, updates)
+    ref_gmt = [8e8]
+    for index in range(1, updates):
+        span = ref_cnts[index] - ref_cnts[index - 1]
+        ref_gmt.append(ref_gmt[-1] + rate[index - 1] * span + drift * span**2 / 2)
+    return CorrelationModel(ref_gmt, ref_cnts, rate, np.full(updates, drift))
+
+
+def expect(name, condition, failures):
+    print(f" - {name}: {'ok' if condition else 'FAILED'}")
+    failures.append(not condition)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SCLK model round-trip check")
+    parser.add_argument("--tolerance", type=float, default=1e-6, help="Allowed round-trip error (sec)")
+    args = parser.parse_args()
+
+    failures = []
+    dt = np.concatenate([[0.0], np.logspace(-3, 8, 111)])
+    for drift in (0.0, 2e-20, -2e-20, 1e-18, -1e-18):
+        model = synthetic_model(drift)
+        # Inside each closed segment, then far out in the open last one
+        gmt = np.concatenate([model.ref_gmt[:-1] + np.diff(model.ref_gmt) / 3,
+                              model.ref_gmt[-1] + dt])
+        worst = np.max(np.abs(model.fitted(model.counts_at(gmt)) - gmt))
+        expect(f"round trip, drift {drift:.0e}: worst {worst:.2e} sec", worst <= args.tolerance,
+               failures)
+
+    model = synthetic_model(2e-20)
+    before = model.ref_gmt[0] - 86400.0
+    expect("before the first update",
+           np.isnan(model.counts_at(before)) and
+           format_gmt([model.fitted(model.counts_at(before))]) == [BEFORE_FIRST_UPDATE], failures)
+
+    sys.exit(1 if any(failures) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+sclk_correlation.py
+SCLK clock-correlation analysis built on decoded work file records.
+
+Each work file record is a correlation update: reference VCDU count c_i,
+reference time t_i (seconds since 1985:001) and the uplinked rate r_i
+(sec/cnt) and drift d_i (sec/cnt^2), giving
+
+    t(c) = t_i + r_i * (c - c_i) + d_i * (c - c_i)^2 / 2
+
+until the next update. Between consecutive updates the tool also fits the
+rate/drift model that actually connects the two correlation points; the
+difference between the uplinked and fitted models is the SCLK-to-UTC error.
+
+Usage:
+    python sclk_correlation.py ingest FILE.wrk [FILE.wrk ...]
+    python sclk_correlation.py anomalies [--sigma 6]
+    python sclk_correlation.py predict --times 2024:001:00:00:00 [...]
+    python sclk_correlation.py predict --counts 123456789 [...]
+"""
+
+import argparse
+import os
+import sqlite3
+from pathlib import Path
+import numpy as np
+
+STORE_PATH = Path(os.environ.get(
+    "SCLK_STORE", Path.home() / ".cache" / "ccdm" / "sclk_correlations.sqlite"))
+EPOCH_1985 = np.datetime64("1985-01-01T00:00:00", "ns")
+ANOMALY_SIGMA = 6.0     # robust z-score above which a rate step is flagged
+BEFORE_FIRST_UPDATE = "before first update"     # format_gmt text for times no update covers
+
+# One 249-byte work file record, little-endian (same layout as the converter)
+WRK_RECORD = np.dtype({
+    "names": ["sclk_adj_data_1", "sclk_adj_data_f", "sclk_ref_cnts", "sclk_ref_gmt",
+              "sclk_rate", "sclk_drift_rate", "sclk_base_ref"],
+    "formats": ["<f8", "<f8", "<f8", "<f8", "<f8", "<f8", "S21"],
+    "offsets": [4, 12, 20, 60, 68, 76, 224],
+    "itemsize": 249,
+})
+
+
+def read_wrk_records(filepath):
+    "Memory-map the complete 249-byte records of a work file as a structured array"
+    count = os.path.getsize(filepath) // WRK_RECORD.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=WRK_RECORD)
+    return np.memmap(filepath, dtype=WRK_RECORD, mode="r", shape=(count,))
+
+
+def gmt_to_datetime64(seconds):
+    "Seconds since 1985:001 to datetime64[ns]"
+    return EPOCH_1985 + np.round(np.asarray(seconds) * 1e9).astype("timedelta64[ns]")
+
+
+def datetime64_to_gmt(times):
+    "datetime64 (or YYYY:DDD:HH:MM:SS strings) to seconds since 1985:001"
+    times = np.asarray(times)
+    if times.dtype.kind in "US":
+        parts = np.char.split(times.astype(str), ":")
+        fields = np.array([[float(value) for value in part] for part in parts])
+        days = (fields[:, 0].astype(int) - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+        times = (days + (fields[:, 1].astype(int) - 1)).astype("datetime64[ns]") + \
+            np.round((fields[:, 2] * 3600 + fields[:, 3] * 60 + fields[:, 4]) * 1e9).astype(
+                "timedelta64[ns]")
+    return (times.astype("datetime64[ns]") - EPOCH_1985).astype(np.int64) / 1e9
+
+
+class CorrelationStore:
+    "SQLite store of correlation updates, one row per reference time"
+
+    def __init__(self, path=None):
+        path = path or STORE_PATH
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS correlations (
+                ref_gmt REAL PRIMARY KEY, ref_cnts REAL NOT NULL, rate REAL NOT NULL,
+                drift REAL NOT NULL, base_ref TEXT, source TEXT)
+            """
+        )
+
+    def ingest(self, records, source=""):
+        "Upsert decoded work file records, return the number of rows written"
+        rows = [
+            (float(gmt), float(cnts), float(rate), float(drift),
+             base_ref.decode(errors="ignore").strip(), str(source))
+            for gmt, cnts, rate, drift, base_ref in zip(
+                records["sclk_ref_gmt"], records["sclk_ref_cnts"], records["sclk_rate"],
+                records["sclk_drift_rate"], records["sclk_base_ref"])
+            if np.isfinite(gmt) and np.isfinite(cnts) and np.isfinite(rate) and np.isfinite(drift)
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO correlations VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def ingest_file(self, filepath):
+        "Decode and ingest one work file"
+        return self.ingest(read_wrk_records(filepath), Path(filepath).name)
+
+    def load(self):
+        "Return a CorrelationModel over every stored update"
+        rows = self.connection.execute(
+            "SELECT ref_gmt, ref_cnts, rate, drift FROM correlations ORDER BY ref_cnts").fetchall()
+        return CorrelationModel(*np.array(rows, dtype=np.float64).reshape(-1, 4).T)
+
+    def close(self):
+        "Close the database connection"
+        self.connection.close()
+
+
+class CorrelationModel:
+    """
+    Piecewise SCLK model over correlation updates sorted by reference count.
+    Segment i covers counts [c_i, c_{i+1}); the last segment is open ended.
+    """
+    def __init__(self, ref_gmt, ref_cnts, rate, drift):
+        order = np.argsort(ref_cnts, kind="stable")
+        self.ref_gmt = np.asarray(ref_gmt, dtype=np.float64)[order]
+        self.ref_cnts = np.asarray(ref_cnts, dtype=np.float64)[order]
+        self.rate = np.asarray(rate, dtype=np.float64)[order]
+        self.drift = np.asarray(drift, dtype=np.float64)[order]
+
+        # Fitted drift per segment: the quadratic from (c_i, t_i) at the uplinked
+        # rate that lands on (c_{i+1}, t_{i+1}). Open last segment keeps its uplink.
+        span = np.diff(self.ref_cnts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fitted = 2 * (np.diff(self.ref_gmt) - self.rate[:-1] * span) / span**2
+        self.fitted_drift = np.append(np.where(span > 0, fitted, self.drift[:-1]), self.drift[-1:])
+        # Mean rate actually realized over each closed segment
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.fitted_rate = np.diff(self.ref_gmt) / span
+
+    def __len__(self):
+        return len(self.ref_cnts)
+
+    def segment(self, counts):
+        "Segment index for each count, -1 before the first update"
+        return np.searchsorted(self.ref_cnts, counts, side="right") - 1
+
+    def _evaluate(self, counts, drift):
+        counts = np.asarray(counts, dtype=np.float64)
+        index = self.segment(counts)
+        valid = index >= 0
+        index = np.clip(index, 0, None)
+        delta = counts - self.ref_cnts[index]
+        times = self.ref_gmt[index] + self.rate[index] * delta + drift[index] * delta**2 / 2
+        return np.where(valid, times, np.nan)
+
+    def predicted(self, counts):
+        "UTC (sec since 1985:001) from the uplinked rate/drift, vectorized over counts"
+        return self._evaluate(counts, self.drift)
+
+    def fitted(self, counts):
+        "UTC (sec since 1985:001) from the fitted piecewise model"
+        return self._evaluate(counts, self.fitted_drift)
+
+    def error(self, counts):
+        "SCLK-to-UTC error (sec): uplinked model minus fitted model"
+        return self.predicted(counts) - self.fitted(counts)
+
+    def counts_at(self, gmt):
+        "Invert the fitted model: VCDU count at each time (sec since 1985:001)"
+        gmt = np.asarray(gmt, dtype=np.float64)
+        index = np.clip(np.searchsorted(self.ref_gmt, gmt, side="right") - 1, 0, None)
+        rate, drift = self.rate[index], self.fitted_drift[index]
+        dt = gmt - self.ref_gmt[index]
+        # Root of drift/2 dc^2 + rate dc - dt = 0 nearest the linear solution, in the
+        # form without the cancellation of -rate + sqrt(...) at tiny drift (dt / rate at 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            delta = 2 * dt / (rate + np.sqrt(rate**2 + 2 * drift * dt))
+        return np.where(gmt >= self.ref_gmt[0], self.ref_cnts[index] + delta, np.nan)
+
+    def error_at_times(self, gmt):
+        "SCLK-to-UTC error (sec) at arbitrary times (sec since 1985:001)"
+        return self.error(self.counts_at(gmt))
+
+    def update_errors(self):
+        "Error the uplinked model had accumulated at each following update (sec)"
+        span = np.diff(self.ref_cnts)
+        reached = self.ref_gmt[:-1] + self.rate[:-1] * span + self.drift[:-1] * span**2 / 2
+        return reached - self.ref_gmt[1:]
+
+    def rate_steps(self, sigma=ANOMALY_SIGMA):
+        """
+        Description: Flag anomalous rate steps. Each step between consecutive
+                     fitted segment rates is compared with what the uplinked
+                     drift predicted; steps whose residual is over sigma robust
+                     standard deviations (median absolute deviation) are flagged.
+        Output: (update index, update time in sec since 1985:001, residual step,
+                 robust z-score) arrays for the flagged steps
+        """
+        if len(self) < 3:
+            empty = np.zeros(0)
+            return empty.astype(int), empty, empty, empty
+        span = np.diff(self.ref_cnts)
+        expected = self.drift[:-2] * (span[:-1] + span[1:]) / 2
+        residual = np.diff(self.fitted_rate) - expected
+        deviation = np.abs(residual - np.nanmedian(residual))
+        scale = 1.4826 * np.nanmedian(deviation)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z_score = np.where(scale > 0, deviation / scale, 0.0)
+        flagged = np.flatnonzero(z_score > sigma)
+        return flagged + 1, self.ref_gmt[flagged + 1], residual[flagged], z_score[flagged]
+
+
+def format_gmt(seconds, missing=BEFORE_FIRST_UPDATE):
+    "Seconds since 1985:001 as YYYY:DDD:HH:MM:SS.sss strings, missing for NaN (no update yet)"
+    seconds = np.asarray(seconds, dtype=np.float64)
+    known = np.isfinite(seconds)
+    times = gmt_to_datetime64(np.where(known, seconds, 0.0)).astype("datetime64[ms]")
+    days = times.astype("datetime64[D]")
+    doy = (days - days.astype("datetime64[Y]").astype("datetime64[D]")).astype(int) + 1
+    clock = np.datetime_as_string(times, unit="ms")
+    return [f"{str(day)[:4]}:{number:03d}:{text[11:]}" if ok else missing
+            for day, number, text, ok in zip(days, doy, clock, known)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SCLK clock-correlation analysis")
+    parser.add_argument("--store", help="Correlation store (SQLite) path")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ingest work files into the store")
+    ingest.add_argument("files", nargs="+")
+
+    anomalies = commands.add_parser("anomalies", help="List anomalous rate steps")
+    anomalies.add_argument("--sigma", type=float, default=ANOMALY_SIGMA)
+
+    predict = commands.add_parser("predict", help="SCLK-to-UTC error at times or counts")
+    target = predict.add_mutually_exclusive_group(required=True)
+    target.add_argument("--times", nargs="+", help="YYYY:DDD:HH:MM:SS times")
+    target.add_argument("--counts", nargs="+", type=float, help="VCDU counts")
+    args = parser.parse_args()
+
+    store = CorrelationStore(args.store)
+    try:
+        if args.command == "ingest":
+            for filepath in args.files:
+                print(f" - {filepath}: {store.ingest_file(filepath)} correlation updates ingested")
+            return
+
+        model = store.load()
+        print(f" - {len(model)} correlation updates in the store")
+        if len(model) == 0:
+            return
+
+        if args.command == "anomalies":
+            index, gmt, residual, z_score = model.rate_steps(args.sigma)
+            for stamp, step, score in zip(format_gmt(gmt), residual, z_score):
+                print(f"   - {stamp}  rate step {step: .3e} sec/cnt  ({score:.1f} sigma)")
+            print(f" - {len(index)} anomalous rate steps")
+        else:
+            counts = np.asarray(args.counts) if args.counts else \
+                model.counts_at(datetime64_to_gmt(np.array(args.times)))
+            gmt = model.fitted(counts)
+            for stamp, count, error in zip(format_gmt(gmt), counts, model.error(counts)):
+                print(f"   - {stamp}  VCDU {count:16.1f}  error {error * 1e3: .6f} ms")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
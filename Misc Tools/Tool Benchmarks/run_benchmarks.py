@@ -0,0 +1,136 @@
+"""
+End-to-end benchmarks of the Daily Plots auto-run, the Weekly report build and
+the Biannual quarterly stats against the local stub server (stub_server.py)
+and a stand-in share tree, so runs need no MAUDE, iFOT, LaTiS or /share.
+
+Each run is a fresh process (workloads.py) with its own telemetry cache;
+--warm keeps the cache across repeats instead, so the first run is cold and
+the rest are warm. Per run this records wall time, stub requests per service
+and the process's peak RSS.
+
+Usage:
+    python run_benchmarks.py [daily weekly biannual] [--repeat 3] [--latency 0.05]
+                             [--failure-rate 0.02] [--fixtures DIR] [--days 91]
+                             [--warm] [--output results.jsonl] [--verbose]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from stub_server import StubServer, SERVICES, write_share_tree
+from workloads import WORKLOADS
+
+WORKLOAD_SCRIPT = Path(__file__).resolve().parent / "workloads.py"
+SHARE_DAYS = 30     # days of stand-in share files, covers every workload's window
+
+
+def run_workload(server, name, work_dir, cache_path, days=None, verbose=False):
+    """
+    Description: Run one workload in a subprocess against server
+    Input: stub server, workload name, scratch directory (holds share/),
+           telemetry cache path, optional lookback days
+    Output: result dict (status, timings, request counts, peak RSS)
+    """
+    result_path = Path(work_dir) / f"{name}_result.json"
+    result_path.unlink(missing_ok=True)
+    env = dict(os.environ, **server.urls, FOT_SHARE_ROOT=str(Path(work_dir) / "share"),
+               TELEMETRY_CACHE=str(cache_path),
+               IFOT_CACHE=str(Path(cache_path).with_name("ifot_events.sqlite")),
+               GOES_LATIS_CACHE=str(Path(cache_path).with_name("goes_latis.sqlite")))
+    command = [sys.executable, str(WORKLOAD_SCRIPT), name, "--result", str(result_path)]
+    if days:
+        command += ["--days", str(days)]
+
+    before = server.snapshot()
+    run_start = time.perf_counter()
+    process = subprocess.run(command, env=env, capture_output=not verbose, text=True, check=False)
+    wall = time.perf_counter() - run_start
+    after = server.snapshot()
+
+    if result_path.exists():
+        with open(result_path, "r", encoding="utf-8") as file:
+            result = json.load(file)
+    else:
+        lines = (process.stderr or "").strip().splitlines()
+        result = {"workload": name, "status": "crashed", "seconds": None, "peak_rss_mb": None,
+                  "error": lines[-1] if lines else f"exit code {process.returncode}"}
+    if result["status"] != "ok" and not verbose and process.stderr:
+        print(process.stderr[-2000:])
+    result["wall_seconds"] = wall
+    result.update({key: after[key] - before[key] for key in after})
+    return result
+
+
+def print_results(results):
+    "Table of every run"
+    header = (f"{'workload':<10}{'run':>4}{'status':>9}{'wall s':>9}{'work s':>9}"
+              f"{'requests':>10}" + "".join(f"{service:>7}" for service in SERVICES) +
+              f"{'503s':>6}{'MB sent':>9}{'peak RSS MB':>13}")
+    print("\n" + header + "\n" + "-" * len(header))
+    for result in results:
+        work = f"{result['seconds']:.2f}" if result["seconds"] is not None else "-"
+        rss = f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "-"
+        print(f"{result['workload']:<10}{result['run']:>4}{result['status']:>9}"
+              f"{result['wall_seconds']:>9.2f}{work:>9}{result['requests']:>10}" +
+              "".join(f"{result[service]:>7}" for service in SERVICES) +
+              f"{result['failures']:>6}{result['bytes'] / 1e6:>9.1f}{rss:>13}")
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="Benchmark the CCDM tools against stub services")
+    parser.add_argument("workloads", nargs="*",
+                        help=f"Workloads to run: {', '.join(sorted(WORKLOADS))} (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per workload")
+    parser.add_argument("--latency", type=float, default=0.05, help="Added sec per stub request")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Fraction of stub requests answered with HTTP 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the failure sequence")
+    parser.add_argument("--fixtures", help="Directory of recorded responses (see stub_server.py)")
+    parser.add_argument("--days", type=int, help="Biannual lookback in days (default 91)")
+    parser.add_argument("--warm", action="store_true", help="Keep the telemetry cache across repeats")
+    parser.add_argument("--output", help="Append one JSON line per run to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show the tools' own output")
+    args = parser.parse_args()
+
+    names = args.workloads or sorted(WORKLOADS)
+    unknown = [name for name in names if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workload(s): {', '.join(unknown)}")
+    server = StubServer(fixture_dir=args.fixtures, latency=args.latency,
+                        failure_rate=args.failure_rate, seed=args.seed).start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="ccdm_bench_") as work_dir:
+            print(" - Writing stand-in share tree...")
+            write_share_tree(Path(work_dir) / "share", datetime.now() - timedelta(days=SHARE_DAYS),
+                             datetime.now())
+            for name in names:
+                for run in range(1, args.repeat + 1):
+                    cache_path = Path(work_dir) / f"{name}_{1 if args.warm else run}" / "telemetry.sqlite"
+                    print(f" - Running {name} ({run}/{args.repeat})...")
+                    result = run_workload(server, name, work_dir, cache_path, args.days, args.verbose)
+                    result.update(run=run, latency=args.latency, failure_rate=args.failure_rate,
+                                  warm=args.warm and run > 1,
+                                  timestamp=datetime.now().isoformat(timespec="seconds"))
+                    results.append(result)
+    finally:
+        server.stop()
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as file:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
+        print(f"\n - Results appended to {args.output}")
+    sys.exit(0 if all(result["status"] == "ok" for result in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
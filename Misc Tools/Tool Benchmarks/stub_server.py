@@ -0,0 +1,418 @@
+"""
+Deterministic local stand-in for the services the CCDM tools query: MAUDE
+(msid.json), iFOT (ifot.php list tables) and LaTiS
+(<dataset>.json). Answers come from recorded responses in a fixture directory
+when present, otherwise they are synthesized from the query alone, so the
+same query always gets the same answer. Latency and failures (HTTP 503) can be
+injected per request, and requests are counted per service (GET /_stats).
+
+Recorded fixtures (all optional):
+    <fixtures>/maude/<MSID>.json     a msid.json response, cut to each query window
+    <fixtures>/ifot/<EVENT>.html     an ifot.php list table, served as is
+    <fixtures>/latis/<dataset>.json  a LaTiS response, cut to each query window
+
+write_share_tree() builds a small stand-in for the /share files the Daily and
+Weekly tools parse (BEAT reports, daily limits.txt, OBC error logs), for use
+with FOT_SHARE_ROOT.
+
+Usage:
+    python stub_server.py --serve 8766 [--fixtures DIR] [--latency 0.05] [--failure-rate 0.02]
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "CCDM Telemetry"))
+sys.path.append(str(Path(__file__).resolve().parents[2] / "GOES Spacecraft Space Weather Plotter"))
+from ccdm_telemetry.times import parse_date, datetime64_to_secs, secs_to_datetime64, maude_to_secs
+from components.latis_fixture_server import (
+    FIXTURE_DATASETS, TIME_FORMAT, parse_time_filters, synthesize_samples)
+
+MAUDE_STEP = 32.8           # sec between synthetic samples (one major frame)
+SUBSET_POINTS = 10000       # most samples MAUDE returns without ap=t
+PAGE_POINTS = 100000        # most samples per ap=t page
+SERVICES = ("maude", "ifot", "latis")
+
+# MSID: (states, sec per state). Every other MSID is synthesized as numeric.
+STATE_MSIDS = {
+    "CCMDLKA": (("LOCK", "NLCK"), 14400), "CCMDLKB": (("NLCK", "LOCK"), 14400),
+    "CTXAX": (("ON", "OFF"), 28800), "CTXBX": (("OFF", "ON"), 28800),
+    "CPA1": (("ON", "OFF"), 28800), "CPA2": (("OFF", "ON"), 28800),
+    "CPA1MODE": (("NPAS", "CLOS"), 28800), "CPA2MODE": (("CLOS", "NPAS"), 28800),
+    "CCSDSTMF": (("FMT2", "FMT2", "FMT1", "FMT4"), 10800),
+    "COSCS107S": (("INAC",), 86400),
+    "C1SQATPP": (("FALS", "TRUE"), 43200), "C2SQATPP": (("TRUE", "FALS"), 43200),
+}
+# Nominal level of numeric MSIDs whose consumers filter on a value range
+NOMINAL_VALUES = {"CTXAPWR": 36.0, "CTXBPWR": 36.0, "CPA1PWR": 38.0, "CPA2PWR": 38.0}
+
+# event type: (hours between events, minutes past the hour grid, minutes long, type_desc)
+IFOT_EVENTS = {
+    "PASSPLAN": (8, 90, 75, "DSN Comm Pass"),
+    "PLAYBACK_BCW": (12, 100, 20, "SSR Playback"),
+    "DSN_DR": (72, 130, 0, "DSN Discrepancy Report"),
+    "OBS": (6, 60, 300, "Observation"),
+    "BIAS": (6, 30, 20, "ACIS BIAS Packet"),
+}
+
+
+def datetime64_to_maude(times) -> np.ndarray:
+    "datetime64 values to MAUDE integer timestamps (YYYYDDDHHMMSSmmm)"
+    times = np.asarray(times).astype("datetime64[ms]")
+    days = times.astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    doy = (days - years.astype("datetime64[D]")).astype(np.int64) + 1
+    clock = (times - days).astype(np.int64)
+    hours, clock = np.divmod(clock, 3_600_000)
+    minutes, clock = np.divmod(clock, 60_000)
+    seconds, millis = np.divmod(clock, 1000)
+    year = years.astype(np.int64) + 1970
+    return ((((year * 1000 + doy) * 100 + hours) * 100 + minutes) * 100 + seconds) * 1000 + millis
+
+
+def yday(time_value) -> str:
+    "datetime to 'YYYY:DDD:HH:MM:SS.000'"
+    return time_value.strftime("%Y:%j:%H:%M:%S.000")
+
+
+def synthesize_msid(msid, start, stop):
+    """
+    Description: Deterministic samples of msid on a fixed MAUDE_STEP grid
+    Input: MSID, [start, stop] in CXC seconds
+    Output: (times in CXC seconds, values)
+    """
+    times = np.arange(np.ceil(start / MAUDE_STEP), np.floor(stop / MAUDE_STEP) + 1) * MAUDE_STEP
+    if msid in STATE_MSIDS:
+        states, period = STATE_MSIDS[msid]
+        return times, np.array(states)[(times // period).astype(np.int64) % len(states)]
+    seed = zlib.crc32(msid.encode())
+    nominal = NOMINAL_VALUES.get(msid, 5 + seed % 25)
+    phase = (seed % 628) / 100
+    return times, np.round(nominal * (1 + 0.02 * np.sin(times / 5400 + phase)), 3)
+
+
+def recorded_msid(path, start, stop):
+    "Samples of a recorded msid.json response within [start, stop]"
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)["data-fmt-1"]
+    times = maude_to_secs(np.asarray(data["times"], dtype=np.int64))
+    keep = (times >= start) & (times <= stop)
+    return times[keep], np.asarray(data["values"])[keep]
+
+
+def ifot_properties(event, index, event_time):
+    "Property values of the index-th synthetic event of a type, keyed by lower case name"
+    if event == "PASSPLAN":
+        eot = event_time + timedelta(minutes=75)
+        return {"sched_support_time": f"{event_time:%H%M}-{eot:%H%M}", "ts_bot": yday(event_time),
+                "eot": eot.strftime("%H%M")}
+    if event == "PLAYBACK_BCW":
+        return {"ssr": "A" if index % 4 else "B", "playback_status": "FAILED" if index % 29 == 0 else "OK",
+                "ts_ssr_start_pb": yday(event_time), "status_comment": ""}
+    if event == "DSN_DR":
+        return {"problem": f"Synthetic DR {index}"}
+    if event == "OBS":
+        return {"mode": ("TE_00A1B", "CC_000C2", "TE_0055E")[index % 3]}
+    return {}
+
+
+def ifot_rows(event, start, stop, columns, properties):
+    """
+    Description: Deterministic iFOT rows of event type between start and stop
+    Input: event type, start/stop datetimes, requested columns, property names
+           of the query (blank for properties of other event types)
+    Output: list of (tstart, row)
+    """
+    hours, offset, minutes, type_desc = IFOT_EVENTS[event]
+    step = timedelta(hours=hours)
+    epoch = datetime(2000, 1, 1) + timedelta(minutes=offset)
+    event_time = epoch + -(-(start - epoch) // step) * step
+    rows = []
+
+    while event_time <= stop:
+        index = (event_time - epoch) // step
+        # BIAS packets alternate between 20 and 30 min, so both TE classes show up
+        duration = timedelta(minutes=minutes + (10 if event == "BIAS" and index % 2 else 0))
+        values = {"id": f"{event}-{index}", "linenum": index, "type_desc": type_desc,
+                  "tstart": yday(event_time), "tstop": yday(event_time + duration),
+                  "duration": f"{duration.days}:{duration.seconds // 3600}:"
+                              f"{duration.seconds // 60 % 60}:{duration.seconds % 60}",
+                  "sheetlink": f"DSS-{24 + index % 3 * 10}",
+                  **ifot_properties(event, index, event_time)}
+        rows.append((event_time, [values.get(name.lower(), "") for name in columns + properties]))
+        event_time += step
+    return rows
+
+
+def ifot_table(columns, rows):
+    "iFOT list format: one <table>, the column names as its first row"
+    lines = ["<html><body><table>"]
+    for row in [columns] + rows:
+        lines.append("<tr>" + "".join(f"<td>{escape(str(cell))}</td>" for cell in row) + "</tr>")
+    lines.append("</table></body></html>")
+    return "\n".join(lines)
+
+
+def write_share_tree(root, start, stop):
+    """
+    Description: Write stand-in /share inputs for every day in [start, stop]:
+                 a BEAT report, a daily limits.txt and an OBC error log. Also
+                 creates the output directories the tools expect to exist.
+    Input: root directory (used as FOT_SHARE_ROOT), start/stop datetimes
+    """
+    root = Path(root) / "FOT"
+    ccdm = root / "engineering" / "ccdm"
+    day = datetime(start.year, start.month, start.day)
+
+    while day <= stop:
+        year, doy, index = day.year, day.strftime("%j"), day.toordinal()
+        beat_dir = ccdm / "Current_CCDM_Files" / "Weekly_Reports" / "SSR_Short_Reports" / str(year)
+        beat_dir.mkdir(parents=True, exist_ok=True)
+        with open(beat_dir / f"BEAT-{year}{doy}.txt", "w", encoding="utf-8") as file:
+            for ssr in ("A", "B"):
+                file.write(f"SSR = {ssr}\nSubMod  SBE  MBE  DBE  Start  Stop\n")
+                for submod in range(index % 3 + 1):
+                    dbe_start = day + timedelta(hours=4 * submod + 1)
+                    file.write(f"{(index + submod * 7) % 128}  3  0  {submod % 2}  "
+                               f"{yday(dbe_start)}  {yday(dbe_start + timedelta(minutes=9))}\n")
+                file.write("\n")
+        (ccdm / "Current_CCDM_Files" / "Weekly_Reports" / "SSR_Weekly_Charts" / str(year)).mkdir(
+            parents=True, exist_ok=True)
+
+        limits_dir = (root / "engineering" / "reports" / "dailies" / str(year) /
+                      day.strftime("%b").upper() / f"{day.strftime('%b').lower()}{day.strftime('%d')}_{doy}")
+        limits_dir.mkdir(parents=True, exist_ok=True)
+        with open(limits_dir / "limits.txt", "w", encoding="utf-8") as file:
+            stamp = (day + timedelta(hours=6)).strftime("%Y%j.%H%M%S")
+            file.write(f"{stamp} R CTXAPWR NOMINAL 36.1 < 40.0\n")
+            if index % 5 == 0:
+                file.write(f"{stamp} R CPA1PWR RED_HI 42.7 > 42.0\n")
+
+        obc_dir = root / "engineering" / "flight_software" / "OBC_Error_Log_Dumps" / str(year)
+        obc_dir.mkdir(parents=True, exist_ok=True)
+        with open(obc_dir / f"SMF_ERRLOG_0164_{year}{doy}.txt", "w", encoding="utf-8") as file:
+            file.write("ENTRY TIME  A B C D E TYPE ERROR\n")
+            file.write(f"1 {(day + timedelta(hours=2)).strftime('%Y%j:%H%M%S')} "
+                       "00 00 00 00 00 MEMORY SBE CORRECTED AT 0x4F00\n")
+            file.write("2 NONE\n")
+        day += timedelta(days=1)
+
+    (ccdm / "Tools" / "Weekly").mkdir(parents=True, exist_ok=True)
+    (ccdm / "Tools" / "Daily Plots").mkdir(parents=True, exist_ok=True)
+
+
+class StubServer:
+    "Threaded HTTP server answering MAUDE, iFOT and LaTiS queries"
+
+    def __init__(self, port=0, fixture_dir=None, latency=0.0, failure_rate=0.0, seed=0):
+        self.fixture_dir = Path(fixture_dir) if fixture_dir else None
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    @property
+    def urls(self):
+        "Environment variables pointing the tools at this server"
+        return {
+            "MAUDE_BASE_URL": f"{self.base_url}maude/mrest/",
+            "IFOT_BASE_URL": f"{self.base_url}occweb/web/webapps/ifot/ifot.php",
+            "LATIS_BASE_URL": f"{self.base_url}latis/",
+        }
+
+    def start(self):
+        "Start serving in a background thread"
+        self.thread.start()
+        return self
+
+    def stop(self):
+        "Stop serving and release the port"
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "failures": 0, "bytes": 0,
+                          **{service: 0 for service in SERVICES}}
+
+    def snapshot(self):
+        "Copy of the request counters"
+        with self.lock:
+            return dict(self.stats)
+
+    def recorded(self, service, name):
+        "Path of a recorded response, or None"
+        if self.fixture_dir is None:
+            return None
+        path = self.fixture_dir / service / name
+        return path if path.exists() else None
+
+    def maude(self, query):
+        "msid.json answer for a MAUDE query"
+        msid = query["m"][0].upper()
+        latest = "ts" not in query
+        if latest:
+            stop = float(datetime64_to_secs(np.datetime64("now", "us")))
+            start = stop - 600
+        else:
+            start, stop = (float(datetime64_to_secs(parse_date(query[name][0])))
+                           for name in ("ts", "tp"))
+        recorded = self.recorded("maude", f"{msid}.json")
+        times, vals = (recorded_msid(recorded, start, stop) if recorded
+                       else synthesize_msid(msid, start, stop))
+        if latest:
+            times, vals = times[-1:], vals[-1:]
+        elif query.get("ap", ["f"])[0] == "t":
+            times, vals = times[:PAGE_POINTS], vals[:PAGE_POINTS]
+        elif len(times) > SUBSET_POINTS:
+            stride = -(-len(times) // SUBSET_POINTS)
+            times, vals = times[::stride], vals[::stride]
+        data = {"id": msid, "n": len(times),
+                "times": datetime64_to_maude(secs_to_datetime64(times)).tolist(),
+                "values": vals.tolist()}
+        return json.dumps({"data-fmt-1": data}), "application/json"
+
+    def ifot(self, query):
+        "ifot.php list table for an iFOT query"
+        # e=EVENT.prop.prop,EVENT.prop: the table holds the requested columns, then
+        # the properties of every event type in query order
+        selectors = [selector.split(".") for selector in query.get("e", [""])[0].split(",")]
+        recorded = self.recorded("ifot", f"{selectors[0][0]}.html")
+        if recorded:
+            return recorded.read_text(encoding="utf-8"), "text/html"
+        columns = [name for name in query.get("columns", ["linenum"])[0].split(",")
+                   if name != "properties"]
+        properties = [name for selector in selectors for name in selector[1:] if name]
+        start = parse_date(query["tstart"][0].rstrip("+ ")).item()
+        stop = parse_date(query["tstop"][0]).item()
+        rows = sorted((row for event, *_ in selectors if event in IFOT_EVENTS
+                       for row in ifot_rows(event, start, stop, columns, properties)),
+                      key=lambda row: row[0])
+        return ifot_table(columns + properties, [row for _, row in rows]), "text/html"
+
+    def latis(self, dataset, raw_query):
+        "LaTiS JSON for a dataset query"
+        start, end, inclusive = parse_time_filters(raw_query)
+        recorded = self.recorded("latis", f"{dataset}.json")
+        if recorded:
+            with open(recorded, "r", encoding="utf-8") as file:
+                samples = json.load(file)[dataset]["samples"]
+            lower, upper = start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT)
+            samples = [sample for sample in samples if lower <= sample["time"] and
+                       (sample["time"] < upper or (inclusive and sample["time"] == upper))]
+        else:
+            samples = synthesize_samples(dataset, start, end, inclusive)
+        return json.dumps({dataset: {"samples": samples}}), "application/json"
+
+    def answer(self, target):
+        """
+        Description: Route one request
+        Output: (service, status, body, content type)
+        """
+        parts = urlsplit(target)
+        path, query = parts.path, parse_qs(parts.query)
+        if path.startswith("/maude/") and path.endswith("/msid.json") and "m" in query:
+            return ("maude", 200) + self.maude(query)
+        if path.endswith("/ifot.php"):
+            return ("ifot", 200) + self.ifot(query)
+        if path.startswith("/latis/") and path.endswith(".json"):
+            dataset = path[len("/latis/"):-len(".json")]
+            if dataset in FIXTURE_DATASETS:
+                return ("latis", 200) + self.latis(dataset, parts.query)
+        return None, 404, f"No stub for {path}", "text/plain"
+
+    def _handler(self):
+        "Build the request handler class bound to this server"
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            "Serves MAUDE, iFOT, LaTiS and /_stats"
+            protocol_version = "HTTP/1.1"
+
+            def send_body(self, status, body, content_type):
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                return len(payload)
+
+            def do_GET(self):
+                if self.path == "/_stats":
+                    self.send_body(200, json.dumps(server.snapshot()), "application/json")
+                    return
+
+                with server.lock:
+                    fail = server.random.random() < server.failure_rate
+                time.sleep(server.latency)
+                if fail:
+                    service, status, body, content_type = None, 503, "Injected failure", "text/plain"
+                else:
+                    try:
+                        service, status, body, content_type = server.answer(self.path)
+                    except (KeyError, ValueError) as error:
+                        service, status, body, content_type = None, 400, str(error), "text/plain"
+                size = self.send_body(status, body, content_type)
+
+                with server.lock:
+                    server.stats["requests"] += 1
+                    server.stats["failures"] += fail
+                    server.stats["bytes"] += size
+                    if service:
+                        server.stats[service] += 1
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass
+
+        return Handler
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="Stub MAUDE / iFOT / LaTiS server")
+    parser.add_argument("--serve", type=int, default=8766, metavar="PORT", help="Port to serve on")
+    parser.add_argument("--fixtures", help="Directory of recorded responses")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added sec per request")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the failure sequence")
+    parser.add_argument("--share", metavar="DIR",
+                        help="Also write a stand-in share tree for the last 30 days to DIR")
+    args = parser.parse_args()
+
+    if args.share:
+        write_share_tree(args.share, datetime.now() - timedelta(days=30), datetime.now())
+        print(f" - Stand-in share tree written to {args.share} (set FOT_SHARE_ROOT to use it)")
+    server = StubServer(args.serve, args.fixtures, args.latency, args.failure_rate, args.seed).start()
+    print(f"Serving stubs at {server.base_url}")
+    for name, url in server.urls.items():
+        print(f" - {name}={url}")
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
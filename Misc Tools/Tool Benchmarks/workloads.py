@@ -0,0 +1,132 @@
+"""
+One benchmark workload, run by run_benchmarks.py in a fresh process so imports,
+caches and peak RSS belong to that run alone. The tools are pointed at the stub
+server through the environment (MAUDE_BASE_URL, IFOT_BASE_URL, LATIS_BASE_URL,
+FOT_SHARE_ROOT, TELEMETRY_CACHE, IFOT_CACHE); source="cheta" is served from the stub MAUDE.
+
+Usage:
+    python workloads.py {daily,weekly,biannual} --result FILE [--days N]
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[2]
+sys.path.append(str(REPO / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import MaudeBackend, ChetaBackend, register_backend
+
+# A sample of the Biannual fetch_ska_data MSID list: plain, switch-filtered and range-filtered
+BIANNUAL_MSIDS = [("CRXAV", None, None), ("CTXAPWR", "CTXAX", "OFF"), ("CPA1PWR", "CPA1", "OFF")]
+
+
+class StubChetaBackend(MaudeBackend):
+    """
+    Serves source="cheta" from the stub MAUDE: the cxc archive as full
+    resolution data, cheta's MAUDE data source with its own allow_subset.
+    """
+    name = "cheta"
+    cacheable = ChetaBackend.cacheable
+
+    def fetch(self, msid, start, stop, *, data_source="maude", allow_subset=True, **options):
+        if data_source != "maude":
+            allow_subset = False
+        return super().fetch(msid, start, stop, allow_subset=allow_subset, **options)
+
+
+def enter_tool(name):
+    "Run from the tool directory, as its scripts expect"
+    tool_dir = REPO / name
+    os.chdir(tool_dir)
+    sys.path.insert(0, str(tool_dir))
+
+
+def run_daily(_days):
+    "Daily Plots auto-run (its own 14 day lookback), without the auto-run's error swallowing"
+    enter_tool("Daily Plots")
+    import daily_plots_tool_auto as tool # pylint: disable=import-outside-toplevel
+
+    user_vars = tool.UserVariables()
+    tool.generate_receiver_data_plots(user_vars, True)
+    tool.generate_rf_power_data_plots(user_vars, True)
+    tool.generate_power_amp_data_plots(user_vars, True)
+    tool.generate_status_report(user_vars, True)
+
+
+def run_weekly(_days):
+    "Weekly report for the default (previous Friday thru Saturday) week, no manual inputs"
+    enter_tool("Weekly")
+    import ccdm_weekly as tool # pylint: disable=import-outside-toplevel
+    from cxotime import CxoTime # pylint: disable=import-outside-toplevel
+
+    today = datetime.now()
+    monday = today - timedelta(days=today.weekday())
+    user_vars = tool.UserVariables.__new__(tool.UserVariables)
+    user_vars.ts = CxoTime(f"{(monday - timedelta(days=9)).strftime('%Y:%j')}:00:00:00.000")
+    user_vars.tp = CxoTime(f"{(monday - timedelta(days=3)).strftime('%Y:%j')}:23:59:59.999")
+    user_vars.get_dir_path()
+    user_vars.get_ssr_prime()
+    user_vars.major_events_list = []
+    user_vars.cdme_performance_list = []
+    user_vars.rf_performance_list = []
+    user_vars.limit_violations_list = []
+    user_vars.tlm_corruption_list = ["Nominal."]
+    user_vars.cdme_misc_comments_list = []
+
+    ssr_data = tool.get_ssr_data(user_vars)
+    all_beat_report_data = tool.get_ssr_beat_report_data(user_vars)
+    receiver_data = tool.get_receiver_data(user_vars)
+    tool.build_report(user_vars, ssr_data, all_beat_report_data, receiver_data)
+
+
+def run_biannual(days):
+    "Biannual daily min/mean/max stats of BIANNUAL_MSIDS over the last days"
+    enter_tool("Biannual")
+    import ccdm_biannual as tool # pylint: disable=import-outside-toplevel
+    from Chandra.Time import DateTime # pylint: disable=import-outside-toplevel
+
+    end_date = datetime.now() - timedelta(days=2)
+    start = DateTime((end_date - timedelta(days=days - 1)).strftime("%Y:%j"))
+    end = DateTime(end_date.strftime("%Y:%j"))
+    data = tool.Data()
+    for msid, sw_msid, bad_val in BIANNUAL_MSIDS:
+        tool.get_quarterly_stats(data, msid, sw_msid, bad_val, start, end)
+
+
+WORKLOADS = {"daily": (run_daily, 14), "weekly": (run_weekly, 7), "biannual": (run_biannual, 91)}
+
+
+def main():
+    "Main Execution"
+    parser = argparse.ArgumentParser(description="Run one tool workload against the stub server")
+    parser.add_argument("workload", choices=sorted(WORKLOADS))
+    parser.add_argument("--result", required=True, help="JSON file to write the run result to")
+    parser.add_argument("--days", type=int, help="Lookback in days (Biannual only)")
+    args = parser.parse_args()
+
+    register_backend("cheta", StubChetaBackend())
+    function, default_days = WORKLOADS[args.workload]
+    result = {"workload": args.workload, "status": "ok", "error": None}
+    run_start = time.perf_counter()
+    try:
+        function(args.days or default_days)
+    except BaseException as err: # pylint: disable=broad-exception-caught
+        traceback.print_exc()
+        result.update(status="error", error=f"{type(err).__name__}: {err}")
+    result["seconds"] = time.perf_counter() - run_start
+    result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # KB on Linux
+
+    with open(args.result, "w", encoding="utf-8") as file:
+        json.dump(result, file)
+    sys.stdout.flush()
+    os._exit(0 if result["status"] == "ok" else 1) # skip the tools' atexit/thread teardown
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+regression_check.py
+Byte-exact check of the vectorized work file converter against the original
+per-record struct.unpack implementation, plus a conversion timing.
+
+Usage:
+    python regression_check.py [--records 20000] [--wrk FILE ...]
+"""
+
+import argparse
+import datetime
+import importlib.machinery
+import importlib.util
+import os
+import struct
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+import numpy as np
+
+
+def load_converter():
+    "Import workfile2csvGUI.pyw as a module"
+    path = Path(__file__).with_name("workfile2csvGUI.pyw")
+    loader = importlib.machinery.SourceFileLoader("workfile2csvGUI", str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+# ----------------- Reference (original per-record converter) -----------------
+def reference_date_to_mjd(year, month, day):
+    return (367 * year
+            - int(7 * (year + int((month + 9) / 12)) / 4)
+            + int(275 * month / 9)
+            + day + (1721013.5 - 2400000.5))
+
+
+def reference_convert(filepath, outfile, mjd1985=46066, mjd1900=15020, mjd1970=40587):
+    def d(data, a, b): return struct.unpack("<d", data[a:b])[0]
+
+    with open(filepath, "rb") as fin, open(outfile, "w", encoding="utf-8") as fout:
+        fout.write("RefTime(UTC),RefVCDU,RefTime(sec),Rate(sec/cnt),Drift(sec/cnt^2),DayofYr,ExcelTime\n")
+        while True:
+            data = fin.read(249)
+            if len(data) != 249:
+                break
+            sclk_ref_cnts, sclk_ref_gmt = d(data, 20, 28), d(data, 60, 68)
+            sclk_rate, sclk_drift_rate = d(data, 68, 76), d(data, 76, 84)
+
+            sec1970 = sclk_ref_gmt + (mjd1985 - mjd1970) * 86400
+            base_time = int(sec1970)
+            frac = sec1970 - base_time
+            utc = datetime.datetime.utcfromtimestamp(base_time)
+            doy = utc.timetuple().tm_yday
+            sod = utc.hour * 3600 + utc.minute * 60 + utc.second + frac
+            timestring = f"{utc.year}:{doy:03d}:{utc.hour:02d}:{utc.minute:02d}:{sod % 60:09.6f}"
+            mjd = reference_date_to_mjd(utc.year, utc.month, utc.day)
+            ExcelTime = (mjd - mjd1900 + 2) + sod / 86400
+            DayofYr = doy + sod / 86400
+
+            fout.write(f"{timestring}, {sclk_ref_cnts:14.2f}, {sclk_ref_gmt:17.7f}, "
+                       f"{sclk_rate:17.14f}, {sclk_drift_rate:14.6e}, "
+                       f"{DayofYr:10.6f}, {ExcelTime:13.6f}\n")
+
+
+# ----------------- Synthetic work files -----------------
+def write_synthetic_wrk(path, count, seed=0):
+    """
+    Daily clock correlations from 1999 on, with the awkward cases mixed in:
+    fractions just under a whole second, day/year boundaries, leap days,
+    negative drift, and a truncated trailing record.
+    """
+    rng = np.random.default_rng(seed)
+    records = np.zeros(count, dtype=np.dtype([("raw", "V249")]))
+    raw = records.view(np.uint8).reshape(count, 249)
+    raw[:] = rng.integers(0, 256, raw.shape, dtype=np.uint8)
+
+    start = (datetime.datetime(1999, 7, 23) - datetime.datetime(1985, 1, 1)).total_seconds()
+    gmt = start + np.arange(count) * 86400.0 + rng.uniform(0, 86400, count)
+    edge = rng.choice(count, min(count, 200), replace=False)
+    gmt[edge[:50]] = np.floor(gmt[edge[:50]]) + 0.99999999
+    gmt[edge[50:100]] = np.round(gmt[edge[50:100]] / 86400) * 86400 - 1e-7
+    gmt[edge[100:150]] = np.round(gmt[edge[100:150]] / 86400) * 86400
+
+    fields = {
+        4: rng.normal(0, 1, count), 12: rng.normal(0, 1, count),
+        20: np.arange(count) * 337500.0 + rng.uniform(0, 1e4, count),
+        60: gmt, 68: 0.25625 + rng.normal(0, 1e-9, count),
+        76: rng.normal(0, 1e-18, count),
+    }
+    for offset, values in fields.items():
+        raw[:, offset:offset + 8] = values.astype("<f8").view(np.uint8).reshape(count, 8)
+    raw[:, 224:245] = np.frombuffer(b"SCLK_BASE_REF 2024   ", dtype=np.uint8)
+
+    with open(path, "wb") as f:
+        f.write(raw.tobytes())
+        f.write(b"\x00" * 100) # partial record, ignored by both converters
+
+
+def check(wrk_path, converter):
+    "Convert wrk_path both ways, return (identical, new seconds, reference seconds)"
+    new_csv = os.path.splitext(wrk_path)[0] + ".csv"
+    ref_csv = os.path.splitext(wrk_path)[0] + ".reference.csv"
+
+    start = time.perf_counter()
+    converter.convert_file(wrk_path, lambda msg: None)
+    new_time = time.perf_counter() - start
+    start = time.perf_counter()
+    reference_convert(wrk_path, ref_csv)
+    ref_time = time.perf_counter() - start
+
+    with open(new_csv, "rb") as new, open(ref_csv, "rb") as ref:
+        return new.read() == ref.read(), new_time, ref_time
+
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning) # utcfromtimestamp, kept as originally written
+    parser = argparse.ArgumentParser(description="Work file converter regression check")
+    parser.add_argument("--records", type=int, default=20000, help="Synthetic record count")
+    parser.add_argument("--wrk", nargs="*", default=[], help="Real work files to check as well")
+    args = parser.parse_args()
+
+    converter = load_converter()
+    failures = 0
+    with tempfile.TemporaryDirectory() as temp_dir:
+        synthetic = os.path.join(temp_dir, "synthetic.wrk")
+        write_synthetic_wrk(synthetic, args.records)
+        for wrk_path in [synthetic, *args.wrk]:
+            if wrk_path != synthetic: # convert a copy, keeping the real file's directory clean
+                copy = Path(temp_dir, Path(wrk_path).name)
+                copy.write_bytes(Path(wrk_path).read_bytes())
+                wrk_path = str(copy)
+            identical, new_time, ref_time = check(wrk_path, converter)
+            failures += not identical
+            print(f" - {Path(wrk_path).name}: {'identical' if identical else 'MISMATCH'}, "
+                  f"vectorized {new_time:.3f} sec, reference {ref_time:.3f} sec")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,13 @@ GUI for converting binary work files (.wrk) to CSV using Tkinter.
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
-import struct
-import datetime
 import os
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "SCLK Correlation"))
+from sclk_correlation import CorrelationStore, read_wrk_records, format_gmt
 
 
 MJD1985 = 46066
@@ -16,44 +20,41 @@ MJD1900 = 15020
 MJD1970 = 40587
 
 
+CSV_HEADER = "RefTime(UTC),RefVCDU,RefTime(sec),Rate(sec/cnt),Drift(sec/cnt^2),DayofYr,ExcelTime"
+CSV_FORMAT = "%d:%03d:%02d:%02d:%09.6f, %14.2f, %17.7f, %17.14f, %14.6e, %10.6f, %13.6f"
+
+
 def date_to_mjd(year, month, day):
+    "MJD of a calendar date, works element-wise on integer arrays"
     return (367 * year
-            - int(7 * (year + int((month + 9) / 12)) / 4)
-            + int(275 * month / 9)
+            - (7 * (year + (month + 9) // 12)) // 4
+            + (275 * month) // 9
             + day + (1721013.5 - 2400000.5))
 
 
-def secref_to_timedata(secref, refmjd):
+def secref_to_columns(secref, refmjd):
+    """
+    Vectorized UTC breakdown of seconds since refmjd. The float operations are
+    done in the same order as the per-record code they replace, so the CSV
+    text is unchanged.
+    """
     sec1970 = secref + (refmjd - MJD1970) * 86400
-    base_time = int(sec1970)
+    base_time = np.trunc(sec1970).astype(np.int64)
     frac = sec1970 - base_time
-    utc = datetime.datetime.utcfromtimestamp(base_time)
-    doy = utc.timetuple().tm_yday
-    sec_of_day = utc.hour * 3600 + utc.minute * 60 + utc.second + frac
-    timestring = f"{utc.year}:{doy:03d}:{utc.hour:02d}:{utc.minute:02d}:{sec_of_day % 60:09.6f}"
-    mjd = date_to_mjd(utc.year, utc.month, utc.day)
-    return {
-        "timestring": timestring,
-        "mjd": mjd,
-        "year": utc.year,
-        "doy": doy,
-        "sod": sec_of_day,
-    }
-
-
-def unpack_wrk_record(data):
-    """Unpack 249-byte record."""
-    def d(a, b): return struct.unpack("<d", data[a:b])[0]
-    def l(a, b): return struct.unpack("<l", data[a:b])[0]
-    w = {}
-    w["sclk_adj_data_1"] = d(4, 12)
-    w["sclk_adj_data_f"] = d(12, 20)
-    w["sclk_ref_cnts"] = d(20, 28)
-    w["sclk_ref_gmt"] = d(60, 68)
-    w["sclk_rate"] = d(68, 76)
-    w["sclk_drift_rate"] = d(76, 84)
-    w["sclk_base_ref"] = data[224:245].decode(errors="ignore").strip()
-    return w
+
+    utc = base_time.astype("datetime64[s]")
+    days = utc.astype("datetime64[D]")
+    years = days.astype("datetime64[Y]")
+    year = years.astype(np.int64) + 1970
+    month = days.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    day = (days - days.astype("datetime64[M]")).astype(np.int64) + 1
+    doy = (days - years.astype("datetime64[D]")).astype(np.int64) + 1
+    hour, rest = np.divmod((utc - days).astype(np.int64), 3600)
+    minute, second = np.divmod(rest, 60)
+
+    sec_of_day = (hour * 3600 + minute * 60 + second) + frac
+    mjd = date_to_mjd(year, month, day)
+    return year, doy, hour, minute, sec_of_day, mjd
 
 
 def convert_file(filepath, log_callback):
@@ -64,37 +65,48 @@ def convert_file(filepath, log_callback):
         outfile = os.path.splitext(filepath)[0] + ".csv"
         log_callback(f"Reading {filepath}...\n")
 
-        with open(filepath, "rb") as fin, open(outfile, "w", encoding="utf-8") as fout:
-            fout.write("RefTime(UTC),RefVCDU,RefTime(sec),Rate(sec/cnt),Drift(sec/cnt^2),DayofYr,ExcelTime\n")
+        records = read_wrk_records(filepath)
+        year, doy, hour, minute, sod, mjd = secref_to_columns(records["sclk_ref_gmt"], MJD1985)
+        ExcelTime = (mjd - MJD1900 + 2) + sod / 86400
+        DayofYr = doy + sod / 86400
 
-            recnum = 0
-            while True:
-                data = fin.read(249)
-                if len(data) != 249:
-                    break
-                w = unpack_wrk_record(data)
-                recnum += 1
+        columns = np.column_stack([
+            year, doy, hour, minute, sod % 60, records["sclk_ref_cnts"], records["sclk_ref_gmt"],
+            records["sclk_rate"], records["sclk_drift_rate"], DayofYr, ExcelTime])
+        with open(outfile, "w", encoding="utf-8") as fout:
+            np.savetxt(fout, columns, fmt=CSV_FORMAT, header=CSV_HEADER, comments="")
 
-                t = secref_to_timedata(w["sclk_ref_gmt"], MJD1985)
-                mjd, doy, sod = t["mjd"], t["doy"], t["sod"]
-                ExcelTime = (mjd - MJD1900 + 2) + sod / 86400
-                DayofYr = doy + sod / 86400
+        log_callback(f"✅ Done! {len(records)} records written to:\n{outfile}\n")
+    except Exception as e:
+        log_callback(f"❌ Error: {e}\n")
+        messagebox.showerror("Conversion Error", str(e))
 
-                fout.write(f"{t['timestring']}, {w['sclk_ref_cnts']:14.2f}, {w['sclk_ref_gmt']:17.7f}, "
-                           f"{w['sclk_rate']:17.14f}, {w['sclk_drift_rate']:14.6e}, "
-                           f"{DayofYr:10.6f}, {ExcelTime:13.6f}\n")
 
-        log_callback(f"✅ Done! {recnum} records written to:\n{outfile}\n")
+def analyze_file(filepath, log_callback):
+    "Ingest the work file into the SCLK correlation store and report rate step anomalies"
+    try:
+        store = CorrelationStore()
+        try:
+            count = store.ingest_file(filepath)
+            model = store.load()
+        finally:
+            store.close()
+        log_callback(f"Ingested {count} correlation updates ({len(model)} in store).\n")
+
+        index, gmt, residual, z_score = model.rate_steps()
+        for stamp, step, score in zip(format_gmt(gmt), residual, z_score):
+            log_callback(f"⚠ {stamp} rate step {step: .3e} sec/cnt ({score:.1f} sigma)\n")
+        log_callback(f"✅ {len(index)} anomalous rate steps found.\n")
     except Exception as e:
         log_callback(f"❌ Error: {e}\n")
-        messagebox.showerror("Conversion Error", str(e))
+        messagebox.showerror("Analysis Error", str(e))
 
 
 # ----------------- GUI -----------------
 def launch_gui():
     root = tk.Tk()
     root.title("Workfile to CSV Converter")
-    root.geometry("600x400")
+    root.geometry("600x440")
     root.resizable(False, False)
 
     selected_file = tk.StringVar()
@@ -112,6 +124,13 @@ def launch_gui():
         log("Starting conversion...\n")
         convert_file(selected_file.get(), log)
 
+    def run_analysis():
+        if not selected_file.get():
+            messagebox.showwarning("No file", "Please select a .wrk file first.")
+            return
+        log("Analyzing clock correlation...\n")
+        analyze_file(selected_file.get(), log)
+
     def log(msg):
         output.insert(tk.END, msg)
         output.see(tk.END)
@@ -120,7 +139,8 @@ def launch_gui():
     tk.Label(root, text="Select a Work (.wrk) File:", font=("Arial", 12)).pack(pady=10)
     tk.Entry(root, textvariable=selected_file, width=60).pack(pady=5)
     tk.Button(root, text="Browse", command=choose_file, width=15).pack(pady=5)
-    tk.Button(root, text="Convert to CSV", command=run_conversion, width=20, bg="#4CAF50", fg="white").pack(pady=10)
+    tk.Button(root, text="Convert to CSV", command=run_conversion, width=20, bg="#4CAF50", fg="white").pack(pady=5)
+    tk.Button(root, text="Analyze SCLK Drift", command=run_analysis, width=20).pack(pady=5)
 
     tk.Label(root, text="Output Log:", font=("Arial", 11)).pack(pady=5)
     output = scrolledtext.ScrolledText(root, wrap=tk.WORD, width=70, height=12)
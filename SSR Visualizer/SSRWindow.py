@@ -4,30 +4,63 @@ Handles user inputs, continuous updating, and dynamic image rendering.
 """
 
 import sys
-from generate_image import generate_image
+import threading
+from types import SimpleNamespace
+from generate_image import generate_image, TelemetryCache
 from PyQt5 import QtWidgets, QtGui, QtCore
 
 
 class QTextEditLogger(QtCore.QObject):
     """
     A logger that redirects standard output (stdout/stderr) to a QTextEdit widget.
+    Writes from worker threads are queued onto the GUI thread through a signal.
     """
+    message = QtCore.pyqtSignal(str)
+
     def __init__(self, text_edit):
         super().__init__()
         self.text_edit = text_edit
+        self.message.connect(self._append)
 
     def write(self, msg):
-        """Write a message to the QTextEdit widget and force a GUI update."""
+        """Queue a message for the QTextEdit widget."""
         if msg.strip():
-            self.text_edit.append(msg)
-            self.text_edit.moveCursor(QtGui.QTextCursor.End)
-            QtWidgets.QApplication.processEvents()
+            self.message.emit(msg)
+
+    def _append(self, msg):
+        self.text_edit.append(msg)
+        self.text_edit.moveCursor(QtGui.QTextCursor.End)
 
     def flush(self):
         """Dummy flush method required by some libraries when replacing sys.stdout"""
         pass
 
 
+class SSRWorkerSignals(QtCore.QObject):
+    """Signals emitted by SSRWorker (QRunnable cannot define signals itself)."""
+    finished = QtCore.pyqtSignal(int, object)
+
+
+class SSRWorker(QtCore.QRunnable):
+    """
+    Runs the MAUDE fetch and Matplotlib render off the GUI thread and hands
+    the RGBA buffer back through signals.finished(request_id, rgba).
+    """
+    def __init__(self, request_id, request):
+        super().__init__()
+        self.request_id = request_id
+        self.request = request
+        self.signals = SSRWorkerSignals()
+
+    def cancel(self):
+        """Stop the fetch at the next MAUDE page boundary."""
+        self.request.cancelled.set()
+
+    def run(self):
+        generate_image(self.request)
+        self.signals.finished.emit(self.request_id, self.request.plot_rgba)
+
+
 class SSRPointerWindow(QtWidgets.QWidget):
     """
     This class implements a user-interface for a set of tools that generate
@@ -72,6 +105,10 @@ class SSRPointerWindow(QtWidgets.QWidget):
         self.selectedquery = None
         self.plot_rgba = None
         self.display_mode = "pointers"
+        self.tlm_cache = TelemetryCache()
+        self.request_id = 0
+        self.worker = None
+        self.threadpool = QtCore.QThreadPool()
 
         # --- Timer ---
         self.timer = QtCore.QTimer()
@@ -95,22 +132,55 @@ class SSRPointerWindow(QtWidgets.QWidget):
     # ---------------------------------------------------------
     def selected_ssr(self, text):
         self.selectedssr = text
+        self._restart_inflight()
 
     def selected_channel(self, text):
         self.selectedchannel = text
+        self._restart_inflight()
 
     def selected_query(self, text):
         self.selectedquery = float(text[:-3])
+        self._restart_inflight()
 
     def run_ssr(self):
         """Handle the Run button click event and timer execution."""
-        self.consoleoutput.clear() 
-        generate_image(self)
+        if self.worker is not None:
+            return # previous refresh still running with the same selection
+
+        self.consoleoutput.clear()
+        self.request_id += 1
+        request = SimpleNamespace(
+            selectedssr=self.selectedssr,
+            selectedchannel=self.selectedchannel,
+            selectedquery=self.selectedquery,
+            display_mode=self.display_mode,
+            continuous=self.continuous_checkbox.isChecked(),
+            tlm_cache=self.tlm_cache,
+            cancelled=threading.Event(),
+            plot_rgba=None)
+        self.worker = SSRWorker(self.request_id, request)
+        self.worker.signals.finished.connect(self.ssr_finished)
+        self.threadpool.start(self.worker)
+
+    def ssr_finished(self, request_id, plot_rgba):
+        """Receive a rendered buffer from the worker, dropping stale results."""
+        if request_id != self.request_id:
+            return
+        self.worker = None
+        self.plot_rgba = plot_rgba
         self._build_image_output()
 
         if self.plot_rgba is None:
             print(f"  - (Error): Cannot generate plot.\n")
 
+    def _restart_inflight(self):
+        """Cancel an in-flight request and rerun it with the new selection."""
+        if self.worker is None:
+            return
+        self.worker.cancel()
+        self.worker = None
+        self.run_ssr()
+
     def toggle_continuous(self, checked):
         if checked:
             self.timer.start(30000) 
@@ -123,6 +193,8 @@ class SSRPointerWindow(QtWidgets.QWidget):
         self.display_mode = "time" if checked else "pointers"
 
     def quit_event(self):
+        if self.worker is not None:
+            self.worker.cancel()
         sys.exit(1)
 
     def resizeEvent(self, event):
@@ -3,71 +3,127 @@ Tool to display SSR Pointers.
 Handles MAUDE data requests, data parsing, and native Matplotlib polar plot generation.
 """
 
-import json
-import urllib.request
+import sys
+import threading
 import traceback
 import warnings
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch, FetchCancelled
+
 warnings.filterwarnings("ignore")
 
+MAUDE_URL = "http://telemetry.cfa.harvard.edu/maude/mrest/"
+MAX_WORKERS = 6     # concurrent MAUDE requests
+SPLIT_HOURS = 6     # cold fetches longer than this are split into parallel sub-windows
+
+
+class TelemetryCache:
+    """
+    Rolling in-memory time series per (channel, MSID).
+
+    Each refresh only requests samples newer than the last held timestamp
+    (plus any head gap if the query window grew), and trims samples that
+    have slid out of the window.
+    """
+    def __init__(self):
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached (window_start, DataFrame) for key, or None."""
+        with self.lock:
+            return self.series.get(key)
+
+    def put(self, key, window_start, df):
+        """Store the series for key, trimmed to samples at or after window_start."""
+        df = df[df['times'] >= window_start.replace(tzinfo=None)].reset_index(drop=True)
+        with self.lock:
+            self.series[key] = (window_start, df)
+        return df
+
+    def clear(self):
+        """Drop every cached series."""
+        with self.lock:
+            self.series.clear()
+
+
+def split_window(ts, tp, hours=SPLIT_HOURS) -> list:
+    """Split [ts, tp] into consecutive sub-windows no longer than hours."""
+    step = timedelta(hours=hours)
+    windows = []
+    while ts + step < tp:
+        windows.append((ts, ts + step))
+        ts += step
+    windows.append((ts, tp))
+    return windows
+
+
+def maude_fetch(channel: str, msid: str, ts, tp, cancelled=None) -> pd.DataFrame:
+    """
+    Page forward through MAUDE (all points) for one MSID from ts to tp. If a
+    cancelled threading.Event is given it is checked before every page.
+    """
+    data = fetch(msid, ts, tp, source="maude", channel=channel, allow_subset=False,
+                 base_url=MAUDE_URL, cancelled=cancelled, cache=False)
+    return pd.DataFrame({'times': data.datetime64.astype('datetime64[ns]'),
+                         'values': data.vals})
+
 
 def data_request(self, msids: list) -> pd.DataFrame:
-    """Synchronous fetching with urllib, vectorized Pandas processing."""
-    def maude_data_request(ts, tp, msid):
-        url = ("http://telemetry.cfa.harvard.edu/maude/mrest/"
-               f"{self.selectedchannel.upper()}/msid.json?m={msid}"
-               f"&ts={ts.strftime('%Y%j%H%M%S')}"
-               f"&tp={tp.strftime('%Y%j%H%M%S')}&ap=t")
-        response = urllib.request.urlopen(url)
-        return json.loads(response.read())
+    """
+    Returns the requested MSIDs over [start_date, end_date]. Series already
+    held in self.tlm_cache are only extended with newer samples.
+    """
+    if getattr(self, 'tlm_cache', None) is None:
+        self.tlm_cache = TelemetryCache()
 
     all_dfs = []
     ts = self.start_date
     tp = self.end_date
+    cancelled = getattr(self, 'cancelled', None)
+    channel = self.selectedchannel
+    chunks = defaultdict(list)
+    plan = []
 
+    # Plan every (msid, sub-window) request up front so they all run on one pool
     for msid in msids:
-        raw_times_accum = []
-        raw_values_accum = []
-        shift_time = timedelta(0)
-
-        while True:
-            raw_data = maude_data_request(ts + shift_time, tp, msid)
-            chunk_times = raw_data.get('data-fmt-1', {}).get('times', [])
-            chunk_values = raw_data.get('data-fmt-1', {}).get('values', [])
-
-            if not chunk_times:
-                break
-
-            raw_times_accum.extend(chunk_times)
-            raw_values_accum.extend(chunk_values)
-
-            last_time_str = str(chunk_times[-1])
-            last_time_dt = datetime.strptime(last_time_str, "%Y%j%H%M%S%f").replace(tzinfo=timezone.utc)
-            new_shift_time = last_time_dt - ts
-
-            if last_time_dt >= tp or new_shift_time <= shift_time:
-                break
-            shift_time = new_shift_time
+        cached = self.tlm_cache.get((channel.upper(), msid))
 
-        if not raw_times_accum:
-            empty_df = pd.DataFrame(columns=['times', 'values'])
-            empty_df['msid'] = msid
-            all_dfs.append(empty_df)
-            continue
+        if cached is None or cached[1].empty:
+            plan.extend((msid, a, b) for a, b in split_window(ts, tp))
+        else:
+            cached_start, cached_df = cached
+            if ts < cached_start: # window grew, backfill the head gap
+                plan.extend((msid, a, b) for a, b in split_window(ts, cached_start))
+            chunks[msid].append(cached_df)
+            last_time = cached_df['times'].iloc[-1].to_pydatetime().replace(tzinfo=timezone.utc)
+            plan.append((msid, last_time, tp))
+
+    pool = ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(plan) or 1))
+    try:
+        futures = {pool.submit(maude_fetch, channel, msid, a, b, cancelled): msid
+                   for msid, a, b in plan}
+        for future in as_completed(futures):
+            chunks[futures[future]].append(future.result())
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
 
-        df = pd.DataFrame({'times': raw_times_accum, 'values': raw_values_accum})
+    for msid in msids:
+        df = pd.concat(chunks[msid], ignore_index=True)
         df.drop_duplicates(subset=['times'], inplace=True)
-        df['times'] = pd.to_datetime(df['times'].astype(str), format='%Y%j%H%M%S%f')
-        df['values'] = pd.to_numeric(df['values'])
-
         df.sort_values(by='times', inplace=True)
         df.reset_index(drop=True, inplace=True)
+        df = self.tlm_cache.put((channel.upper(), msid), ts, df).copy()
         df['msid'] = msid
         all_dfs.append(df)
 
@@ -77,13 +133,18 @@ def data_request(self, msids: list) -> pd.DataFrame:
     return pd.concat(all_dfs, ignore_index=True)
 
 
+def msid_frame(self, msid: str) -> pd.DataFrame:
+    """Returns one MSID's rows from the frame prefetched by generate_image."""
+    return self.tlm[self.tlm['msid'] == msid].reset_index(drop=True)
+
+
 def get_pointers(self):
     """Retrieves the playback and record pointers using vectorized Pandas operations."""
     print("  - Getting Playback/Record Pointers...")
     pb_pointers = []
     ssr_max_val = 134217728
 
-    pb_df = data_request(self, [f"COS{self.selectedssr.upper()}PBPT"])
+    pb_df = msid_frame(self, f"COS{self.selectedssr.upper()}PBPT")
 
     if pb_df.empty:
         raise ValueError(f"No Playback Pointer data returned for SSR-{self.selectedssr}.")
@@ -99,7 +160,7 @@ def get_pointers(self):
     else:
         pb_pointers.append(None)
 
-    rc_df = data_request(self, [f"COS{self.selectedssr.upper()}RCPT"])
+    rc_df = msid_frame(self, f"COS{self.selectedssr.upper()}RCPT")
 
     if rc_df.empty:
         raise ValueError(f"No Record Pointer data returned for SSR-{self.selectedssr}.")
@@ -184,9 +245,9 @@ def generate_polar_plot(self):
         ax.text(angle, 1.28, label_text, ha='center', va='center', fontsize=14, color='black')
 
     # Status Alert
-    playback_active = data_request(self, [f"COS{self.selectedssr}PBEN"])
+    playback_active = msid_frame(self, f"COS{self.selectedssr.upper()}PBEN")
     print(f"  - Checking if SSR-{self.selectedssr} has an active playback...")
-    if not playback_active.empty and str(playback_active['values'].iloc[-1]) == "1":
+    if not playback_active.empty and int(playback_active['values'].iloc[-1]) == 1:
         fig.text(0.95, 0.95, "PLAYBACK ACTIVE", color="black", fontsize=14,
                  ha="right", va="top", bbox=dict(facecolor='red',
                                                  edgecolor='black', boxstyle='square,pad=0.3'))
@@ -215,9 +276,12 @@ def generate_image(self):
     self.end_date = datetime.now(timezone.utc) - timedelta(seconds=5)
 
     print(f"Checking if SSR-{self.selectedssr} is ON...")
-    ssr_power = data_request(self, [f"COSSR{self.selectedssr}X"])
 
     try:
+        ssr = self.selectedssr.upper()
+        self.tlm = data_request(self, [f"COSSR{ssr}X", f"COS{ssr}PBPT",
+                                       f"COS{ssr}RCPT", f"COS{ssr}PBEN"])
+        ssr_power = msid_frame(self, f"COSSR{ssr}X")
         if ssr_power.empty:
             print(f"  - (Error): No power data retrieved.")
             self.plot_rgba = None
@@ -229,10 +293,14 @@ def generate_image(self):
             generate_polar_plot(self)
         else:
             self.plot_rgba = None
+    except FetchCancelled:
+        print(f"  - Request for SSR-{self.selectedssr} cancelled.")
+        self.plot_rgba = None
+        return
     except Exception as error:
         print(f"  - (Error) \"{error}\": Failed to generate plot.")
         traceback.print_exc()
         self.plot_rgba = None
 
-    if hasattr(self, 'continuous_checkbox') and self.continuous_checkbox.isChecked():
+    if getattr(self, 'continuous', False):
         print("  - Continuous mode ENABLED.")
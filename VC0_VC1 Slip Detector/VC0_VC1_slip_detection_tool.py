@@ -1,16 +1,20 @@
 "VC0_VC1 Slip Detector Tool"
 
-import urllib
-import json
-import time
 import os
-import plotly.graph_objects as go
-import selenium
-import kaleido #0.1.0.post1
-import dataclasses
+import sys
+import argparse
+import numpy as np
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
 from getpass import getuser
-from selenium import webdriver
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Misc Tools" / "CCDM Telemetry"))
+from ccdm_telemetry import fetch, TelemetryError
+
+
+MIN_SAMPLE_PERIOD = 0.25625 # sec, one minor frame (upper bound on M0190 sample rate)
 
 
 class UserVariables():
@@ -23,11 +27,54 @@ class UserVariables():
         self.tp = datetime.now(timezone.utc)
 
 
-@dataclasses.dataclass
-class DataPoint():
-    "A single data point"
-    date_time: None
-    value: None
+class SampleRingBuffer():
+    """
+    Fixed-capacity ring buffer of (time, value) samples. Times are stored as
+    int64 nanoseconds since epoch and values as int32, so memory use is
+    bounded by the retention window no matter how long the tool runs.
+    """
+
+    def __init__(self, retention_hours):
+        self.retention = np.int64(retention_hours * 3600 * 1e9)
+        self.capacity = int(retention_hours * 3600 / MIN_SAMPLE_PERIOD) + 1
+        self.times = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros(self.capacity, dtype=np.int32)
+        self.head = 0   # next write index
+        self.size = 0
+
+    def last(self):
+        "Return the newest (time, value) held, or None if empty"
+        if self.size == 0:
+            return None
+        index = (self.head - 1) % self.capacity
+        return self.times[index], self.values[index]
+
+    def append(self, times, values):
+        "Append samples newer than the last held time, return the ones kept"
+        last = self.last()
+        if last is not None:
+            keep = times > last[0]
+            times, values = times[keep], values[keep]
+        times = times[-self.capacity:]
+        values = values[-self.capacity:]
+
+        count = len(times)
+        index = (self.head + np.arange(count)) % self.capacity
+        self.times[index] = times
+        self.values[index] = values
+        self.head = (self.head + count) % self.capacity
+        self.size = min(self.size + count, self.capacity)
+        return times, values
+
+    def window(self):
+        "Return the samples inside the retention window, oldest first"
+        index = (self.head - self.size + np.arange(self.size)) % self.capacity
+        times = self.times[index]
+        values = self.values[index]
+        if self.size:
+            keep = times >= times[-1] - self.retention
+            times, values = times[keep], values[keep]
+        return times, values
 
 
 def is_windows():
@@ -39,139 +86,105 @@ def is_windows():
 
 def data_request(user_vars, msid):
     """
-    Description: Data request for a general timeframe and MSID, returns json or data dict
+    Description: Data request for a general timeframe and MSID. One quick
+                 attempt only, the next poll is never more than 9 sec away.
     Input: User Variables, MSID
-    Output: Data dict or JSON
+    Output: Telemetry, None on a network error
     """
-    ts_greta = user_vars.ts.strftime("%Y%j.%H%M%S")
-    tp_greta = user_vars.tp.strftime("%Y%j.%H%M%S")
-    base_url = "https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m="
-    url = f"{base_url}{msid}&ts={ts_greta}&tp={tp_greta}"
-
     try:
-        response = urllib.request.urlopen(url, timeout = 3)
-    except urllib.error.URLError:
+        return fetch(msid, user_vars.ts, user_vars.tp, source="maude",
+                     timeout=3, attempts=1, cache=False)
+    except TelemetryError:
         print(" - Network error. Some data will be missing in plot")
+        return None
 
-    html = response.read()
-    return json.loads(html)
 
+def decode_samples(raw_data):
+    "Telemetry samples as (int64 ns since epoch, int32 value) arrays, sorted by time"
+    times = raw_data.datetime64.astype("datetime64[ns]").astype(np.int64)
+    return times, raw_data.vals.astype(np.int32)
 
-def vc0_vc1_slip_detection(raw_data):
-    "In work"
-    values = raw_data["data-fmt-1"]["values"]
-    times =  raw_data["data-fmt-1"]["times"]
-    diff_list = []
 
-    for index, (raw_value, raw_time) in enumerate(zip(values, times)):
-        corrected_time = datetime.strptime(str(raw_time), "%Y%j%H%M%S%f")
-        value = int(raw_value)
-        previous_value = int(values[index - 1])
-        diff = value-previous_value
-
-        if value != 0:
-            try:
-                if (
-                    (value != previous_value) and
-                    (diff > 5) and
-                    (diff in range(56,61) or diff in range(95,100))
-                ):
-                    diff_list.append([corrected_time, diff])
-            except IndexError:
-                pass
-
-    return diff_list
-
-
-def append_data_history(history_data, raw_data):
-    "Save data history while tool is running"
-    values = raw_data["data-fmt-1"]["values"]
-    times =  raw_data["data-fmt-1"]["times"]
-
-    for raw_time, value in zip(times, values):
-        history_data.append(
-            DataPoint(datetime.strptime(str(raw_time),"%Y%j%H%M%S%f"), int(value))
-            )
-
-    return history_data
+def vc0_vc1_slip_detection(new_times, new_values, previous):
+    """
+    Vectorized slip check over only the newly received samples. previous is
+    the last (time, value) already held, used to diff the first new sample.
+    """
+    values = new_values.astype(np.int64)
+    if len(values) == 0:
+        return new_times, values
 
+    first_previous = values[0] if previous is None else np.int64(previous[1])
+    diff = values - np.concatenate(([first_previous], values[:-1]))
 
-def generate_plot(detected_slips, data_history, base_dir):
-    "Generate static image of dataframe"
-    x_values, y_values = ([] for i in range(2))
-    plot = go.Figure()
+    slips = (
+        (values != 0) & (diff > 5) &
+        (((diff >= 56) & (diff <= 60)) | ((diff >= 95) & (diff <= 99)))
+    )
+    return new_times[slips], diff[slips]
+
+
+def setup_plot():
+    "Build the live figure once; later ticks only update its artists"
+    plt.ion()
+    fig, ax = plt.subplots(figsize=(19.2, 10.8), dpi=100)
+    fig.canvas.manager.set_window_title("VC0/VC1 Slip Detection")
+    fig.patch.set_facecolor("black")
+    ax.set_facecolor("black")
+    ax.grid(color=(80/255, 80/255, 80/255))
+    ax.tick_params(colors="white")
+    for spine in ax.spines.values():
+        spine.set_color("white")
+    ax.set_xlabel("Time/Date", color="white", family="monospace", fontsize=14)
+    ax.set_ylabel("Monitor Data (M0190)", color="white", family="monospace", fontsize=14)
+    # The line starts empty, so tell the axis up front that x holds datetimes
+    ax.xaxis_date()
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.DateFormatter("%Y:%j:%H:%M:%S"))
+    (line,) = ax.plot([], [], color=(235/255, 225/255, 52/255), label="VC0/VC1 Slip")
+    status = fig.text(
+        0.4, 0.95, "", ha="left", va="center", family="monospace", fontsize=40,
+        bbox={"edgecolor": "black", "linewidth": 2, "alpha": 0.8})
+    fig.show()
+    return fig, ax, line, status
+
+
+def update_plot(plot, detected_slips, history):
+    "Push the retained window into the existing line and refresh the status box"
+    fig, ax, line, status = plot
 
-    # Slip Detected Plot
     if detected_slips:
-        plot.add_annotation(
-            text = "---VC0/VC1 Slip Detection---<br>      SLIP IS OCCURING",
-            xref="paper", yref="paper",
-            x=0.4, y=1.077, showarrow=False,
-            align="left", bordercolor="black", borderwidth=2, borderpad=4,
-            bgcolor="red", opacity=0.8,
-            font = {"family": "Courier New, monospace", "size": 56, "color": "white"}
-            )
+        status.set_text("---VC0/VC1 Slip Detection---\n      SLIP IS OCCURING")
+        status.set_color("white")
+        status.get_bbox_patch().set_facecolor("red")
     else:
-        plot.add_annotation(
-            text = "---VC0/VC1 Slip Detection---<br>      NO slip occuring",
-            xref="paper", yref="paper",
-            x=0.4, y=1.077, showarrow = False,
-            align="left", bordercolor="black", borderwidth = 2, borderpad = 4,
-            bgcolor="white", opacity = 0.8, 
-            font = {"family": "Courier New, monospace", "size": 56, "color": "black"}
-            )
-
-    # Monitor Data History Plot
-    for item in data_history:
-        x_values.append(item.date_time)
-        y_values.append(item.value)
-
-    plot.add_traces(
-        go.Scatter(
-            x = x_values,
-            y = y_values,
-            mode = "lines",
-            name = "VC0/VC1 Slip",
-            marker = {"color":"rgba(235,225,52,1)"}
-        )
-    )
+        status.set_text("---VC0/VC1 Slip Detection---\n      NO slip occuring")
+        status.set_color("black")
+        status.get_bbox_patch().set_facecolor("white")
 
-    plot["layout"]["xaxis"]["title"] = "Time/Date"
-    plot["layout"]["yaxis"]["title"] = "Monitor Data (M0190)"
-    plot.update_xaxes(gridcolor="rgba(80,80,80,1)")
-    plot.update_yaxes(gridcolor="rgba(80,80,80,1)")
-    plot.update_layout(
-        font={
-            "family": "Courier New, monospace",
-            "size": 14,
-            "color": "rgba(255,255,255,1)",
-        },
-        plot_bgcolor =  "rgba(0,0,0,1)",
-        paper_bgcolor = "rgba(0,0,0,1)",
-        width =  1920,
-        height = 1080,
-    )
-
-    plot.write_image(f"{base_dir}/VC0_VC1_Slips_Detected.png")
+    times, values = history.window()
+    line.set_data(times.astype("datetime64[ns]"), values)
+    ax.relim()
+    ax.autoscale_view()
+    fig.canvas.draw_idle()
 
 
-def save_data(data_history, base_dir):
+def save_data(history, base_dir):
     "Clean up things"
+    times, values = history.window()
+    stamps = times.astype("datetime64[us]").tolist()
 
     with open(f"{base_dir}/VC0_VC1_Slips_Detection_Output.txt", "w", encoding = "utf-8") as file:
         file.write("------Time--------  |  --Value--\n")
-        for item in data_history:
-            file.write(f"{item.date_time.strftime('%Y:%j:%H:%M:%S')}z  |    {item.value}\n")
-        file.close()
+        file.writelines(
+            f"{stamp.strftime('%Y:%j:%H:%M:%S')}z  |    {value}\n"
+            for stamp, value in zip(stamps, values.tolist())
+        )
 
 
 def startup_cleanup(base_dir):
     "Clean up lingering files from previous run"
-    try:
-        os.remove(f"{base_dir}/VC0_VC1_Slips_Detected.png")
-    except FileNotFoundError:
-        pass
-
     try:
         os.remove(f"{base_dir}/VC0_VC1_Slips_Detection_Output.txt")
     except FileNotFoundError:
@@ -180,51 +193,42 @@ def startup_cleanup(base_dir):
 
 def main():
     "Main Execution"
+    parser = argparse.ArgumentParser(description="VC0/VC1 Slip Detection Tool")
+    parser.add_argument("--retention-hours", type=float, default=12,
+                        help="Hours of M0190 history held in memory and plotted")
+    args = parser.parse_args()
+
     print("---VC0/VC1 Slip Detection Tool---")
     if is_windows():
         base_dir = f"C:/users/{getuser()}/Desktop"
-        driver = webdriver.Chrome()
     else:
         base_dir = f"/home/{getuser()}/Desktop"
-        options = webdriver.FirefoxOptions()
-        options.binary_location = "/usr/bin/firefox.file"
-        driver = webdriver.Firefox(options=options)
 
-    data_history = []
+    history = SampleRingBuffer(args.retention_hours)
     startup_cleanup(base_dir)
+    plot = setup_plot()
 
     try:
         while True:
             user_vars = UserVariables()
             print(f" - {user_vars.ts.strftime('%Y:%j:%H:%M:%S')} (Enter ctrl + c to exit tool)")
             raw_data = data_request(user_vars, "M0190")
-            data_history = append_data_history(data_history, raw_data)
-            detected_slips = vc0_vc1_slip_detection(raw_data)
-            generate_plot(detected_slips, data_history, base_dir)
-
-            if is_windows():
-                try:
-                    driver.get(f"{base_dir}/VC0_VC1_Slips_Detected.png")
-                except selenium.common.exceptions.NoSuchWindowException:
-                    driver = webdriver.Chrome()
-                    driver.get(f"{base_dir}/VC0_VC1_Slips_Detected.png")
-                    print(" - Don't close the window. \U0001F440")
-            else:
-                try:
-                    driver.get(f"file://{base_dir}/VC0_VC1_Slips_Detected.png")
-                except selenium.common.exceptions.WebDriverException:
-                    options = webdriver.FirefoxOptions()
-                    options.binary_location = "/usr/bin/firefox.file"
-                    driver = webdriver.Firefox(options=options)
-                    driver.get(f"file://{base_dir}/VC0_VC1_Slips_Detected.png")
-                    print(" - Don't close the window. \U0001F440")
-
-            os.remove(f"{base_dir}/VC0_VC1_Slips_Detected.png")
-            time.sleep(9)
+
+            if raw_data is not None:
+                previous = history.last()
+                new_times, new_values = history.append(*decode_samples(raw_data))
+                slip_times, _ = vc0_vc1_slip_detection(new_times, new_values, previous)
+                update_plot(plot, len(slip_times) > 0, history)
+
+            if not plt.fignum_exists(plot[0].number):
+                plot = setup_plot()
+                update_plot(plot, False, history)
+                print(" - Don't close the window. \U0001F440")
+            plt.pause(9)
 
     except KeyboardInterrupt:
         print("Ending Script!")
-        save_data(data_history, base_dir)
+        save_data(history, base_dir)
 
 
 main()
@@ -5,10 +5,9 @@ v1.6 Change Notes:
 
 import os
 from datetime import datetime, timedelta, timezone
-import urllib.request
 import warnings
 import time
-import pandas as pd
+import traceback
 from cxotime import CxoTime
 from components.obc_error_detection import (
     get_obc_report_dirs, get_obc_error_reports, write_obc_errors)
@@ -17,15 +16,27 @@ from components.limit_violation_detection import (
     get_limit_report_dirs, get_limit_reports, write_limit_violations)
 from components.eia_sequencer_selftest_detection import sequencer_selftest_detection
 from components.scs107_detection import scs107_detection
-from components.misc import create_dir, HTML_HEADER, HTML_SCRIPT
+from components.misc import create_dir, HTML_HEADER, HTML_SCRIPT, SHARE_ROOT
 from components.ssr import (get_ssr_data, get_ssr_beat_report_data, ssr_rollover_detection,
                             make_ssr_by_submod, make_ssr_by_doy, make_ssr_full, get_wk_list,
                             prep_beat_dataframe)
 from components.receiver import (get_receiver_data, spurious_cmd_lock_detection,
                                  write_spurious_cmd_locks)
+from ccdm_telemetry import events
 
 warnings.filterwarnings('ignore')
 
+# Manual report inputs, each a list of strings
+INPUT_LISTS = ("major_events_list", "cdme_performance_list", "rf_performance_list",
+               "limit_violations_list", "tlm_corruption_list", "cdme_misc_comments_list")
+# Queried data each report section is built from
+SECTION_DATA = {"config": ("receiver_data",),
+                "ssr_playback": ("ssr_data", "all_beat_report_data")}
+
+
+class ReportSectionError(Exception):
+    "One or more report sections failed to build"
+
 
 class UserVariables:
     "User defined variables"
@@ -43,6 +54,28 @@ class UserVariables:
         self.get_tlm_corruption_events()
         self.get_cdme_misc_comments()
 
+    @classmethod
+    def non_interactive(cls, ts, tp, inputs=None, set_dir=None, ssr_prime=None):
+        """
+        Description: User variables without any prompts, for unattended runs
+        Input: start/end CxoTime, {INPUT_LISTS name: [<str>]}, optional
+               output directory and SSR prime [SSR, since] overrides
+        Output: UserVariables
+        """
+        user_vars = cls.__new__(cls)
+        user_vars.ts, user_vars.tp = ts, tp
+        user_vars.get_dir_path()
+        user_vars.get_ssr_prime()
+        if set_dir:
+            user_vars.set_dir = set_dir
+        if ssr_prime:
+            user_vars.ssr_prime = list(ssr_prime)
+        for name in INPUT_LISTS:
+            setattr(user_vars, name, list((inputs or {}).get(name, [])))
+        if not user_vars.tlm_corruption_list:
+            user_vars.tlm_corruption_list = ["Nominal."]
+        return user_vars
+
     def get_start_date(self):
         "User input for start date"
         while True:
@@ -109,7 +142,7 @@ class UserVariables:
 
     def get_dir_path(self):
         "User input for set directory"
-        self.set_dir = "/share/FOT/engineering/ccdm/Tools/Weekly"
+        self.set_dir = f"{SHARE_ROOT}/FOT/engineering/ccdm/Tools/Weekly"
         print(f"Set directory is: {self.set_dir}")
 
     def get_ssr_prime(self):
@@ -271,14 +304,8 @@ class UserVariables:
 
 
 def get_dsn_drs(ts, tp):
-    "return a table of DR reports from iFOT"
-    url = (
-        "https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php?r=home&t=qserver&a=show&"
-        "format=list&columns=id,type_desc,tstart,properties&size="
-        f"auto&e=DSN_DR.problem&op=properties&tstart={ts}+&tstop={tp}&ul=12"
-    )
-    with urllib.request.urlopen(url) as response:
-        return pd.read_html(response.read())
+    "return the DSN DR events from iFOT"
+    return events("DSN_DR", ts, tp)
 
 
 def build_config_section(user_vars, data):
@@ -325,11 +352,11 @@ def build_config_section(user_vars, data):
     # DSN DR(s) Section
     config_section += "<div><div><ul><li><strong>DSN DRs this week:</strong><ul>"
 
-    tmp = get_dsn_drs(user_vars.ts, user_vars.tp)
-    df = tmp[0]
+    dsn_drs = get_dsn_drs(user_vars.ts, user_vars.tp)
 
-    if not df.empty and len(df) > 1:
-        config_section += df.to_html(classes="table table-stripped")
+    if len(dsn_drs):
+        config_section += dsn_drs.to_frame(["id", "type_desc", "tstart", "problem"]).to_html(
+            classes="table table-stripped", index=False)
     else:
         config_section += "<li>No DSN DRs this week</li>"
 
@@ -577,8 +604,33 @@ def build_major_events_section(user_vars):
     return major_event_section
 
 
-def build_report(user_vars, ssr_data, all_beat_report_data, receiver_data):
-    "Build the report using all queried data."
+def report_path(user_vars):
+    "Path of the report file for the reporting week"
+    year_doy_ts = user_vars.ts.datetime.strftime('%Y%j')
+    year_doy_tp = user_vars.tp.datetime.strftime('%Y%j')
+    return f"{user_vars.set_dir}/{user_vars.ts.datetime.year}/CCDM_Weekly_{year_doy_ts}_{year_doy_tp}.html"
+
+
+def report_sections(user_vars, data):
+    "Report section builders in report order, {name: builder}"
+    return {
+        "config": lambda: build_config_section(user_vars, data["receiver_data"]),
+        "perf_health": lambda: build_perf_health_section(user_vars),
+        "ssr_playback": lambda: build_ssr_playback_section(
+            user_vars, data["ssr_data"], data["all_beat_report_data"]),
+        "clock_correlation": lambda: build_clock_correlation_section(user_vars),
+        "major_events": lambda: build_major_events_section(user_vars),
+    }
+
+
+def build_report(user_vars, ssr_data, all_beat_report_data, receiver_data, checkpoint=None):
+    """
+    Build the report using all queried data.
+    With a checkpoint (components.checkpoint), sections built by an earlier run
+    are reused and each new one is saved as soon as it is built. A section that
+    fails (or whose data is None) no longer stops the others; the report is only
+    written once every section is built, else ReportSectionError is raised.
+    """
     print("Assembling the report...")
 
     doy_ts = user_vars.ts.datetime.strftime('%j')
@@ -598,25 +650,41 @@ def build_report(user_vars, ssr_data, all_beat_report_data, receiver_data):
         """<hr></div></div>"""
     )
 
-    config_section = build_config_section(user_vars, receiver_data)
-    perf_health_section = build_perf_health_section(user_vars)
-    ssr_playback_section = build_ssr_playback_section(user_vars, ssr_data, all_beat_report_data)
-    clock_correlation_section = build_clock_correlation_section(user_vars)
-    major_event_section = build_major_events_section(user_vars)
-
-    html_output = (
-        file_title + horizontal_line + config_section + horizontal_line + perf_health_section +
-        horizontal_line + ssr_playback_section + horizontal_line + clock_correlation_section +
-        horizontal_line + major_event_section + horizontal_line
-    )
-
-    year_doy_ts = user_vars.ts.datetime.strftime('%Y%j')
-    year_doy_tp = user_vars.tp.datetime.strftime('%Y%j')
-    file_name = f"CCDM_Weekly_{year_doy_ts}_{year_doy_tp}.html"
+    data = {"ssr_data": ssr_data, "all_beat_report_data": all_beat_report_data,
+            "receiver_data": receiver_data}
+    sections, failed = {}, {}
+
+    for name, build in report_sections(user_vars, data).items():
+        if checkpoint is not None and checkpoint.has(f"section_{name}"):
+            print(f" - Reusing the {name} section from the checkpoint")
+            sections[name] = checkpoint.load(f"section_{name}")
+            continue
+        missing = [data_name for data_name in SECTION_DATA.get(name, ()) if data[data_name] is None]
+        if missing:
+            failed[name] = f"no {', '.join(missing)}"
+            continue
+        try:
+            sections[name] = build()
+        except Exception as err: # pylint: disable=broad-exception-caught
+            if checkpoint is None:
+                raise
+            traceback.print_exc()
+            failed[name] = f"{type(err).__name__}: {err}"
+            continue
+        if checkpoint is not None:
+            checkpoint.save(f"section_{name}", sections[name])
+
+    if failed:
+        raise ReportSectionError(
+            "; ".join(f"{name} section failed ({reason})" for name, reason in failed.items()))
+
+    html_output = file_title + horizontal_line
+    for section in sections.values():
+        html_output += section + horizontal_line
 
     create_dir(f"{user_vars.set_dir}/{user_vars.ts.datetime.year}")
 
-    with open(f"{user_vars.set_dir}/{user_vars.ts.datetime.year}/{file_name}", "w", encoding="utf-8") as file:
+    with open(report_path(user_vars), "w", encoding="utf-8") as file:
         file.write(html_output)
 
 
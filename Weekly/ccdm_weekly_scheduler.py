@@ -0,0 +1,278 @@
+"""
+Unattended CCDM Weekly report run for cron or a systemd timer. The manual
+inputs come from a TOML config instead of prompts. The run works out the
+reporting week, checks (and optionally waits for) the prerequisite inputs,
+then builds the report with each fetched data set and report section
+checkpointed (components/checkpoint.py). Rerunning after a failure only redoes
+the failed parts. The checkpoints are keyed on the week and a hash of the
+[inputs] and SSR prime, and dropped once the report is written, so --force
+or edited inputs always rebuild from scratch.
+
+Exit status: 0 report written (or already there), 1 a data fetch or section
+failed (rerun to retry it), 75 prerequisites missing or another run holds the
+week (EX_TEMPFAIL, try again later).
+
+Usage:
+    python ccdm_weekly_scheduler.py [--config weekly_scheduler.toml] [--start YYYY:DOY --end YYYY:DOY]
+                                    [--check-only] [--skip-checks] [--force] [--reset]
+
+systemd (ccdm-weekly.service, started by a timer with OnCalendar=Mon *-*-* 06:00):
+    [Service]
+    Type=oneshot
+    WorkingDirectory=/path/to/Weekly
+    ExecStart=/usr/bin/python3 ccdm_weekly_scheduler.py --config /path/to/weekly_scheduler.toml
+
+cron:
+    0 6 * * 1  cd /path/to/Weekly && python3 ccdm_weekly_scheduler.py --config weekly_scheduler.toml
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+import time
+import tomllib
+import traceback
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent / "weekly_scheduler.toml"
+EXIT_FAILED = 1
+EXIT_TEMPFAIL = 75
+# Config [paths] keys passed to the tools through the environment
+PATH_ENV = {"share_root": "FOT_SHARE_ROOT", "telemetry_cache": "TELEMETRY_CACHE",
+            "ifot_cache": "IFOT_CACHE", "checkpoint_dir": "WEEKLY_CHECKPOINTS"}
+PREREQUISITES = ("beat", "dsn", "limits", "obc")
+# Queried data, in fetch order: (stage name, ccdm_weekly function)
+DATA_STAGES = (("ssr_data", "get_ssr_data"),
+               ("all_beat_report_data", "get_ssr_beat_report_data"),
+               ("receiver_data", "get_receiver_data"))
+
+
+def load_config(path):
+    "Scheduler config (TOML), every table present"
+    with open(path, "rb") as file:
+        config = tomllib.load(file)
+    for table in ("week", "paths", "prerequisites", "report", "inputs"):
+        config.setdefault(table, {})
+    return config
+
+
+def parse_doy(text, what):
+    "'YYYY:DOY' to datetime, SystemExit on a bad date"
+    try:
+        return datetime.strptime(text, "%Y:%j")
+    except ValueError:
+        sys.exit(f'Invalid {what} date "{text}", expected YYYY:DOY')
+
+
+def reporting_week(week_config, start=None, end=None, today=None):
+    """
+    Description: The reporting week: start/end (YYYY:DOY) when given, else
+                 the Friday 10 days before this week's Monday thru the
+                 following Saturday, shifted back weeks_back weeks
+    Input: [week] config, optional start/end overrides, run date
+    Output: (first day, last day) datetimes
+    """
+    start = start or week_config.get("start")
+    end = end or week_config.get("end")
+    if start or end:
+        if not (start and end):
+            sys.exit("Give both a start and an end date, or neither")
+        first, last = parse_doy(start, "start"), parse_doy(end, "end")
+        if last < first:
+            sys.exit(f"End date {end} is before start date {start}")
+        return first, last
+
+    today = today or datetime.now()
+    current_week_monday = today - timedelta(days=today.weekday(), weeks=week_config.get("weeks_back", 0))
+    return current_week_monday - timedelta(days=9), current_week_monday - timedelta(days=3)
+
+
+def week_days(user_vars):
+    "Each day of the reporting week as a datetime"
+    return [user_vars.ts.datetime + timedelta(days=day)
+            for day in range((user_vars.tp.datetime - user_vars.ts.datetime).days + 1)]
+
+
+def check_prerequisites(user_vars, names):
+    """
+    Description: Look for the inputs the report is built from
+    Input: user variables, prerequisite names (see PREREQUISITES)
+    Output: {name: [<str> description of each missing input]}
+    """
+    # pylint: disable=import-outside-toplevel
+    from ccdm_telemetry import events, TelemetryError
+    from components.ssr import get_beat_report_dirs
+    from components.limit_violation_detection import get_limit_report_dirs
+    from components.obc_error_detection import get_obc_report_dirs
+
+    missing = {}
+    days = week_days(user_vars)
+    if "beat" in names:
+        beat_files = get_beat_report_dirs(user_vars)
+        missing["beat"] = [f"BEAT report for {day.strftime('%Y:%j')}" for day in days
+                           if not any(f"BEAT-{day.strftime('%Y%j')}" in file for file in beat_files)]
+    if "limits" in names:
+        missing["limits"] = [str(path) for path in get_limit_report_dirs(user_vars) if not path.exists()]
+    if "obc" in names:
+        obc_files = get_obc_report_dirs(user_vars)
+        missing["obc"] = [f"OBC error log for {day.strftime('%Y:%j')}" for day in days
+                          if not any(f"SMF_ERRLOG_0164_{day.strftime('%Y%j')}" in file
+                                     for file in obc_files)]
+    if "dsn" in names:
+        # The Weekly report takes its DSN passes and DRs from iFOT; this also fills the event cache
+        try:
+            passes = events("PASSPLAN", user_vars.ts, user_vars.tp)
+            events("DSN_DR", user_vars.ts, user_vars.tp)
+            missing["dsn"] = [] if len(passes) else ["iFOT DSN passes (none found for the week)"]
+        except TelemetryError as err:
+            missing["dsn"] = [f"iFOT DSN events ({err})"]
+    return {name: items for name, items in missing.items() if items}
+
+
+def wait_for_prerequisites(user_vars, prerequisite_config):
+    "Recheck missing prerequisites every poll_minutes for up to wait_hours, return what is still missing"
+    names = prerequisite_config.get("required", ["beat", "dsn", "limits"])
+    unknown = [name for name in names if name not in PREREQUISITES]
+    if unknown:
+        sys.exit(f"Unknown prerequisite(s) {unknown}, expected some of {list(PREREQUISITES)}")
+    deadline = time.monotonic() + prerequisite_config.get("wait_hours", 0) * 3600
+    poll_secs = prerequisite_config.get("poll_minutes", 30) * 60
+
+    while True:
+        print("Checking prerequisites...")
+        missing = check_prerequisites(user_vars, names)
+        for name, items in missing.items():
+            print(f" - Missing {name}: {len(items)} item(s), first: {items[0]}")
+        if not missing or time.monotonic() + poll_secs > deadline:
+            return missing
+        print(f" - Checking again in {poll_secs / 60:.0f} min...")
+        time.sleep(poll_secs)
+
+
+def checkpoint_key(weekly, user_vars):
+    "Short hash of the manual inputs and SSR prime, a run with other inputs gets its own checkpoints"
+    inputs = {name: getattr(user_vars, name) for name in weekly.INPUT_LISTS}
+    text = json.dumps([inputs, user_vars.ssr_prime], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:8]
+
+
+def fetch_data(weekly, user_vars, checkpoint):
+    """
+    Description: Fetch the data the unbuilt report sections need, reusing
+                 checkpointed data and saving each newly fetched set
+    Input: ccdm_weekly module, user variables, Checkpoint
+    Output: ({stage: data or None}, [failed stage names])
+    """
+    pending = [name for name in weekly.report_sections(user_vars, {})
+               if not checkpoint.has(f"section_{name}")]
+    needed = {stage for name in pending for stage in weekly.SECTION_DATA.get(name, ())}
+    data, failed = {}, []
+
+    for stage, function_name in DATA_STAGES:
+        data[stage] = None
+        if stage not in needed:
+            continue
+        if checkpoint.has(stage):
+            print(f" - Reusing {stage} from the checkpoint")
+            data[stage] = checkpoint.load(stage)
+            continue
+        try:
+            data[stage] = getattr(weekly, function_name)(user_vars)
+        except Exception: # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            failed.append(stage)
+            continue
+        checkpoint.save(stage, data[stage])
+    return data, failed
+
+
+def run(args, config):
+    "One scheduled run, returns the exit status"
+    # pylint: disable=import-outside-toplevel
+    import ccdm_weekly as weekly
+    from cxotime import CxoTime
+    from components.checkpoint import Checkpoint
+
+    first, last = reporting_week(config["week"], args.start, args.end)
+    unknown = [name for name in config["inputs"] if f"{name}_list" not in weekly.INPUT_LISTS]
+    if unknown:
+        sys.exit(f"Unknown [inputs] key(s) {unknown}, expected some of "
+                 f"{[name[:-len('_list')] for name in weekly.INPUT_LISTS]}")
+    user_vars = weekly.UserVariables.non_interactive(
+        CxoTime(f"{first.strftime('%Y:%j')}:00:00:00.000"),
+        CxoTime(f"{last.strftime('%Y:%j')}:23:59:59.999"),
+        inputs={f"{name}_list": items for name, items in config["inputs"].items()},
+        set_dir=config["paths"].get("output_dir"), ssr_prime=config["report"].get("ssr_prime"))
+    print(f"Reporting week: {first.strftime('%Y:%j')} thru {last.strftime('%Y:%j')}")
+
+    checkpoint = Checkpoint(user_vars.ts, user_vars.tp, key=checkpoint_key(weekly, user_vars))
+    report = Path(weekly.report_path(user_vars))
+    if report.exists() and not (args.force or args.check_only):
+        print(f" - Report already written: {report}")
+        return 0
+
+    checkpoint.lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(checkpoint.lock_path, "w", encoding="utf-8") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(" - Another run is working on this week, exiting.")
+            return EXIT_TEMPFAIL
+        # A forced rebuild must not reuse sections of the report it replaces
+        if args.reset or args.force:
+            print(" - Clearing checkpoints...")
+            checkpoint.clear()
+
+        if not args.skip_checks:
+            missing = wait_for_prerequisites(user_vars, config["prerequisites"])
+            if missing:
+                print(f"Prerequisites missing: {', '.join(missing)}")
+                return EXIT_TEMPFAIL
+            print(" - All prerequisites present")
+        if args.check_only:
+            return 0
+
+        if checkpoint.completed():
+            print(f" - Resuming, completed stages: {', '.join(checkpoint.completed())}")
+        data, failed = fetch_data(weekly, user_vars, checkpoint)
+        Path(user_vars.set_dir).mkdir(parents=True, exist_ok=True)
+        try:
+            weekly.build_report(user_vars, **data, checkpoint=checkpoint)
+        except weekly.ReportSectionError as err:
+            print(f"Report not written: {err}")
+            if failed:
+                print(f" - Data fetches failed: {', '.join(failed)}")
+            print(" - Rerun to retry only the failed parts.")
+            return EXIT_FAILED
+        checkpoint.clear()
+
+    print(f"Report written: {report}")
+    return 0
+
+
+def main():
+    "Main execution"
+    parser = argparse.ArgumentParser(description="Build the CCDM Weekly report without prompts")
+    parser.add_argument("--config", default=str(DEFAULT_CONFIG), help="TOML scheduler config")
+    parser.add_argument("--start", help="First day of the reporting week, YYYY:DOY")
+    parser.add_argument("--end", help="Last day of the reporting week, YYYY:DOY")
+    parser.add_argument("--check-only", action="store_true", help="Only check the prerequisites")
+    parser.add_argument("--skip-checks", action="store_true", help="Build without checking prerequisites")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the report exists, implies --reset")
+    parser.add_argument("--reset", action="store_true", help="Drop the week's checkpoints first")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    # The tools read these paths when imported, so set them first
+    for key, env_name in PATH_ENV.items():
+        if config["paths"].get(key):
+            os.environ[env_name] = str(Path(config["paths"][key]).expanduser())
+    sys.exit(run(args, config))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"Per-stage checkpoints of a Weekly report run"
+
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+CHECKPOINT_DIR = Path(os.environ.get(
+    "WEEKLY_CHECKPOINTS", Path.home() / ".cache" / "ccdm" / "weekly_checkpoints"))
+
+
+class Checkpoint:
+    """
+    Results of the stages of one reporting week (fetched data, built report
+    sections), one pickle per stage under <root>/<YYYYDDD>_<YYYYDDD>[_<key>]/.
+    key tells apart runs of the same week with other inputs. A stage is only
+    saved once it completed, so a rerun picks up where a failed one stopped.
+    """
+    def __init__(self, ts, tp, key=None, root=None):
+        week = f"{ts.datetime.strftime('%Y%j')}_{tp.datetime.strftime('%Y%j')}"
+        self.path = Path(root or CHECKPOINT_DIR) / (f"{week}_{key}" if key else week)
+        # One lock per week whatever the key, two runs must not write the same report
+        self.lock_path = Path(root or CHECKPOINT_DIR) / f"{week}.lock"
+
+    def stage_path(self, name):
+        "Pickle file of a stage"
+        return self.path / f"{name}.pkl"
+
+    def has(self, name):
+        "True if the stage completed before"
+        return self.stage_path(name).exists()
+
+    def load(self, name):
+        "Saved result of a stage"
+        with open(self.stage_path(name), "rb") as file:
+            return pickle.load(file)
+
+    def save(self, name, value):
+        "Save the result of a stage, atomically so a killed run never leaves half a file"
+        self.path.mkdir(parents=True, exist_ok=True)
+        temp_path = self.stage_path(name).with_suffix(".tmp")
+        with open(temp_path, "wb") as file:
+            pickle.dump(value, file)
+        os.replace(temp_path, self.stage_path(name))
+
+    def completed(self):
+        "Names of the completed stages"
+        return sorted(path.stem for path in self.path.glob("*.pkl"))
+
+    def clear(self):
+        "Forget every stage of the week (for this key)"
+        shutil.rmtree(self.path, ignore_errors=True)
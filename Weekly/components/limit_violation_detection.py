@@ -1,8 +1,12 @@
 "Limit Violation Detection"
 
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from components.misc import format_doy
+from components.misc import format_doy, SHARE_ROOT
+
+sys.path.append(str(Path(__file__).resolve().parents[2] / "Misc Tools" / "Limits Version Control Tool"))
+from limits_history import STORE_PATH, LimitsHistory, in_force_note
 
 
 def get_limit_report_dirs(user_vars):
@@ -11,7 +15,7 @@ def get_limit_report_dirs(user_vars):
     print("   - Building list of limit reports...")
     start_date= user_vars.ts.datetime
     end_date= user_vars.tp.datetime
-    root_folder = "/share/FOT/engineering/reports/dailies/"
+    root_folder = f"{SHARE_ROOT}/FOT/engineering/reports/dailies/"
     directory_list = []
     date_diff = timedelta(days=(end_date-start_date).days)
 
@@ -71,6 +75,7 @@ def write_limit_violations(limit_data):
     "Write limit violations to perf_health_section string"
     print("   - Writing limit report...")
     return_string = ""
+    history = LimitsHistory() if STORE_PATH.exists() else None
     for date, data_dict_list in limit_data.items():
         return_string += (
             """</div><ul><ul><li>"""
@@ -88,7 +93,8 @@ def write_limit_violations(limit_data):
                         return_string += (
                             f'<ul><li>({time_item} UTC)  MSID "{msid}", was "{error}" '
                             f'with a measured value of "{state}" with an expected '
-                            f'state of "{e_state}".</li></ul>\n')
+                            f'state of "{e_state}".'
+                            f'{in_force_note(history, msid, date_time, state)}</li></ul>\n')
                     except IndexError:
                         if list_item[1] == "COTHIRTD": # MSID COTHIRTD has a different format
                             msid, error, state = list_item[1], list_item[2], list_item[4]
@@ -97,4 +103,6 @@ def write_limit_violations(limit_data):
                                 f'with a measured value of "{state}" with an expected '
                                 'state of "<BLANK>".</li></ul>\n')
         return_string += "</ul></ul></li>"
+    if history:
+        history.close()
     return return_string
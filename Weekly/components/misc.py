@@ -2,6 +2,7 @@
 
 import os
 
+SHARE_ROOT = os.environ.get("FOT_SHARE_ROOT", "/share")
 
 HTML_HEADER = """
     <html>
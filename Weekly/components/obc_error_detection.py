@@ -4,6 +4,7 @@ import itertools as it
 from pathlib import Path
 from tqdm import tqdm
 from dataclasses import dataclass
+from components.misc import SHARE_ROOT
 
 
 @dataclass
@@ -21,7 +22,7 @@ def get_obc_report_dirs(user_vars):
     print("   - Building OBC Error Log report directory list...")
     start_date= user_vars.ts.datetime
     end_date= user_vars.tp.datetime
-    root_folder= "/share/FOT/engineering/flight_software/OBC_Error_Log_Dumps"
+    root_folder= f"{SHARE_ROOT}/FOT/engineering/flight_software/OBC_Error_Log_Dumps"
     full_file_list,file_list= ([] for i in range(2))
 
     for year_diff in range((end_date.year-start_date.year)+1):
@@ -1,15 +1,13 @@
 "Receiver Data request methods for CCDM Weekly"
 
-import urllib
-import json
 from urllib.error import HTTPError
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import pandas as pd
 import numpy as np
 from cxotime import CxoTime
 from components.data_requests import ska_data_request as ska_data
 from components.data_requests import maude_data_request as maude_data
+from ccdm_telemetry import fetch, events, TelemetryError
 from components.misc import format_wk
 
 class DataObject:
@@ -29,45 +27,22 @@ class SpuriousCmdLockDataPoint:
     receiver: None
 
 
-def jsontime2cxo(time_in):
-    "sanitize input"
-    time_str = str(time_in)
-    return (
-        CxoTime(time_str[0:4]+ ':' +time_str[4:7]+':' +time_str[7:9]+':'
-                +time_str[9:11]+':' +time_str[11:13]+'.' +time_str[13:])
-    )
-
-
 def get_tx_on(ts,tp,tx):
     "returns 'ON' if specified transmitter was on during this interval."
     ctx = maude_data(ts,tp,f"STAT_5MIN_MIN_CTX{tx}X",False)
-    ctx_val = map(int,ctx['data-fmt-1']['values'])
-    if min(ctx_val) == 0:
+    if min(ctx.vals) == 0:
         return 'ON'
     return 'OFF'
 
 
 def get_nearest_mod(t):
     """ Returns surrounding M1050 monitor state"""
-    #sanitize timeformats
-    t.format = "yday"
-    base_url = "https://occweb.cfa.harvard.edu/maude/mrest/FLIGHT/msid.json?m=M1050"
-    url = base_url + "&ts=" +str(t) + "&nearest=t"
-    with urllib.request.urlopen(url) as response:
-        data_after= json.loads(response.read())
-    mod_after = int(data_after['data-fmt-1']['values'][0]) # maybe shoudl check timestamp to gate missing data
-    mod_time = jsontime2cxo(str(data_after['data-fmt-1']['times'][0]))
-    after_dt = (mod_time - t)*86400  # CxoTime timedelta is in fractional days for yday format
-    if abs(after_dt) > 60: # Ignore monitor data that is signficantly far away.  Just assume modulation is on during a pass
-        mod_after = 2
-    url = base_url + "&tp=" +str(t) + "&nearest=t"
-    with urllib.request.urlopen(url) as response:
-        data_before= json.loads(response.read())
-    mod_before = int(data_before['data-fmt-1']['values'][0])
-    mod_time = jsontime2cxo(str(data_after['data-fmt-1']['times'][0]))
-    before_dt = (t - mod_time)*86400 # CxoTime timedelta is in fractional days for yday format
-    if abs(before_dt) > 60:
-        mod_before = 2
+    # Monitor samples more than 60 sec away are ignored, modulation is then assumed on
+    m1050 = fetch("M1050", t.secs - 60, t.secs + 60, source="maude")
+    before = np.searchsorted(m1050.times, t.secs, side="right")
+    after = np.searchsorted(m1050.times, t.secs)
+    mod_before = m1050.vals[before - 1] if before > 0 else 2
+    mod_after = m1050.vals[after] if after < len(m1050) else 2
     if (mod_before == 1) or (mod_after ==1):
         return 'OFF'
     return 'ON'
@@ -81,15 +56,10 @@ def get_support_stats(ts,tp):
     Output: list of strings [<str>], [<str>]
     """
     supports_list= np.array([])
-    url= ("https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php?r=home&t=qserver&format="
-          "list&e=PASSPLAN.sched_support_time.ts_bot.eot&columns=type_desc,sheetlink,tstart&tstart="
-          f"{ts}&tstop={tp}&ul=12"
-          )
-
-    with urllib.request.urlopen(url) as response:
-        tmp_data = pd.read_html(response.read())
+    passes = events("PASSPLAN", ts, tp)
+    passes = passes.select(np.isfinite(passes.ts_bot))
 
-    for bot, eot in zip(tmp_data[0][4][1:],tmp_data[0][5][1:]):
+    for bot, eot in zip(passes.ts_bot, passes.eot):
         try:
             bot_time= CxoTime(bot)
             eot_time= CxoTime(f"{bot_time.datetime.year}:"
@@ -127,27 +97,15 @@ def get_receiver_data(user_vars):
                 tx_b_on += 1
 
             # Bad Visibility Processing
-            ccmdlka = maude_data(support.bot,support.eot,'TR_CCMDLKA',False)
-            for time, value in zip(ccmdlka['data-fmt-1']['times'],
-                                        ccmdlka['data-fmt-1']['values']):
-                ccmdlka_val= int(value)
-                ccmdlka_time= jsontime2cxo(time)
-
-                if (ccmdlka_val == 1 and support.bot < ccmdlka_time < support.eot and
-                    get_nearest_mod(ccmdlka_time) == 'ON'):
-                    a_bad[ccmdlka_time.date[5:8]] = 1
-
-            ccmdlkb = maude_data(support.bot,support.eot,'TR_CCMDLKB',False)
-            for time, value in zip(ccmdlkb['data-fmt-1']['times'],
-                                        ccmdlkb['data-fmt-1']['values']):
-                ccmdlkb_val= int(value)
-                ccmdlkb_time= jsontime2cxo(time)
-
-                if (ccmdlkb_val == 1 and support.bot < ccmdlkb_time < support.eot and
-                    get_nearest_mod(ccmdlkb_time) == 'ON'):
-                    b_bad[ccmdlkb_time.date[5:8]] = 1
-
-        except HTTPError:
+            for receiver, bad in (("A", a_bad), ("B", b_bad)):
+                ccmdlk = maude_data(support.bot,support.eot,f'TR_CCMDLK{receiver}',False)
+                locked = ((ccmdlk.vals == 1) & (support.bot.secs < ccmdlk.times) &
+                          (ccmdlk.times < support.eot.secs))
+                for ccmdlk_time in CxoTime(ccmdlk.times[locked]):
+                    if get_nearest_mod(ccmdlk_time) == 'ON':
+                        bad[ccmdlk_time.date[5:8]] = 1
+
+        except (HTTPError, TelemetryError):
             print(f"IFOT ERR Pass {support.bot.greta} - {support.eot.greta}. "
                   "Stats not processed for this pass.")
 
@@ -1,7 +1,6 @@
 "SSR Data request methods for CCDM Weekly"
 
 import pandas as pd
-import urllib
 from datetime import datetime, timedelta
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
@@ -10,6 +9,8 @@ from dataclasses import dataclass
 from typing import Optional
 from cxotime import CxoTime
 from components.data_requests import ska_data_request as ska_data
+from components.misc import SHARE_ROOT
+from ccdm_telemetry import events
 
 
 @dataclass
@@ -42,17 +43,9 @@ def get_ssr_data(user_vars):
     "returns SSRStats Object"
     print("\nFetching SSR Data...")
 
-    url = ("https://occweb.cfa.harvard.edu/occweb/web/webapps/ifot/ifot.php?r=home&t="
-           "qserver&format=list&columns=linenum&e=PLAYBACK_BCW.ssr.playback_status."
-           f"ts_ssr_start_pb.status_comment&tstart={user_vars.ts}&tstop={user_vars.tp}&ul=12")
-
-    with urllib.request.urlopen(url) as response:
-        raw_data = pd.read_html(response.read())
-
-    df = raw_data[0]
-
-    ssr_col = df.iloc[1:, 1]
-    status_col = df.iloc[1:, 2]
+    playbacks = events("PLAYBACK_BCW", user_vars.ts, user_vars.tp)
+    ssr_col = playbacks.ssr
+    status_col = playbacks.playback_status
 
     return SSRData(
         ssra_good = ((ssr_col == "A") & (status_col == "OK")).sum(),
@@ -96,7 +89,7 @@ def parse_beat_report(beat_dir, user_vars):
 
 def get_beat_report_dirs(user_vars):
     "Return a list of <str> of BEAT files to parse."
-    base_path = "/share/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/SSR_Short_Reports/"
+    base_path = f"{SHARE_ROOT}/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/SSR_Short_Reports/"
     return_list = []
 
     # Get all files in Start Year
@@ -240,7 +233,7 @@ def make_ssr_by_submod(ssr, user_vars, df, ftitle):
     """
     Description: Build SSR By Submodule plot using Pandas for aggregation
     """
-    root = ("/share/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
+    root = (f"{SHARE_ROOT}/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
             f"SSR_Weekly_Charts/{user_vars.ts.datetime.year}/")
 
     doy_tp_str = user_vars.tp.datetime.strftime('%j')
@@ -274,7 +267,7 @@ def make_ssr_by_submod(ssr, user_vars, df, ftitle):
 
 def make_ssr_by_doy(ssr, user_vars, df, ftitle):
     "Generate Plot SSR by DoY using Pandas aggregation"
-    root = ("/share/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
+    root = (f"{SHARE_ROOT}/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
             f"SSR_Weekly_Charts/{user_vars.ts.datetime.year}/")
     fname = f"{root}SSR_{ssr}_{user_vars.ts.datetime.year}_{user_vars.ts.datetime.strftime('%j').zfill(3)}_{ftitle}"
 
@@ -303,7 +296,7 @@ def make_ssr_by_doy(ssr, user_vars, df, ftitle):
 
 def make_ssr_full(ssr, user_vars, df, ftitle, full=False):
     "Generate SSR Heatmap using Pandas Crosstab"
-    root = ("/share/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
+    root = (f"{SHARE_ROOT}/FOT/engineering/ccdm/Current_CCDM_Files/Weekly_Reports/"
             f"SSR_Weekly_Charts/{user_vars.ts.datetime.year}/")
     fname = f"{root}SSR_{ssr}_{user_vars.ts.datetime.year}_{user_vars.ts.datetime.strftime('%j').zfill(3)}_{ftitle}"
 